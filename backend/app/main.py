@@ -1,11 +1,16 @@
 # FastAPI/Flask app entrypoint
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+import logging
 import uvicorn
 
 from config import settings
 from app.routes import chatbot
+from services.db import dispose_engines, init_models, pool_stats
+from utils.metrics import Gauge, MetricsMiddleware, registry
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -23,6 +28,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency histograms; skipped entirely when metrics are off
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(chatbot.router, prefix=settings.API_V1_STR)
 
@@ -36,7 +45,77 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "NutmegAI Backend"}
+    llm = chatbot.llm_service.resilience.stats()
+    return {
+        "status": "degraded" if llm["breaker"]["state"] == "open" else "healthy",
+        "service": "NutmegAI Backend",
+        "llm": llm,
+        "history": chatbot.llm_service.history_store.stats(),
+        "summaries": chatbot.llm_service.summarizer.stats() if chatbot.llm_service.summarizer is not None else None,
+        "fast_path": chatbot.llm_service.fast_path.stats() if chatbot.llm_service.fast_path is not None else None,
+        "persistence": chatbot.persistence_queue.stats() if chatbot.persistence_queue is not None else None,
+        "database": pool_stats()
+    }
+
+def _backend_gauge(read):
+    return lambda: {(name,): read(backend) for name, backend in chatbot.llm_service.router.backends.items()}
+
+Gauge(registry, "nutmegai_llm_in_flight", "Completions currently in flight per backend", ["backend"],
+      collect=_backend_gauge(lambda backend: backend.in_flight))
+Gauge(registry, "nutmegai_llm_breaker_open", "1 while a backend's circuit breaker is open", ["backend"],
+      collect=_backend_gauge(lambda backend: int(backend.resilience.breaker.state == "open")))
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus scrape endpoint
+    """
+    if not registry.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return Response(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.on_event("startup")
+async def startup_event():
+    # Tables first, so the knowledge base, lexicon and persistence queries find them
+    try:
+        await init_models()
+    except Exception as e:
+        logger.warning("Database schema check failed: %s", e)
+    
+    if chatbot.persistence_queue is not None:
+        await chatbot.persistence_queue.start()
+    
+    # Load the local model before the first routed turn needs it
+    await chatbot.llm_service.start()
+    
+    if settings.KNOWLEDGE_BASE_SOURCE == "database":
+        try:
+            await chatbot.rag_service.reload_knowledge(force=True)
+        except Exception as e:
+            logger.warning("Using built-in knowledge base, database load failed: %s", e)
+        chatbot.rag_service.start_auto_reload(settings.KNOWLEDGE_RELOAD_INTERVAL_SECONDS)
+    
+    if settings.LEXICON_SOURCE == "database":
+        try:
+            await chatbot.lexicon_service.reload()
+        except Exception as e:
+            logger.warning("Using built-in Creole dictionary, database load failed: %s", e)
+        chatbot.lexicon_service.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await chatbot.rag_service.stop_auto_reload()
+    
+    # Write the last translation hit counts to usage_count
+    await chatbot.lexicon_service.stop()
+    
+    # Flush buffered chat rows before the worker exits
+    if chatbot.persistence_queue is not None:
+        await chatbot.persistence_queue.stop()
+    
+    # Close pooled upstream connections cleanly
+    await chatbot.llm_service.close()
+    await dispose_engines()
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -1,23 +1,48 @@
 # API routes for chatbot
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
+import hmac
+import json
+import logging
 import sys
 import os
+import time
 
 # Add parent directory to path to import services
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from services.llm import LLMService
 from services.rag import RAGService
-from utils.helpers import detect_language, translate_creole
+from services.persistence import ChatPersistenceQueue
+from services.lexicon import LexiconService
+from services.db import get_db_session, pool_stats
+from services.messages import fetch_message_page, session_exists
+from utils.helpers import detect_language, translate_creole, translate_creole_batch
+from utils.metrics import DIRECT_ANSWERS, FALLBACKS, LLM_TOKENS, STAGE_SECONDS, STREAM_TTFB_SECONDS, registry
 from config import settings
 
 router = APIRouter(prefix="/chatbot", tags=["chatbot"])
+logger = logging.getLogger(__name__)
 
 # Initialize services
-llm_service = LLMService()
+persistence_queue = ChatPersistenceQueue() if settings.PERSISTENCE_ENABLED else None
 rag_service = RAGService()
+llm_service = LLMService(persistence=persistence_queue, rag_service=rag_service)
+lexicon_service = LexiconService()
+
+def require_admin(x_admin_key: Optional[str] = Header(default=None)):
+    """
+    Guard admin endpoints with ADMIN_API_KEY; without a configured key they stay closed
+    """
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(status_code=503, detail="Admin endpoints are disabled until ADMIN_API_KEY is set")
+    if x_admin_key is None or not hmac.compare_digest(x_admin_key, settings.ADMIN_API_KEY):
+        raise HTTPException(status_code=403, detail="Admin key required")
 
 class ChatMessage(BaseModel):
     message: str
@@ -30,11 +55,19 @@ class ChatResponse(BaseModel):
     language: str
     confidence: float
     suggested_actions: List[str]
+    # True when no backend could answer and the reply came from the fallback
+    fallback: bool = False
+
+class BatchTranslateRequest(BaseModel):
+    texts: List[str]
+    target_language: str = "en"
+    stream: bool = False
 
 class DocumentRequest(BaseModel):
     document_type: str
     query: str
     language: str = "en"
+    session_id: Optional[str] = None
 
 class DocumentResponse(BaseModel):
     information: str
@@ -67,12 +100,54 @@ async def chat_with_bot(chat_message: ChatMessage):
             session_id=response["session_id"],
             language=chat_message.language,
             confidence=response["confidence"],
-            suggested_actions=response["suggested_actions"]
+            suggested_actions=response["suggested_actions"],
+            fallback=response.get("fallback", False)
         )
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chat error: {str(e)}")
 
+@router.post("/chat/stream")
+async def chat_with_bot_stream(chat_message: ChatMessage):
+    """
+    Streaming chat endpoint that sends tokens as Server-Sent Events while they are generated
+    """
+    started = time.perf_counter()
+    
+    # Detect language if not specified
+    if not chat_message.language or chat_message.language == "auto":
+        chat_message.language = detect_language(chat_message.message)
+    
+    async def event_stream():
+        ttfb_ms = None
+        async for event in llm_service.stream_response(
+            message=chat_message.message,
+            language=chat_message.language,
+            session_id=chat_message.session_id
+        ):
+            data = event["data"]
+            if ttfb_ms is None:
+                ttfb_ms = (time.perf_counter() - started) * 1000
+                STREAM_TTFB_SECONDS.observe(ttfb_ms / 1000)
+            if event["event"] == "done":
+                data = {
+                    "response": data["response"],
+                    "session_id": data["session_id"],
+                    "language": chat_message.language,
+                    "confidence": data["confidence"],
+                    "suggested_actions": data["suggested_actions"],
+                    "fallback": data.get("fallback", False),
+                    "ttfb_ms": round(ttfb_ms, 2)
+                }
+                logger.info("chat stream ttfb_ms=%.2f session_id=%s", ttfb_ms, data["session_id"])
+            yield f"event: {event['event']}\ndata: {json.dumps(data)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/documents/{document_type}", response_model=DocumentResponse)
 async def get_document_help(document_type: str, request: DocumentRequest):
     """
@@ -82,14 +157,24 @@ async def get_document_help(document_type: str, request: DocumentRequest):
         if document_type not in settings.LEGAL_CATEGORIES:
             raise HTTPException(status_code=400, detail="Invalid document type")
         
-        # Get document information using RAG service
-        doc_info = await rag_service.get_document_info(
-            document_type=document_type,
-            query=request.query,
-            language=request.language
-        )
+        # Serve the precomputed JSON for this document and query intent
+        body = rag_service.get_document_response_body(document_type, request.query)
         
-        return DocumentResponse(**doc_info)
+        if persistence_queue is not None and request.session_id:
+            doc_info = await rag_service.get_document_info(
+                document_type=document_type,
+                query=request.query,
+                language=request.language
+            )
+            await persistence_queue.record_document_query(
+                session_id=request.session_id,
+                document_type=document_type,
+                query_text=request.query,
+                response_text=doc_info["information"],
+                language=request.language
+            )
+        
+        return Response(content=body, media_type="application/json")
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Document help error: {str(e)}")
@@ -130,6 +215,51 @@ async def translate_message(message: str, target_language: str = "en"):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Translation error: {str(e)}")
 
+@router.post("/translate/batch")
+async def translate_messages_batch(request: BatchTranslateRequest):
+    """
+    Translate a list of strings in one call; set stream=true for an NDJSON response.
+    Translation runs in the threadpool so a large batch never blocks the event loop.
+    """
+    if len(request.texts) > settings.TRANSLATE_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(request.texts)} items, limit is {settings.TRANSLATE_BATCH_MAX_ITEMS}"
+        )
+    total_chars = sum(len(text) for text in request.texts)
+    if total_chars > settings.TRANSLATE_BATCH_MAX_CHARS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {total_chars} characters, limit is {settings.TRANSLATE_BATCH_MAX_CHARS}"
+        )
+    
+    if request.stream:
+        async def ndjson_lines():
+            chunk_size = settings.TRANSLATE_STREAM_CHUNK_SIZE
+            for start in range(0, len(request.texts), chunk_size):
+                chunk = request.texts[start:start + chunk_size]
+                translated = await run_in_threadpool(translate_creole_batch, chunk, request.target_language)
+                yield "".join(
+                    json.dumps({"index": start + i, "original": original, "translated": result}) + "\n"
+                    for i, (original, result) in enumerate(zip(chunk, translated))
+                )
+        
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+    
+    try:
+        started = time.perf_counter()
+        translated = await run_in_threadpool(translate_creole_batch, request.texts, request.target_language)
+        elapsed = time.perf_counter() - started
+        return {
+            "translations": translated,
+            "target_language": request.target_language,
+            "count": len(translated),
+            "elapsed_ms": round(elapsed * 1000, 3),
+            "strings_per_second": round(len(translated) / elapsed) if elapsed > 0 else None
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Translation error: {str(e)}")
+
 @router.get("/languages")
 async def get_supported_languages():
     """
@@ -139,4 +269,129 @@ async def get_supported_languages():
         "supported_languages": settings.SUPPORTED_LANGUAGES,
         "primary_language": "en-GD",
         "description": "Grenadian Creole and English support"
-    }
\ No newline at end of file
+    }
+
+@router.get("/sessions/{session_id}/messages")
+async def get_session_messages(
+    session_id: str,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    db: AsyncSession = Depends(get_db_session)
+):
+    """
+    Page through a session's stored messages; pass next_cursor back as cursor for the next page.
+    Eventually consistent: rows still in the write-behind queue are not listed yet, only counted
+    in pending_messages, since they have no id or position to page by until they are written.
+    """
+    try:
+        messages, next_cursor = await fetch_message_page(db, session_id, limit, cursor, order)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    pending = len(persistence_queue.pending_messages(session_id)) if persistence_queue is not None else 0
+    if not messages and not pending and cursor is None and not await session_exists(db, session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"session_id": session_id, "messages": messages, "next_cursor": next_cursor, "pending_messages": pending}
+
+@router.get("/admin/cache", dependencies=[Depends(require_admin)])
+async def get_response_cache_stats():
+    """
+    Get exact and semantic response cache counters and in-flight coalescing
+    """
+    return {
+        "exact": llm_service.response_cache.stats() if llm_service.response_cache is not None else None,
+        "semantic": llm_service.semantic_cache.stats() if llm_service.semantic_cache is not None else None,
+        "coalescing": llm_service.single_flight.stats() if llm_service.single_flight is not None else None
+    }
+
+@router.delete("/admin/cache", dependencies=[Depends(require_admin)])
+async def invalidate_response_cache():
+    """
+    Drop all cached responses, e.g. after fees or procedures change
+    """
+    return {
+        "exact_invalidated": llm_service.response_cache.invalidate() if llm_service.response_cache is not None else 0,
+        "semantic_invalidated": llm_service.semantic_cache.invalidate() if llm_service.semantic_cache is not None else 0
+    }
+
+@router.get("/admin/fast-path", dependencies=[Depends(require_admin)])
+async def get_fast_path_stats():
+    """
+    Knowledge-base fast path hit ratio and estimated LLM latency saved
+    """
+    return llm_service.fast_path.stats() if llm_service.fast_path is not None else None
+
+@router.get("/admin/llm", dependencies=[Depends(require_admin)])
+async def get_llm_backend_stats():
+    """
+    Routing mode, turns routed to each backend and per-backend health
+    """
+    return llm_service.router.stats()
+
+@router.get("/admin/metrics", dependencies=[Depends(require_admin)])
+async def get_metrics_summary():
+    """
+    Per-stage p50/p95/p99 latencies, direct answers, fallbacks and token usage
+    """
+    return {
+        "enabled": registry.enabled,
+        "stages": STAGE_SECONDS.quantiles(),
+        "direct_answers": DIRECT_ANSWERS.totals(),
+        "fallbacks": FALLBACKS.totals(),
+        "tokens": LLM_TOKENS.totals()
+    }
+
+@router.get("/admin/prompt", dependencies=[Depends(require_admin)])
+async def get_prompt_assembly_stats():
+    """
+    Tokenizer, token budget and average prompt size of retrieval-augmented prompts
+    """
+    return llm_service.prompt_assembler.stats() if llm_service.prompt_assembler is not None else None
+
+@router.get("/admin/knowledge", dependencies=[Depends(require_admin)])
+async def get_knowledge_snapshot():
+    """
+    Describe the knowledge-base snapshot currently being served
+    """
+    return rag_service.snapshot.describe()
+
+@router.post("/admin/knowledge/reload", dependencies=[Depends(require_admin)])
+async def reload_knowledge_base():
+    """
+    Rebuild the knowledge-base snapshot from LegalDocument now
+    """
+    try:
+        await rag_service.reload_knowledge(force=True)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Knowledge reload error: {str(e)}")
+    return rag_service.snapshot.describe()
+
+@router.get("/admin/lexicon", dependencies=[Depends(require_admin)])
+async def get_lexicon_stats():
+    """
+    Describe the Creole lexicon in use and its usage_count flushes
+    """
+    return lexicon_service.describe()
+
+@router.post("/admin/lexicon/reload", dependencies=[Depends(require_admin)])
+async def reload_lexicon():
+    """
+    Reload the Creole lexicon from CreoleTranslation now
+    """
+    try:
+        return await lexicon_service.reload()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Lexicon reload error: {str(e)}")
+
+@router.get("/admin/database", dependencies=[Depends(require_admin)])
+async def get_database_stats(db: AsyncSession = Depends(get_db_session)):
+    """
+    Async connection pool state and, on SQLite, the pragmas in effect
+    """
+    stats = pool_stats()
+    if db.bind.dialect.name == "sqlite":
+        stats["pragmas"] = {
+            name: (await db.execute(text(f"PRAGMA {name}"))).scalar()
+            for name in ("journal_mode", "synchronous", "mmap_size", "busy_timeout")
+        }
+    return stats
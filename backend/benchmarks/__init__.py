@@ -0,0 +1 @@
+# Benchmarks and load-test harnesses 
\ No newline at end of file
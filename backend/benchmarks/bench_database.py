@@ -0,0 +1,141 @@
+# Benchmark: concurrent history reads and writes through the async engine, SQLite defaults vs WAL tuning
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from config import settings
+from services import db
+from services.history import SQLHistoryStore
+
+# name -> (WAL on, synchronous, mmap bytes)
+CONFIGURATIONS = {
+    "sqlite defaults": (False, "FULL", 0),
+    "wal + normal + mmap": (True, "NORMAL", 268435456)
+}
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float, lags: list):
+    """
+    How late a short sleep wakes up; blocking calls on the loop show up here
+    """
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - started - interval) * 1000)
+
+async def run_configuration(path: str, sessions: int, concurrency: int, duration: float,
+                            read_ratio: float, seed: int) -> dict:
+    settings.DATABASE_URL = f"sqlite:///{path}"
+    await db.init_models()
+    store = SQLHistoryStore(max_turns=10, ttl_seconds=3600)
+    session_ids = [f"bench-{i}" for i in range(sessions)]
+    for session_id in session_ids:
+        await store.append(session_id, [
+            {"role": "user", "content": "How do I get a birth certificate?"},
+            {"role": "assistant", "content": "Visit the Civil Registry Office in St. George's."}
+        ])
+
+    rng = random.Random(seed)
+    latencies = {"read": [], "write": []}
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            session_id = rng.choice(session_ids)
+            kind = "read" if rng.random() < read_ratio else "write"
+            started = time.perf_counter()
+            try:
+                if kind == "read":
+                    await store.get_context(session_id)
+                else:
+                    await store.append(session_id, [
+                        {"role": "user", "content": "What do I need to bring?"},
+                        {"role": "assistant", "content": "Bring your ID and the completed form."}
+                    ])
+            except Exception:
+                errors += 1
+                continue
+            latencies[kind].append((time.perf_counter() - started) * 1000)
+
+    stop = asyncio.Event()
+    lags = []
+    ticker = asyncio.create_task(measure_loop_lag(stop, 0.005, lags))
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+    pool = db.pool_stats()
+    await db.dispose_engines()
+
+    lags.sort()
+    result = {
+        "errors": errors,
+        "pool": pool.get("pool"),
+        "loop_lag_p99_ms": lags[int(len(lags) * 0.99)] if lags else 0.0,
+        "loop_lag_max_ms": lags[-1] if lags else 0.0
+    }
+    for kind, values in latencies.items():
+        values.sort()
+        result[f"{kind}s_per_sec"] = len(values) / elapsed
+        result[f"{kind}_p95_ms"] = values[int(len(values) * 0.95)] if values else 0.0
+    result["ops_per_sec"] = result["reads_per_sec"] + result["writes_per_sec"]
+    return result
+
+async def run(args) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, (wal, synchronous, mmap_size) in CONFIGURATIONS.items():
+            settings.SQLITE_WAL_ENABLED = wal
+            settings.SQLITE_SYNCHRONOUS = synchronous
+            settings.SQLITE_MMAP_SIZE = mmap_size
+            path = os.path.join(tmp, f"{name.replace(' ', '_').replace('+', '')}.db")
+            results[name] = await run_configuration(path, args.sessions, args.concurrency, args.duration,
+                                                    args.read_ratio, args.seed)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent read/write throughput of the async SQLite engine")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per configuration")
+    parser.add_argument("--read-ratio", type=float, default=0.8)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--max-loop-lag-ms", type=float, default=50.0, help="Allowed p99 event loop lag")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    print(f"🚀 {args.concurrency} concurrent tasks, {args.read_ratio:.0%} history reads, "
+          f"{args.sessions} sessions, {args.duration:.0f}s each\n")
+    print(f"{'configuration':>22} {'reads/s':>9} {'writes/s':>9} {'read p95':>9} {'write p95':>10} "
+          f"{'lag p99':>8} {'lag max':>8} {'errors':>7}")
+    for name, result in results.items():
+        print(f"{name:>22} {result['reads_per_sec']:9.0f} {result['writes_per_sec']:9.0f} "
+              f"{result['read_p95_ms']:7.1f}ms {result['write_p95_ms']:8.1f}ms "
+              f"{result['loop_lag_p99_ms']:6.1f}ms {result['loop_lag_max_ms']:6.1f}ms {result['errors']:7d}")
+    baseline, tuned = results["sqlite defaults"], results["wal + normal + mmap"]
+    print(f"\nThroughput with WAL tuning: {tuned['ops_per_sec'] / baseline['ops_per_sec']:.1f}x "
+          f"(pool: {tuned['pool']})")
+
+    checks = {
+        "WAL tuning raises concurrent throughput": tuned["ops_per_sec"] > baseline["ops_per_sec"],
+        "No failed queries": all(result["errors"] == 0 for result in results.values()),
+        f"Event loop p99 lag under {args.max_loop_lag_ms:.0f} ms while queries run":
+            all(result["loop_lag_p99_ms"] < args.max_loop_lag_ms for result in results.values())
+    }
+    print()
+    for name, ok in checks.items():
+        print(f"{'✅' if ok else '❌'} {name}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# Benchmark: single-pass detect_language vs the original per-pattern regex loop
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from benchmarks.corpus import generate_messages, golden_corpus
+from utils.helpers import CREOLE_PATTERNS, ENGLISH_PATTERNS, detect_language
+
+def legacy_detect_language(text: str) -> str:
+    """
+    The original implementation, kept as the reference for the golden check
+    """
+    text_lower = text.lower()
+    creole_score = 0
+    english_score = 0
+    for category, patterns in CREOLE_PATTERNS.items():
+        for pattern in patterns:
+            if re.search(pattern, text_lower):
+                creole_score += 1
+    for pattern in ENGLISH_PATTERNS:
+        if re.search(pattern, text_lower):
+            english_score += 1
+    return "en-GD" if creole_score > english_score else "en"
+
+def check_golden() -> int:
+    mismatches = [text for text in golden_corpus() if detect_language(text) != legacy_detect_language(text)]
+    for text in mismatches[:10]:
+        print(f"❌ {text!r}: {detect_language(text)} != {legacy_detect_language(text)}")
+    return len(mismatches)
+
+def time_over(func, messages) -> float:
+    started = time.perf_counter()
+    for text in messages:
+        func(text)
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description="detect_language throughput")
+    parser.add_argument("--messages", type=int, default=100_000)
+    args = parser.parse_args()
+
+    mismatches = check_golden()
+    print("✅ Golden corpus identical" if mismatches == 0 else f"❌ {mismatches} golden mismatches")
+
+    messages = generate_messages(args.messages, seed=7)
+    legacy = time_over(legacy_detect_language, messages)
+    current = time_over(detect_language, messages)
+    print(f"\n🚀 detect_language over {args.messages:,} messages")
+    print(f"{'regex loop':>12}: {legacy:.2f}s ({legacy / args.messages * 1e6:.1f} µs/msg)")
+    print(f"{'single pass':>12}: {current:.2f}s ({current / args.messages * 1e6:.1f} µs/msg)")
+    print(f"\nSpeedup: {legacy / current:.1f}x")
+    sys.exit(0 if mismatches == 0 else 1)
+
+if __name__ == "__main__":
+    main()
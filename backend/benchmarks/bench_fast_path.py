@@ -0,0 +1,77 @@
+# Benchmark: knowledge-base fast path in front of the LLM on a mixed chat corpus
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from config import settings
+from benchmarks.corpus import generate_messages
+from benchmarks.mock_openai import MockCompletionState, MockServer, create_mock_app
+
+async def run(messages, latency_ms: float, fast_path: bool) -> dict:
+    state = MockCompletionState(latency_ms=latency_ms)
+    server = MockServer(create_mock_app(state)).start()
+
+    settings.OPENAI_API_KEY = "mock-key"
+    settings.OPENAI_BASE_URL = server.base_url
+    settings.FAST_PATH_ENABLED = fast_path
+    # Caches and coalescing would hide the difference between the two runs
+    settings.RESPONSE_CACHE_ENABLED = False
+    settings.SEMANTIC_CACHE_ENABLED = False
+    settings.COALESCE_ENABLED = False
+
+    from services.llm import LLMService
+    from services.rag import RAGService
+    service = LLMService(rag_service=RAGService())
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*[service.generate_response(text) for text in messages])
+        elapsed = time.perf_counter() - started
+    finally:
+        await service.close()
+        server.stop()
+
+    return {
+        "elapsed_s": elapsed,
+        "upstream_requests": state.total_requests,
+        "fast_path": service.fast_path.stats() if service.fast_path is not None else None
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Fast path hit ratio and latency saved")
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--samples", type=int, default=8)
+    args = parser.parse_args()
+
+    from services.fast_path import FastPathRouter
+    from services.rag import RAGService
+    messages = generate_messages(args.messages, seed=11)
+
+    router = FastPathRouter(RAGService())
+    print("🔍 Routing samples:")
+    for text in messages[:args.samples]:
+        routed = "fast path" if router.route(text) is not None else "LLM"
+        print(f"   {routed:>9}  {text}")
+
+    baseline = asyncio.run(run(messages, args.latency_ms, fast_path=False))
+    routed = asyncio.run(run(messages, args.latency_ms, fast_path=True))
+    stats = routed["fast_path"]
+
+    print(f"\n🚀 {args.messages} messages, mock completion latency {args.latency_ms:.0f} ms")
+    print(f"{'LLM only':>10}: {baseline['elapsed_s']:.2f}s, {baseline['upstream_requests']} upstream calls")
+    print(f"{'fast path':>10}: {routed['elapsed_s']:.2f}s, {routed['upstream_requests']} upstream calls")
+    for key, value in stats.items():
+        print(f"{key:>22}: {value}")
+
+    ok = stats["hits"] > 0 and routed["upstream_requests"] == baseline["upstream_requests"] - stats["hits"]
+    print("\n✅ Fast-path hits skipped the LLM" if ok else "\n❌ Fast path did not reduce upstream calls")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# Benchmark: precompiled intent engine vs the original keyword scans
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from benchmarks.corpus import golden_corpus
+from benchmarks.bench_detect_language import legacy_detect_language
+from utils.helpers import ACTION_KEYWORDS, DOCUMENT_KEYWORDS, URGENCY_KEYWORDS, extract_legal_intent
+
+def legacy_extract_legal_intent(text: str) -> dict:
+    """
+    The original implementation: substring scans, first hit wins
+    """
+    text_lower = text.lower()
+    intent = {"document_type": None, "action": None, "urgency": "normal", "language": legacy_detect_language(text)}
+    for slot, keywords in (("document_type", DOCUMENT_KEYWORDS), ("action", ACTION_KEYWORDS), ("urgency", URGENCY_KEYWORDS)):
+        for label, phrases in keywords.items():
+            if any(phrase in text_lower for phrase in phrases):
+                intent[slot] = label
+                break
+    return intent
+
+def compare(corpus) -> int:
+    """
+    Print the messages whose intent changed; differences are expected where a keyword
+    only matched inside another word or a more specific keyword now outscores it
+    """
+    changed = 0
+    for text in corpus:
+        old = legacy_extract_legal_intent(text)
+        new = extract_legal_intent(text)
+        diff = {slot: (old[slot], new[slot]) for slot in old if old[slot] != new[slot]}
+        if diff:
+            changed += 1
+            if changed <= 10:
+                print(f"   {text!r}: " + ", ".join(f"{slot} {a} -> {b}" for slot, (a, b) in diff.items()))
+    return changed
+
+def per_message(func, corpus, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text in corpus:
+            func(text)
+    return (time.perf_counter() - started) / (rounds * len(corpus)) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="extract_legal_intent latency on the golden corpus")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--budget-us", type=float, default=20.0)
+    args = parser.parse_args()
+
+    corpus = golden_corpus()
+    id_fixed = extract_legal_intent("did it arrive, is it valid?")["document_type"] is None
+    print("✅ 'id' no longer matches inside 'did'/'valid'" if id_fixed else "❌ 'id' still matches inside words")
+
+    print(f"\n🔍 Intent changes vs substring scans:")
+    changed = compare(corpus)
+    print(f"   {changed} of {len(corpus)} messages changed")
+
+    legacy = per_message(legacy_extract_legal_intent, corpus, args.rounds)
+    current = per_message(extract_legal_intent, corpus, args.rounds)
+    print(f"\n🚀 extract_legal_intent over {len(corpus):,} messages x {args.rounds}")
+    print(f"{'substring scans':>16}: {legacy:.1f} µs/msg")
+    print(f"{'intent engine':>16}: {current:.1f} µs/msg ({legacy / current:.1f}x)")
+
+    within_budget = current <= args.budget_us
+    print(f"\n{'✅' if within_budget else '❌'} Budget {args.budget_us:.0f} µs/msg")
+    sys.exit(0 if within_budget and id_fixed else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# Benchmark: throughput of OpenAI vs a batched local model, per-turn routing and keepalive
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from config import settings
+from benchmarks.corpus import generate_messages
+from benchmarks.mock_openai import (MockCompletionState, MockLocalModelState, MockServer,
+                                    create_local_model_app, create_mock_app)
+
+# Open-ended questions that should stay on the hosted model
+COMPLEX_MESSAGES = [
+    "My father died without a will and my brother is living in the family house, who does the land belong to now?",
+    "Can you explain the difference between a deed and a title and which one my family needs to sell our land?",
+    "I was married in Trinidad and now live in Grenada, how do I get the marriage recognised here for my residency?",
+    "My name is spelled differently on my birth certificate and my passport, what problems will that cause and how do I fix it?",
+    "Compare registering a sole trader and a limited company for a small bakery in Grenville, including taxes."
+]
+
+def configure(openai_url: str, local_url: str, routing: str, parallel: int):
+    settings.OPENAI_API_KEY = "mock-key"
+    settings.OPENAI_BASE_URL = openai_url
+    settings.LOCAL_LLM_BASE_URL = local_url
+    settings.LOCAL_LLM_PARALLEL = parallel
+    settings.LLM_ROUTING = routing
+    settings.FAST_PATH_ENABLED = False
+    settings.RESPONSE_CACHE_ENABLED = False
+    settings.SEMANTIC_CACHE_ENABLED = False
+    settings.SUMMARY_ENABLED = False
+    settings.LLM_HEDGE_ENABLED = False
+
+def build_mix(requests: int, complex_ratio: float, seed: int = 7):
+    rng = random.Random(seed)
+    routine = generate_messages(requests, seed=seed)
+    return [rng.choice(COMPLEX_MESSAGES) if rng.random() < complex_ratio else message for message in routine]
+
+async def run_scenario(messages, routing: str, parallel: int, concurrency: int, openai_latency_ms: float) -> dict:
+    """
+    Push the message mix through LLMService with a fixed number of concurrent users
+    """
+    openai_state = MockCompletionState(latency_ms=openai_latency_ms)
+    local_state = MockLocalModelState(slots=parallel)
+    openai_server = MockServer(create_mock_app(openai_state)).start()
+    local_server = MockServer(create_local_model_app(local_state)).start()
+    configure(openai_server.base_url, local_server.base_url, routing, parallel)
+
+    from services.llm import LLMService
+    from services.rag import RAGService
+    service = LLMService(rag_service=RAGService())
+    queue = list(reversed(messages))
+    latencies, fallbacks = [], 0
+
+    async def user():
+        nonlocal fallbacks
+        while queue:
+            message = queue.pop()
+            started = time.perf_counter()
+            result = await service.generate_response(message)
+            latencies.append((time.perf_counter() - started) * 1000)
+            fallbacks += result["fallback"]
+
+    try:
+        await service.start()
+        started = time.perf_counter()
+        await asyncio.gather(*[user() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+        routed = dict(service.router.routed)
+    finally:
+        await service.close()
+        openai_server.stop()
+        local_server.stop()
+
+    latencies.sort()
+    return {
+        "throughput_rps": len(messages) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[int(len(latencies) * 0.95)],
+        "openai_calls": openai_state.total_requests,
+        # The warm-up ping is not a user turn
+        "local_calls": max(local_state.total_requests - 1, 0),
+        "local_batch_peak": local_state.peak_in_flight,
+        "routed": routed,
+        "fallbacks": fallbacks
+    }
+
+async def first_turn_after_idle(keepalive_seconds: float, idle_seconds: float) -> float:
+    """
+    Latency of a turn arriving after a quiet period, with or without the keepalive ping
+    """
+    local_state = MockLocalModelState(slots=4, idle_unload_seconds=idle_seconds / 2)
+    local_server = MockServer(create_local_model_app(local_state)).start()
+    configure("", local_server.base_url, "local", 4)
+    settings.OPENAI_API_KEY = ""
+    settings.LOCAL_LLM_KEEPALIVE_SECONDS = keepalive_seconds
+
+    from services.llm import LLMService
+    service = LLMService()
+    try:
+        await service.start()
+        await asyncio.sleep(idle_seconds)
+        started = time.perf_counter()
+        await service.generate_response("How much does a birth certificate cost?")
+        return (time.perf_counter() - started) * 1000
+    finally:
+        await service.close()
+        local_server.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI vs local model throughput, routing and keepalive")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--slots", type=int, default=4)
+    parser.add_argument("--complex-ratio", type=float, default=0.2)
+    parser.add_argument("--openai-latency-ms", type=float, default=800.0)
+    args = parser.parse_args()
+
+    messages = build_mix(args.requests, args.complex_ratio)
+    scenarios = {
+        "openai only": ("openai", args.slots),
+        "local, 1 slot": ("local", 1),
+        f"local, {args.slots} slots": ("local", args.slots),
+        "auto routing": ("auto", args.slots)
+    }
+    reports = {
+        name: asyncio.run(run_scenario(messages, routing, parallel, args.concurrency, args.openai_latency_ms))
+        for name, (routing, parallel) in scenarios.items()
+    }
+
+    print(f"🚀 {args.requests} turns, {args.concurrency} concurrent users, {args.complex_ratio:.0%} open-ended\n")
+    print(f"{'scenario':>16} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'openai':>7} {'local':>7} {'batch':>6} {'fallback':>9}")
+    for name, report in reports.items():
+        print(f"{name:>16} {report['throughput_rps']:8.1f} {report['p50_ms']:8.0f} {report['p95_ms']:8.0f} "
+              f"{report['openai_calls']:7d} {report['local_calls']:7d} {report['local_batch_peak']:6d} {report['fallbacks']:9d}")
+
+    cold_ms = asyncio.run(first_turn_after_idle(keepalive_seconds=0, idle_seconds=2.0))
+    warm_ms = asyncio.run(first_turn_after_idle(keepalive_seconds=0.25, idle_seconds=2.0))
+    print(f"\nFirst turn after 2s idle: {cold_ms:.0f} ms without keepalive, {warm_ms:.0f} ms with keepalive")
+
+    batched = reports[f"local, {args.slots} slots"]
+    auto = reports["auto routing"]
+    checks = {
+        "Batched slots raise local throughput": batched["throughput_rps"] > reports["local, 1 slot"]["throughput_rps"] * 1.5,
+        "Auto routing keeps open-ended turns on OpenAI": auto["openai_calls"] > 0,
+        "Auto routing moves routine turns off OpenAI": auto["openai_calls"] < reports["openai only"]["openai_calls"] / 2,
+        "No fallbacks": all(report["fallbacks"] == 0 for report in reports.values()),
+        "Keepalive avoids the cold load": warm_ms < cold_ms / 2
+    }
+    print()
+    for name, ok in checks.items():
+        print(f"{'✅' if ok else '❌'} {name}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+if __name__ == "__main__":
+    main()
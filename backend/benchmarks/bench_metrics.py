@@ -0,0 +1,88 @@
+# Benchmark: cost of the metrics layer per span, per chat turn and per scrape
+
+import argparse
+import asyncio
+import gc
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from config import settings
+from benchmarks.corpus import generate_messages
+from benchmarks.mock_openai import StubCompletionClient
+from utils.metrics import registry, span
+
+def span_cost_ns(iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        with span("bench"):
+            pass
+    return (time.perf_counter() - started) / iterations * 1e9
+
+async def turn_cost_us(messages) -> float:
+    """
+    Mean wall time of a chat turn against an instant stub completion
+    """
+    from services.history import InMemoryHistoryStore
+    from services.llm import LLMService
+    from services.rag import RAGService
+    service = LLMService(client=StubCompletionClient(), rag_service=RAGService(),
+                         history_store=InMemoryHistoryStore(max_sessions=100_000, max_turns=10, ttl_seconds=3600))
+    for message in messages[:200]:
+        await service.generate_response(message)
+    started = time.perf_counter()
+    for message in messages:
+        await service.generate_response(message)
+    elapsed = time.perf_counter() - started
+    await service.close()
+    return elapsed / len(messages) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Metrics overhead with scraping on and off")
+    parser.add_argument("--turns", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=6)
+    parser.add_argument("--max-overhead-us", type=float, default=50.0,
+                        help="Allowed extra time per chat turn; real turns wait hundreds of ms on the LLM")
+    args = parser.parse_args()
+
+    settings.OPENAI_API_KEY = "stub-key"
+    settings.RESPONSE_CACHE_ENABLED = False
+    settings.SEMANTIC_CACHE_ENABLED = False
+    settings.SUMMARY_ENABLED = False
+    messages = generate_messages(args.turns, seed=11)
+
+    # Rounds alternate between off and on so warm-up and drift hit both alike
+    spans, turns = {False: [], True: []}, {False: [], True: []}
+    for _ in range(args.rounds):
+        for enabled in (False, True):
+            registry.enabled = enabled
+            gc.collect()
+            spans[enabled].append(span_cost_ns(200_000))
+            turns[enabled].append(asyncio.run(turn_cost_us(messages)))
+    results = {enabled: (min(spans[enabled]), min(turns[enabled])) for enabled in (False, True)}
+
+    started = time.perf_counter()
+    body = registry.render()
+    render_ms = (time.perf_counter() - started) * 1000
+
+    print(f"🚀 {args.turns} chat turns per round, best of {args.rounds}\n")
+    print(f"{'metrics':>8} {'span ns':>9} {'turn µs':>9}")
+    for enabled, (spans, turns) in results.items():
+        print(f"{'on' if enabled else 'off':>8} {spans:9.0f} {turns:9.1f}")
+    overhead_us = results[True][1] - results[False][1]
+    print(f"\nTurn overhead with metrics on: {overhead_us:+.1f} µs ({overhead_us / results[False][1]:+.1%} of a stubbed turn)")
+    print(f"Scrape: {len(body.splitlines())} lines rendered in {render_ms:.2f} ms")
+
+    checks = {
+        "Disabled spans cost under 300 ns": results[False][0] < 300,
+        f"Enabled metrics add under {args.max_overhead_us:.0f} µs per turn": overhead_us < args.max_overhead_us
+    }
+    print()
+    for name, ok in checks.items():
+        print(f"{'✅' if ok else '❌'} {name}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# Benchmark: keyset vs OFFSET pagination of a session's messages on a large synthetic chat_messages table
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import create_engine, select, text
+from config import settings
+from services import db
+from services.messages import encode_cursor, fetch_message_page
+from database.models import ChatMessage
+
+DEEP_SESSION = "deep-session"
+INDEX_NAME = "ix_chat_messages_session_created"
+
+def build_table(path: str, rows: int, deep_rows: int, sessions: int, chunk: int = 100_000):
+    """
+    Bulk-load rows messages: deep_rows in one long session, the rest spread over `sessions` others.
+    The index is built once after loading, as ensure_indexes would on an existing table.
+    """
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as connection:
+        db.create_schema(connection)
+        connection.execute(text(f"DROP INDEX {INDEX_NAME}"))
+    engine.dispose()
+
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=OFF")
+    connection.execute("PRAGMA synchronous=OFF")
+    session_ids = [DEEP_SESSION] + [f"session-{i}" for i in range(sessions)]
+    connection.executemany("INSERT INTO chat_sessions (id, session_id, language_preference, is_active) VALUES (?, ?, 'en', 1)",
+                           [(session_id, session_id) for session_id in session_ids])
+    started = datetime(2026, 1, 1)
+    for offset in range(0, rows, chunk):
+        batch = []
+        for i in range(offset, min(offset + chunk, rows)):
+            session_id = DEEP_SESSION if i < deep_rows else session_ids[1 + i % sessions]
+            # Pairs of messages share a timestamp, so ties on created_at are exercised
+            created_at = (started + timedelta(seconds=i // 2)).strftime("%Y-%m-%d %H:%M:%S.%f")
+            batch.append((session_id, "user" if i % 2 == 0 else "bot", f"Synthetic message {i}", created_at))
+        connection.executemany("INSERT INTO chat_messages (session_id, message_type, content, language, confidence, "
+                               "created_at) VALUES (?, ?, ?, 'en', 1.0, ?)", batch)
+    connection.commit()
+    connection.close()
+
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as connection:
+        db.ensure_indexes(connection)
+    engine.dispose()
+
+def count_rows(path: str) -> int:
+    if not os.path.exists(path):
+        return 0
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute("SELECT count(*) FROM chat_messages").fetchone()[0]
+    except sqlite3.Error:
+        return 0
+    finally:
+        connection.close()
+
+async def median_ms(make_call, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await make_call()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+async def run(args) -> list:
+    settings.DATABASE_URL = f"sqlite:///{args.db}"
+    factory = db.get_async_session_factory()
+    results = []
+    async with factory() as session:
+        for page in args.pages:
+            offset = (page - 1) * args.page_size
+            if offset >= args.deep_rows:
+                continue
+            cursor = None
+            if offset:
+                # The cursor a client would hold after reading the previous pages
+                created_at, message_id = (await session.execute(
+                    select(ChatMessage.created_at, ChatMessage.id)
+                    .where(ChatMessage.session_id == DEEP_SESSION)
+                    .order_by(ChatMessage.created_at, ChatMessage.id)
+                    .offset(offset - 1).limit(1)
+                )).one()
+                cursor = encode_cursor(created_at, message_id)
+
+            async def keyset():
+                messages, _ = await fetch_message_page(session, DEEP_SESSION, args.page_size, cursor)
+                assert messages, page
+
+            async def offset_page():
+                rows = (await session.execute(
+                    select(ChatMessage)
+                    .where(ChatMessage.session_id == DEEP_SESSION)
+                    .order_by(ChatMessage.created_at, ChatMessage.id)
+                    .offset(offset).limit(args.page_size + 1)
+                )).scalars().all()
+                assert rows, page
+
+            await keyset()
+            await offset_page()
+            results.append({
+                "page": page,
+                "offset": offset,
+                "keyset_ms": await median_ms(keyset, args.repeat),
+                "offset_ms": await median_ms(offset_page, args.repeat)
+            })
+    await db.dispose_engines()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyset vs OFFSET pagination over a large chat_messages table")
+    parser.add_argument("--rows", type=int, default=5_000_000, help="Total rows in chat_messages")
+    parser.add_argument("--deep-rows", type=int, default=500_000, help="Rows in the one long session that is paged")
+    parser.add_argument("--sessions", type=int, default=50_000, help="Sessions sharing the remaining rows")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--pages", type=int, nargs="*", default=[1, 10, 100, 1000, 5000, 9999])
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--db", help="Reuse or create the synthetic database at this path")
+    parser.add_argument("--max-ratio", type=float, default=3.0,
+                        help="Allowed keyset latency of the deepest page over the first")
+    args = parser.parse_args()
+
+    temporary = None
+    if args.db is None:
+        temporary = tempfile.TemporaryDirectory()
+        args.db = os.path.join(temporary.name, "pagination.db")
+    if count_rows(args.db) != args.rows:
+        if os.path.exists(args.db):
+            os.remove(args.db)
+        print(f"Building {args.rows:,} rows in {args.db} ...")
+        started = time.perf_counter()
+        build_table(args.db, args.rows, min(args.deep_rows, args.rows), args.sessions)
+        print(f"Built in {time.perf_counter() - started:.0f}s\n")
+
+    results = asyncio.run(run(args))
+    if temporary is not None:
+        temporary.cleanup()
+
+    print(f"🚀 {args.rows:,} messages, paging a {args.deep_rows:,}-message session {args.page_size} at a time\n")
+    print(f"{'page':>6} {'offset':>9} {'keyset ms':>10} {'OFFSET ms':>10}")
+    for result in results:
+        print(f"{result['page']:>6} {result['offset']:>9,} {result['keyset_ms']:10.2f} {result['offset_ms']:10.2f}")
+
+    first, deepest = results[0], results[-1]
+    print(f"\nDeepest page: keyset {deepest['keyset_ms'] / first['keyset_ms']:.1f}x the first page, "
+          f"OFFSET {deepest['offset_ms'] / first['offset_ms']:.1f}x")
+    checks = {
+        f"Keyset latency stays within {args.max_ratio:.0f}x of the first page":
+            deepest["keyset_ms"] <= first["keyset_ms"] * args.max_ratio,
+        "Keyset beats OFFSET on the deepest page": deepest["keyset_ms"] < deepest["offset_ms"]
+    }
+    print()
+    for name, ok in checks.items():
+        print(f"{'✅' if ok else '❌'} {name}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+if __name__ == "__main__":
+    main()
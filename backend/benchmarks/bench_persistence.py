@@ -0,0 +1,92 @@
+# Benchmark: write-behind batching vs a commit per chat row on SQLite
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from services.persistence import ChatPersistenceQueue
+from database.models import Base, ChatSession, ChatMessage
+
+def make_engine(path: str):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    return engine
+
+def make_session_factory(path: str) -> sessionmaker:
+    return sessionmaker(bind=make_engine(path), expire_on_commit=False)
+
+def make_async_session_factory(path: str) -> async_sessionmaker:
+    # The queue writes through the async engine, as in the app
+    make_engine(path).dispose()
+    return async_sessionmaker(bind=create_async_engine(f"sqlite+aiosqlite:///{path}"), expire_on_commit=False)
+
+def make_turns(rows: int, sessions: int):
+    session_ids = [str(uuid.uuid4()) for _ in range(sessions)]
+    return [
+        (session_ids[i % sessions], "user" if i % 2 == 0 else "bot", f"Message {i} about my birth paper")
+        for i in range(rows)
+    ]
+
+def bench_per_request_commit(path: str, turns) -> float:
+    """
+    The naive path: one session lookup, insert and commit per row
+    """
+    factory = make_session_factory(path)
+    started = time.perf_counter()
+    for session_id, message_type, content in turns:
+        with factory() as db:
+            if db.query(ChatSession).filter(ChatSession.session_id == session_id).first() is None:
+                db.add(ChatSession(session_id=session_id))
+            db.add(ChatMessage(session_id=session_id, message_type=message_type, content=content))
+            db.commit()
+    return time.perf_counter() - started
+
+async def bench_write_behind(path: str, turns, batch_size: int, flush_interval_ms: float) -> float:
+    factory = make_async_session_factory(path)
+    queue = ChatPersistenceQueue(
+        batch_size=batch_size,
+        flush_interval_ms=flush_interval_ms,
+        max_queue_size=len(turns) + 1,
+        session_factory=factory
+    )
+    await queue.start()
+    started = time.perf_counter()
+    for session_id, message_type, content in turns:
+        await queue.record_message(session_id, message_type, content)
+    await queue.stop()
+    elapsed = time.perf_counter() - started
+    assert queue.rows_written == len(turns), queue.stats()
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Chat persistence throughput on SQLite")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--flush-interval-ms", type=float, default=250.0)
+    args = parser.parse_args()
+
+    turns = make_turns(args.rows, args.sessions)
+    with tempfile.TemporaryDirectory() as tmp:
+        per_request = bench_per_request_commit(os.path.join(tmp, "per_request.db"), turns)
+        write_behind = asyncio.run(bench_write_behind(
+            os.path.join(tmp, "write_behind.db"), turns, args.batch_size, args.flush_interval_ms
+        ))
+
+    print(f"🚀 Persisting {args.rows} rows across {args.sessions} sessions\n")
+    print(f"{'per-request commit':>20}: {args.rows / per_request:>10.0f} rows/sec ({per_request:.2f}s)")
+    print(f"{'write-behind queue':>20}: {args.rows / write_behind:>10.0f} rows/sec ({write_behind:.2f}s)")
+    print(f"\nSpeedup: {per_request / write_behind:.1f}x")
+
+if __name__ == "__main__":
+    main()
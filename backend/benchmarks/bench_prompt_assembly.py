@@ -0,0 +1,80 @@
+# Benchmark: prompt tokens per request with token-budgeted assembly vs history slicing
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from config import settings
+from benchmarks.corpus import generate_messages
+from services.prompt import TOKENS_PER_MESSAGE, TOKENS_PER_REPLY, PromptAssembler, TokenCounter
+from services.rag import RAGService
+
+# A typical grounded answer, long enough that history dominates unbounded prompts
+ASSISTANT_REPLY = (
+    "To get this document, visit the Civil Registry Office at the Ministerial Complex, Botanical "
+    "Gardens, St. George's. Bring a valid photo ID, the completed application form and any "
+    "supporting records such as a hospital record or marriage license. The fee is usually between "
+    "EC$20 and EC$30 and processing takes 3-5 business days. You can call +1 (473) 440-2251 or "
+    "email civilregistry@gov.gd if you have questions, Monday to Friday from 8:00 AM to 4:00 PM."
+)
+
+SYSTEM_PROMPT = "You are NutmegAI, a helpful AI assistant for Grenadians seeking help with legal registry documents."
+
+def prompt_tokens(counter: TokenCounter, messages) -> int:
+    return sum(counter.count(m["content"]) + TOKENS_PER_MESSAGE for m in messages) + TOKENS_PER_REPLY
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt tokens per request and assembly time")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=8)
+    parser.add_argument("--budget", type=int, default=settings.PROMPT_TOKEN_BUDGET)
+    args = parser.parse_args()
+
+    from services.llm import LLMService
+    system_prompt = LLMService._build_system_prompt(None, "en", False)
+
+    counter = TokenCounter()
+    assembler = PromptAssembler(RAGService(), token_budget=args.budget, counter=counter)
+    messages = generate_messages(args.sessions * args.turns, seed=3)
+
+    tokens = {"full history": [], "last 5 messages": [], "assembled": []}
+    assembly_us = []
+    over_budget = 0
+    for session in range(args.sessions):
+        history = []
+        for turn in range(args.turns):
+            message = messages[session * args.turns + turn]
+            user = {"role": "user", "content": message}
+            base = [{"role": "system", "content": system_prompt}]
+            tokens["full history"].append(prompt_tokens(counter, base + history + [user]))
+            tokens["last 5 messages"].append(prompt_tokens(counter, base + history[-5:] + [user]))
+
+            started = time.perf_counter()
+            prompt = assembler.assemble(system_prompt, history, message)
+            assembly_us.append((time.perf_counter() - started) * 1e6)
+            tokens["assembled"].append(prompt.prompt_tokens)
+            over_budget += prompt.prompt_tokens > args.budget
+
+            history += [user, {"role": "assistant", "content": ASSISTANT_REPLY}]
+
+    print(f"🚀 {args.sessions} sessions x {args.turns} turns, tokenizer={counter.name}, budget={args.budget}\n")
+    print(f"{'strategy':>16} {'mean':>8} {'p95':>8} {'max':>8}")
+    for name, values in tokens.items():
+        print(f"{name:>16} {statistics.mean(values):8.1f} {percentile(values, 0.95):8.0f} {max(values):8.0f}")
+    saved = 1 - statistics.mean(tokens["assembled"]) / statistics.mean(tokens["full history"])
+    print(f"\nInput tokens saved vs full history: {saved:.1%}")
+    print(f"Assembly time: mean {statistics.mean(assembly_us):.1f} µs, p95 {percentile(assembly_us, 0.95):.1f} µs")
+
+    print("\n✅ Every prompt within budget" if over_budget == 0 else f"\n❌ {over_budget} prompts over budget")
+    sys.exit(0 if over_budget == 0 else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# Benchmark: BM25 inverted index vs the original linear scan in search_documents
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from services.knowledge_base import SEARCH_FIELD_BOOSTS
+from services.rag import RAGService
+from services.search_index import BM25Index
+
+QUERIES = [
+    "how much does a birth certificate cost",
+    "passport photos and national id",
+    "where do I register my business",
+    "property deed survey plan",
+    "voter registration polling division",
+    "death certificate funeral director statement"
+]
+
+def make_corpus(size: int, seed: int = 3) -> dict:
+    """
+    Grow the real knowledge base into a larger synthetic one by shuffling field content
+    """
+    rng = random.Random(seed)
+    base = list(RAGService().document_knowledge.values())
+    vocabulary = sorted({word for doc in base for word in doc["information"].split()})
+    corpus = {}
+    for i in range(size):
+        template = base[i % len(base)]
+        filler = " ".join(rng.choice(vocabulary) for _ in range(20))
+        corpus[f"doc_{i}"] = {
+            "information": f"{template['information']} {filler}",
+            "requirements": rng.sample(template["requirements"], len(template["requirements"])),
+            "process_steps": rng.sample(template["process_steps"], len(template["process_steps"])),
+            "contact_info": template["contact_info"]
+        }
+    return corpus
+
+def legacy_search(corpus: dict, search_query: str) -> list:
+    """
+    The original per-call scan, kept here as the baseline
+    """
+    results = []
+    query_lower = search_query.lower()
+    for doc_type, info in corpus.items():
+        relevance_score = 0
+        if any(term in info["information"].lower() for term in query_lower.split()):
+            relevance_score += 2
+        for req in info["requirements"]:
+            if any(term in req.lower() for term in query_lower.split()):
+                relevance_score += 1
+        for step in info["process_steps"]:
+            if any(term in step.lower() for term in query_lower.split()):
+                relevance_score += 1
+        if relevance_score > 0:
+            results.append({"document_type": doc_type, "relevance_score": relevance_score})
+    results.sort(key=lambda x: x["relevance_score"], reverse=True)
+    return results[:5]
+
+def time_per_query(func, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for query in QUERIES:
+            func(query)
+    return (time.perf_counter() - started) / (repeat * len(QUERIES)) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Knowledge-base search latency vs corpus size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print("🚀 search_documents latency per query\n")
+    print(f"{'docs':>8} {'build ms':>10} {'linear ms':>10} {'bm25 ms':>10} {'speedup':>8}")
+    for size in args.sizes:
+        corpus = make_corpus(size)
+        started = time.perf_counter()
+        index = BM25Index.build({
+            doc_id: {
+                "title": "",
+                "information": info["information"],
+                "requirements": " ".join(info["requirements"]),
+                "process_steps": " ".join(info["process_steps"])
+            }
+            for doc_id, info in corpus.items()
+        }, SEARCH_FIELD_BOOSTS)
+        build_ms = (time.perf_counter() - started) * 1000
+        linear_ms = time_per_query(lambda q: legacy_search(corpus, q), args.repeat)
+        bm25_ms = time_per_query(lambda q: index.search(q, k=5), args.repeat)
+        print(f"{size:>8} {build_ms:>10.1f} {linear_ms:>10.3f} {bm25_ms:>10.3f} {linear_ms / bm25_ms:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
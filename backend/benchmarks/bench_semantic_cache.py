@@ -0,0 +1,70 @@
+# Benchmark: semantic cache lookup latency as the index grows
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import numpy as np
+
+from services.semantic_cache import SemanticCache
+
+TOPICS = ["birth certificate", "death certificate", "marriage certificate", "passport", "national id",
+          "business registration", "property deed", "voter registration", "tax documents", "divorce decree"]
+ASKS = ["how much does a {} cost", "where do I go for a {}", "what do I need for a {}",
+        "how long does a {} take", "can I get a {} online", "who signs the {} form"]
+
+def make_questions(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [
+        f"{rng.choice(ASKS).format(rng.choice(TOPICS))} ref {rng.randrange(1_000_000)}"
+        for _ in range(count)
+    ]
+
+def bench(entries: int, lookups: int, dim: int, mmap: bool) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "semantic") if mmap else None
+        cache = SemanticCache(capacity=entries, threshold=0.8, dim=dim, path=path)
+        
+        started = time.perf_counter()
+        for question in make_questions(entries):
+            cache.add(question, "en:default", "cached answer")
+        fill_s = time.perf_counter() - started
+        
+        probes = make_questions(lookups, seed=11)
+        timings = []
+        for probe in probes:
+            started = time.perf_counter()
+            cache.lookup(probe, "en:default")
+            timings.append((time.perf_counter() - started) * 1000)
+        del cache
+
+    timings = np.array(timings)
+    return {
+        "entries": entries,
+        "fill_s": fill_s,
+        "p50_ms": float(np.percentile(timings, 50)),
+        "p95_ms": float(np.percentile(timings, 95)),
+        "p99_ms": float(np.percentile(timings, 99))
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Semantic cache lookup latency")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--mmap", action="store_true", help="Back the index with a memory-mapped file")
+    args = parser.parse_args()
+
+    print(f"🚀 Semantic cache lookup latency (dim={args.dim}, mmap={args.mmap})\n")
+    print(f"{'entries':>10} {'fill s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for size in args.sizes:
+        r = bench(size, args.lookups, args.dim, args.mmap)
+        print(f"{r['entries']:>10} {r['fill_s']:>8.2f} {r['p50_ms']:>8.3f} {r['p95_ms']:>8.3f} {r['p99_ms']:>8.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# Benchmark: compiled single-pass translate_creole vs the original re.sub loop
+
+import argparse
+import asyncio
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from benchmarks.corpus import generate_messages
+from utils.helpers import CREOLE_TRANSLATIONS, translate_creole, translate_creole_batch
+
+def legacy_translate_creole(text: str, target_language: str = "en") -> str:
+    """
+    The original implementation: one re.sub per dictionary entry, applied in sequence
+    """
+    direction = {"en": "creole_to_en", "en-GD": "en_to_creole"}.get(target_language)
+    if direction is None:
+        return text
+    translated = text
+    for source, target in CREOLE_TRANSLATIONS[direction].items():
+        translated = re.sub(r'\b' + re.escape(source) + r'\b', target, translated, flags=re.IGNORECASE)
+    return translated
+
+def time_calls(func, texts, target_language: str) -> float:
+    started = time.perf_counter()
+    for text in texts:
+        func(text, target_language)
+    return time.perf_counter() - started
+
+async def bench_endpoints(texts) -> tuple:
+    """
+    In-process strings/sec: one /translate request per string vs a single /translate/batch call
+    """
+    import httpx
+    from config import settings
+    settings.PERSISTENCE_ENABLED = False
+    settings.OPENAI_API_KEY = settings.OPENAI_API_KEY or "bench"
+    from app.main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        started = time.perf_counter()
+        for text in texts:
+            await client.post(f"{settings.API_V1_STR}/chatbot/translate", params={"message": text})
+        single = len(texts) / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        response = await client.post(f"{settings.API_V1_STR}/chatbot/translate/batch", json={"texts": texts})
+        batch = len(texts) / (time.perf_counter() - started)
+        assert response.json()["count"] == len(texts)
+    return single, batch
+
+def main():
+    parser = argparse.ArgumentParser(description="translate_creole throughput")
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--long-kb", type=int, nargs="+", default=[1, 10, 100])
+    args = parser.parse_args()
+
+    print("🔍 Sequential re-replacement fixed:")
+    for text in ["good morning", "Good evening, how are you?"]:
+        print(f"   {text!r}: {legacy_translate_creole(text, 'en-GD')!r} -> {translate_creole(text, 'en-GD')!r}")
+
+    messages = generate_messages(args.messages, seed=5)
+    print(f"\n🚀 Short messages ({args.messages:,})")
+    for target in ("en", "en-GD"):
+        legacy = time_calls(legacy_translate_creole, messages, target)
+        current = time_calls(translate_creole, messages, target)
+        print(f"   -> {target:<6} loop {legacy / args.messages * 1e6:7.1f} µs/msg   "
+              f"single pass {current / args.messages * 1e6:6.1f} µs/msg   ({legacy / current:.1f}x)")
+
+    print("\n🚀 Long inputs")
+    for kb in args.long_kb:
+        text = ""
+        for message in generate_messages(kb * 20, seed=9):
+            if len(text) >= kb * 1024:
+                break
+            text += message + " "
+        legacy = time_calls(legacy_translate_creole, [text] * 5, "en") / 5
+        current = time_calls(translate_creole, [text] * 5, "en") / 5
+        print(f"   {kb:>4} KB   loop {legacy * 1000:8.2f} ms   single pass {current * 1000:8.2f} ms   ({legacy / current:.1f}x)")
+
+    print("\n🚀 Batch API")
+    started = time.perf_counter()
+    translate_creole_batch(messages, "en")
+    batch = time.perf_counter() - started
+    print(f"   translate_creole_batch: {args.messages / batch:,.0f} strings/sec")
+
+    single, batch = asyncio.run(bench_endpoints(messages[:2000]))
+    print("\n🚀 HTTP endpoints (in-process, 2,000 strings)")
+    print(f"   /translate per string: {single:>10,.0f} strings/sec")
+    print(f"   /translate/batch:      {batch:>10,.0f} strings/sec ({batch / single:.0f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# Harness: identical concurrent questions share one upstream completion
+
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from config import settings
+from benchmarks.mock_openai import StubCompletionClient
+
+# The same question as typed by different listeners after a radio announcement
+VARIANTS = [
+    "Tell me about the new birth certificate rules announced on the radio",
+    "tell me about the new birth certificate rules announced on the radio!",
+    "Tell me about the new birth certificate rules announced on the radio?",
+    "  TELL ME ABOUT THE NEW BIRTH CERTIFICATE RULES ANNOUNCED ON THE RADIO  "
+]
+
+def new_service(latency_ms: float, response_cache: bool):
+    settings.OPENAI_API_KEY = "stub-key"
+    settings.FAST_PATH_ENABLED = False
+    settings.SEMANTIC_CACHE_ENABLED = False
+    settings.SUMMARY_ENABLED = False
+    settings.COALESCE_ENABLED = True
+    settings.RESPONSE_CACHE_ENABLED = response_cache
+
+    from services.llm import LLMService
+    from services.rag import RAGService
+    client = StubCompletionClient(latency_ms=latency_ms)
+    return LLMService(client=client, rag_service=RAGService()), client
+
+async def burst(service, users: int, language: str = "en", session_prefix: str = "burst"):
+    return await asyncio.gather(*[
+        service.generate_response(VARIANTS[i % len(VARIANTS)], language=language, session_id=f"{session_prefix}-{i}")
+        for i in range(users)
+    ])
+
+async def run(users: int, latency_ms: float) -> dict:
+    report = {}
+
+    # Coalescing alone: one burst, caches off
+    service, client = new_service(latency_ms, response_cache=False)
+    results = await burst(service, users)
+    report["burst_upstream_calls"] = len(client.calls)
+    report["burst_answers"] = sum(1 for r in results if not r["fallback"])
+    report["coalesced"] = service.single_flight.stats()["coalesced"]
+    await service.close()
+
+    # Combined with the response cache: a second burst after the first is served from it
+    service, client = new_service(latency_ms, response_cache=True)
+    await burst(service, users)
+    await burst(service, users, session_prefix="late")
+    report["two_bursts_upstream_calls"] = len(client.calls)
+    report["cache_hits"] = service.response_cache.stats()["hits"]
+
+    # Different language or an ongoing conversation must not share an answer
+    await burst(service, 2, language="en-GD", session_prefix="creole")
+    await service.generate_response("What documents do I need?", session_id="burst-0")
+    report["calls_after_other_language_and_history"] = len(client.calls)
+    await service.close()
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-flight coalescing of identical concurrent questions")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.users, args.latency_ms))
+    print(f"🚀 {args.users} concurrent users asking the same question\n")
+    for key, value in report.items():
+        print(f"{key:>38}: {value}")
+
+    checks = {
+        "One upstream call for the whole burst": report["burst_upstream_calls"] == 1,
+        "Every user got the answer": report["burst_answers"] == args.users,
+        "Followers were coalesced": report["coalesced"] == args.users - 1,
+        "Later bursts are served by the response cache": report["two_bursts_upstream_calls"] == 1,
+        "Other languages and ongoing sessions are not shared": report["calls_after_other_language_and_history"] == 3
+    }
+    print()
+    for name, ok in checks.items():
+        print(f"{'✅' if ok else '❌'} {name}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# Harness: retries, circuit breaker and hedging against a fault-injecting mock server
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from config import settings
+from benchmarks.mock_openai import MockCompletionState, MockServer, create_mock_app
+
+# Conversational enough to skip the fast path, specific enough for a degraded answer
+MESSAGE = "Tell me about getting a birth certificate for my grandmother ({})"
+
+def configure(base_url: str, **overrides):
+    settings.OPENAI_API_KEY = "mock-key"
+    settings.OPENAI_BASE_URL = base_url
+    settings.RESPONSE_CACHE_ENABLED = False
+    settings.SEMANTIC_CACHE_ENABLED = False
+    settings.SUMMARY_ENABLED = False
+    for key, value in overrides.items():
+        setattr(settings, key, value)
+
+def new_service():
+    from services.llm import LLMService
+    from services.rag import RAGService
+    return LLMService(rag_service=RAGService())
+
+def is_fallback(result) -> bool:
+    return result["fallback"]
+
+async def timed(service, text: str):
+    started = time.perf_counter()
+    result = await service.generate_response(text)
+    return result, (time.perf_counter() - started) * 1000
+
+async def flaky(requests: int, error_rate: float) -> dict:
+    """
+    Transient 503s: success rate without and with jittered retries
+    """
+    report = {}
+    for retries in (0, 2):
+        state = MockCompletionState(latency_ms=20, error_rate=error_rate, seed=1)
+        server = MockServer(create_mock_app(state)).start()
+        configure(server.base_url, LLM_MAX_RETRIES=retries, LLM_RETRY_BACKOFF_BASE_MS=10,
+                  BREAKER_FAILURE_THRESHOLD=10_000, LLM_HEDGE_ENABLED=False)
+        service = new_service()
+        try:
+            results = await asyncio.gather(*[service.generate_response(MESSAGE.format(i)) for i in range(requests)])
+        finally:
+            await service.close()
+            server.stop()
+        report[f"success_rate_retries_{retries}"] = 1 - sum(map(is_fallback, results)) / requests
+    return report
+
+async def outage(requests: int, recovery_seconds: float) -> dict:
+    """
+    Upstream hangs past the timeout: the breaker opens, later calls fast-fail, then recovers
+    """
+    state = MockCompletionState(latency_ms=20, slow_rate=1.0, slow_ms=3000, seed=2)
+    server = MockServer(create_mock_app(state)).start()
+    configure(server.base_url, OPENAI_TIMEOUT_SECONDS=0.5, LLM_MAX_RETRIES=0, BREAKER_FAILURE_THRESHOLD=5,
+              BREAKER_RECOVERY_SECONDS=recovery_seconds, LLM_HEDGE_ENABLED=False)
+    service = new_service()
+    try:
+        latencies, degraded = [], 0
+        for i in range(requests):
+            result, elapsed_ms = await timed(service, MESSAGE.format(i))
+            latencies.append(elapsed_ms)
+            degraded += result["response"].startswith(service.fast_path.DEGRADED_NOTICE)
+        open_stats = service.resilience.stats()["breaker"]
+        upstream_during_outage = state.total_requests
+
+        # Upstream comes back; after the recovery period one probe closes the breaker
+        state.slow_rate = 0.0
+        await asyncio.sleep(recovery_seconds)
+        result, _ = await timed(service, MESSAGE.format("recovered"))
+        closed_state = service.resilience.stats()["breaker"]["state"]
+    finally:
+        await service.close()
+        server.stop()
+    threshold = settings.BREAKER_FAILURE_THRESHOLD
+    return {
+        "breaker_state_during_outage": open_stats["state"],
+        "upstream_calls_during_outage": upstream_during_outage,
+        "mean_ms_before_open": statistics.mean(latencies[:threshold]),
+        "mean_ms_while_open": statistics.mean(latencies[threshold:]),
+        "degraded_answers": degraded,
+        "breaker_state_after_recovery": closed_state,
+        "recovered_answer_from_llm": not is_fallback(result)
+    }
+
+async def tail_latency(requests: int, concurrency: int, warmup: int = 40) -> dict:
+    """
+    3% of calls are 20x slower: p99 without and with hedging, after a warm-up that
+    gives the hedge its latency percentile
+    """
+    report = {}
+    for hedging in (False, True):
+        state = MockCompletionState(latency_ms=50, slow_rate=0.03, slow_ms=1000, seed=3)
+        server = MockServer(create_mock_app(state)).start()
+        configure(server.base_url, OPENAI_TIMEOUT_SECONDS=5, LLM_MAX_RETRIES=0, BREAKER_FAILURE_THRESHOLD=10_000,
+                  LLM_HEDGE_ENABLED=hedging, LLM_HEDGE_MIN_SAMPLES=20, LLM_HEDGE_MIN_DELAY_MS=100)
+        service = new_service()
+        latencies = []
+        try:
+            for start in range(0, requests, concurrency):
+                batch = await asyncio.gather(*[
+                    timed(service, MESSAGE.format(i)) for i in range(start, min(start + concurrency, requests))
+                ])
+                latencies.extend(elapsed_ms for _, elapsed_ms in batch)
+            stats = service.resilience.stats()
+        finally:
+            await service.close()
+            server.stop()
+        label = "hedged" if hedging else "plain"
+        latencies = sorted(latencies[warmup:])
+        report[f"p50_ms_{label}"] = latencies[len(latencies) // 2]
+        report[f"p99_ms_{label}"] = latencies[int(len(latencies) * 0.99)]
+        report[f"upstream_calls_{label}"] = state.total_requests
+        if hedging:
+            report["hedges_sent"] = stats["hedges_sent"]
+            report["hedges_won"] = stats["hedges_won"]
+    return report
+
+def print_report(title: str, report: dict):
+    print(f"\n🚀 {title}")
+    for key, value in report.items():
+        print(f"{key:>32}: {value:.3f}" if isinstance(value, float) else f"{key:>32}: {value}")
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM resilience harness with fault injection")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--error-rate", type=float, default=0.3)
+    parser.add_argument("--recovery-seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    flaky_report = asyncio.run(flaky(args.requests, args.error_rate))
+    print_report(f"Transient errors ({args.error_rate:.0%} of calls return 503)", flaky_report)
+    outage_report = asyncio.run(outage(20, args.recovery_seconds))
+    print_report("Outage (upstream hangs past the timeout)", outage_report)
+    tail_report = asyncio.run(tail_latency(args.requests * 2, concurrency=10))
+    print_report("Tail latency (3% of calls take 1s)", tail_report)
+
+    checks = {
+        "Retries recover transient errors": flaky_report["success_rate_retries_2"] > flaky_report["success_rate_retries_0"],
+        "Breaker opens during an outage": outage_report["breaker_state_during_outage"] == "open",
+        "Open breaker fast-fails": outage_report["mean_ms_while_open"] < 50,
+        "Fallbacks answer from the knowledge base": outage_report["degraded_answers"] == 20,
+        "Breaker closes after recovery": outage_report["breaker_state_after_recovery"] == "closed",
+        "Hedging cuts p99 latency": tail_report["p99_ms_hedged"] < tail_report["p99_ms_plain"]
+    }
+    print()
+    for name, ok in checks.items():
+        print(f"{'✅' if ok else '❌'} {name}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# Harness: rolling conversation summaries with a stub completion client
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from config import settings
+from benchmarks.mock_openai import StubCompletionClient
+from services.prompt import SUMMARY_HEADER
+
+# A user pasting a long form is what makes raw history expensive
+LONG_FORM = " ".join(["My mother's full name, date of birth, parish and previous address are on the form."] * 12)
+
+STUB_SUMMARY = "The user is applying for a birth certificate for their mother and has shared her details."
+
+def is_summary_request(kwargs) -> bool:
+    return kwargs["messages"][0]["content"].startswith("Summarize this conversation")
+
+def responder(kwargs) -> str:
+    if is_summary_request(kwargs):
+        return STUB_SUMMARY
+    return "Bring the completed form, a valid ID and the EC$25.00 fee to the Civil Registry Office."
+
+async def make_sql_store(path: str, flush_interval_ms: float):
+    """
+    SQLHistoryStore on a fresh SQLite file, appending through the write-behind queue
+    """
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from services.db import create_schema
+    from services.history import SQLHistoryStore
+    from services.persistence import ChatPersistenceQueue
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as connection:
+        await connection.run_sync(create_schema)
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    writer = ChatPersistenceQueue(flush_interval_ms=flush_interval_ms, session_factory=factory)
+    await writer.start()
+    return SQLHistoryStore(max_turns=50, ttl_seconds=3600, session_factory=factory, writer=writer), engine
+
+async def run(turns: int, summary_latency_ms: float, think_ms: float, history: str = "memory",
+              flush_interval_ms: float = 50.0) -> dict:
+    settings.OPENAI_API_KEY = "stub-key"
+    settings.FAST_PATH_ENABLED = False
+    settings.RESPONSE_CACHE_ENABLED = False
+    settings.SEMANTIC_CACHE_ENABLED = False
+
+    from services.history import InMemoryHistoryStore
+    from services.llm import LLMService
+    from services.rag import RAGService
+
+    client = StubCompletionClient(responder=responder)
+    engine = None
+    if history == "sql":
+        tmp = tempfile.TemporaryDirectory()
+        store, engine = await make_sql_store(os.path.join(tmp.name, "history.db"), flush_interval_ms)
+    else:
+        store = InMemoryHistoryStore(max_sessions=10, max_turns=50, ttl_seconds=3600)
+    service = LLMService(client=client, history_store=store, rag_service=RAGService())
+
+    # Summaries are slow on purpose: the chat turns must not wait for them
+    original_create = client.chat.completions.create
+    async def create(**kwargs):
+        if is_summary_request(kwargs):
+            await asyncio.sleep(summary_latency_ms / 1000)
+        return await original_create(**kwargs)
+    client.chat.completions.create = create
+
+    session_id = "summary-harness"
+    turn_ms = []
+    transcript = []
+    full_history_tokens = 0
+    for turn in range(turns):
+        message = LONG_FORM if turn % 3 == 0 else f"What else do I need for the birth certificate? ({turn})"
+        started = time.perf_counter()
+        result = await service.generate_response(message, session_id=session_id)
+        turn_ms.append((time.perf_counter() - started) * 1000)
+        transcript += [("user", message), ("assistant", result["response"])]
+        full_history_tokens += service.token_counter.count(message) + service.token_counter.count(result["response"])
+        # The user reads the answer before typing again
+        await asyncio.sleep(think_ms / 1000)
+    await service.summarizer.close()
+
+    chat_calls = [call for call in client.calls if not is_summary_request(call)]
+    prompt_tokens = [
+        sum(service.token_counter.count(m["content"]) for m in call["messages"]) for call in chat_calls
+    ]
+    history, summary = await store.get_context(session_id)
+    raw = [(message["role"], message["content"]) for message in history]
+    if engine is not None:
+        await store.writer.stop()
+        await engine.dispose()
+        tmp.cleanup()
+    last_prompt = chat_calls[-1]["messages"]
+    return {
+        "turns": turns,
+        "summary_calls": len(client.calls) - len(chat_calls),
+        "summarizer": service.summarizer.stats(),
+        "raw_messages_left": len(history),
+        # Nothing summarized may come back, and nothing unsummarized may be skipped
+        "raw_is_transcript_tail": raw == transcript[len(transcript) - len(raw):],
+        "keep_messages": service.summarizer.keep_messages,
+        "summary_stored": summary == STUB_SUMMARY,
+        "summary_in_prompt": any(m["content"].startswith(SUMMARY_HEADER) for m in last_prompt),
+        "max_turn_ms": max(turn_ms),
+        "prompt_tokens_first_half": max(prompt_tokens[:turns // 2]),
+        "prompt_tokens_last": prompt_tokens[-1],
+        "full_history_tokens": full_history_tokens
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Rolling summary harness with a stub completion client")
+    parser.add_argument("--turns", type=int, default=12)
+    parser.add_argument("--summary-latency-ms", type=float, default=200.0)
+    parser.add_argument("--think-ms", type=float, default=100.0)
+    parser.add_argument("--history", choices=["memory", "sql"], default="memory")
+    parser.add_argument("--flush-interval-ms", type=float, default=50.0,
+                        help="Write-behind flush interval of the sql history; above the summary latency, "
+                             "summaries race rows still queued")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.turns, args.summary_latency_ms, args.think_ms, args.history, args.flush_interval_ms))
+    print(f"🔍 Rolling summary harness ({args.history} history)\n")
+    for key, value in report.items():
+        print(f"{key:>26}: {value:.1f}" if isinstance(value, float) else f"{key:>26}: {value}")
+
+    checks = {
+        "Older turns were summarized": report["summarizer"]["completed"] > 0,
+        "Summary stored with the session": report["summary_stored"],
+        "Summary prepended to later prompts": report["summary_in_prompt"],
+        "Raw turns replaced by the summary": report["raw_messages_left"] < args.turns * 2,
+        "Raw turns continue where the summary stops": report["raw_is_transcript_tail"],
+        "Newest turns kept raw": report["raw_messages_left"] >= report["keep_messages"],
+        "Turns never waited for a summary": report["max_turn_ms"] < args.summary_latency_ms,
+        "Prompt stays within the token budget": report["prompt_tokens_last"] <= settings.PROMPT_TOKEN_BUDGET
+    }
+    print()
+    for name, ok in checks.items():
+        print(f"{'✅' if ok else '❌'} {name}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+if __name__ == "__main__":
+    main()
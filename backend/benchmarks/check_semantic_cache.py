@@ -0,0 +1,103 @@
+# Harness: semantic cache threshold against paraphrases and near-miss questions
+
+import argparse
+import itertools
+import os
+import sys
+from collections import defaultdict
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from config import settings
+from benchmarks.corpus import labelled_questions
+from services.cache import normalize_message
+from services.semantic_cache import SemanticCache
+from utils.helpers import extract_legal_intent
+
+# Must be answered from each other's cache entry
+PARAPHRASES = [
+    ("birth paper cost?", "how much is a birth certificate"),
+    ("How much does a passport cost?", "passport price"),
+    ("voter card requirements?", "What documents do I need for a voter card?"),
+    ("how long it take to get marriage paper", "How long does the marriage certificate take?")
+]
+
+# Similar wording, different answer
+NEAR_MISSES = [
+    ("birth paper cost?", "death paper cost?"),
+    ("how much is a birth certificate", "how much is a death certificate"),
+    ("how much is a birth certificate", "how much is a marriage certificate"),
+    ("how much is a birth certificate", "where do I get a birth certificate"),
+    ("How much does a passport cost?", "How long does a passport take?"),
+    ("what do I need for a passport", "what do I need for a national ID card")
+]
+
+def partition(text: str) -> str:
+    # Same key LLMService._prepare_turn gives a first turn with the default prompt
+    intent = extract_legal_intent(normalize_message(text))
+    return f"en:default:{intent['document_type']}:{intent['action']}"
+
+def similarity(cache: SemanticCache, a: str, b: str) -> float:
+    embed = cache.embedder.embed
+    return float(embed(normalize_message(a)) @ embed(normalize_message(b)))
+
+def cache_hit(threshold: float, cached: str, asked: str) -> bool:
+    cache = SemanticCache(capacity=8, threshold=threshold)
+    cache.add(normalize_message(cached), partition(cached), "answer")
+    return cache.lookup(normalize_message(asked), partition(asked)) is not None
+
+def check_corpus(cache: SemanticCache):
+    """
+    Score every pair of corpus questions that share a cache partition
+    """
+    partitions = defaultdict(list)
+    for text, label in labelled_questions():
+        normalized = normalize_message(text)
+        partitions[partition(text)].append((cache.embedder.embed(normalized), label))
+    false_hits, worst_miss, paraphrases, recalled = 0, 0.0, 0, 0
+    for entries in partitions.values():
+        for (a, label_a), (b, label_b) in itertools.combinations(entries, 2):
+            score = float(a @ b)
+            if label_a == label_b:
+                paraphrases += 1
+                recalled += score >= cache.threshold
+            else:
+                worst_miss = max(worst_miss, score)
+                false_hits += score >= cache.threshold
+    return false_hits, worst_miss, paraphrases, recalled
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the semantic cache threshold")
+    parser.add_argument("--threshold", type=float, default=settings.SEMANTIC_CACHE_THRESHOLD)
+    args = parser.parse_args()
+
+    cache = SemanticCache(capacity=1, threshold=args.threshold)
+    ok = True
+    print(f"Threshold {args.threshold:.2f}")
+
+    print("\nParaphrases (should hit):")
+    for a, b in PARAPHRASES:
+        hit = cache_hit(args.threshold, a, b)
+        ok &= hit
+        print(f"  {'✅' if hit else '❌'} {similarity(cache, a, b):.3f}  {a!r} ~ {b!r}")
+
+    print("\nDifferent questions (should miss):")
+    for a, b in NEAR_MISSES:
+        score = similarity(cache, a, b)
+        # Below the threshold on the embedding alone, not only because the intent partition differs
+        miss = score < args.threshold and not cache_hit(args.threshold, a, b)
+        ok &= miss
+        print(f"  {'✅' if miss else '❌'} {score:.3f}  {a!r} vs {b!r}")
+
+    false_hits, worst_miss, paraphrases, recalled = check_corpus(cache)
+    print("\nCorpus questions sharing a partition:")
+    print(f"  {'✅' if false_hits == 0 else '❌'} {false_hits} different questions above the threshold "
+          f"(closest {worst_miss:.3f})")
+    print(f"  🚀 {recalled}/{paraphrases} paraphrases answered from the cache")
+    ok &= false_hits == 0
+
+    print("\n✅ Semantic cache threshold holds" if ok else "\n❌ Semantic cache threshold check failed")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# Reproducible corpus of English and Grenadian Creole chat messages
+
+import random
+from typing import List, Tuple
+
+# Hand-written cases covering punctuation, casing, overlaps and near-miss words
+GOLDEN_MESSAGES = [
+    "Good mornin, I need help with birth paper",
+    "How much does a passport cost?",
+    "How yuh doin? I want to know about property papers",
+    "what's happening with my application",
+    "What is happening with my registration?",
+    "wha happen, yuh have de tings?",
+    "Thank you, please send the certificate",
+    "GOOD MORNING! HOW ARE YOU",
+    "how  much it cost\tfor a voter card",
+    "Is there enough time? No, not really",
+    "Did my ID card arrive? Is it valid?",
+    "I'm liming with the gyal and bwoy",
+    "where i go for tax paper",
+    "what’s happening",
+    "good-mornin",
+    "how much's the fee",
+    "",
+    "   ",
+    "!!!",
+    "excuse me, what to bring for the death paper?",
+    "Irie! Everything good, thank you",
+    "i need to register business quick, it urgent",
+    "business paper and government paper",
+    "evening all, how long it take for marriage paper?"
+]
+
+_ENGLISH_TEMPLATES = [
+    "How much does a {doc} cost?",
+    "What documents do I need for a {doc}?",
+    "Where do I go to apply for a {doc}?",
+    "How long does the {doc} process take?",
+    "Good morning, I would like information about the {doc} application.",
+    "Please tell me the steps to get a {doc}.",
+    "Thank you. What is the phone number for the {doc} office?",
+    "Is there an urgent option for a {doc}? I need it fast."
+]
+
+_CREOLE_TEMPLATES = [
+    "Good mornin, how much it cost for {paper}?",
+    "How yuh doin, wah I need for {paper}?",
+    "Wha happen, where i go for {paper}?",
+    "Yuh know how long it take to get {paper}?",
+    "I want to get {paper} but nah have de tings",
+    "Mornin, de gyal need {paper} quick",
+    "Nuff people say {paper} hard to get, how to do it?",
+    "Bwoy, I need {paper}, where to go?"
+]
+
+_DOCUMENTS = ["birth certificate", "death certificate", "marriage certificate", "passport",
+              "national ID card", "voter card", "property deed", "business registration",
+              "divorce decree", "tax documents"]
+
+_PAPERS = ["birth paper", "death paper", "marriage paper", "passport", "id card", "voter card",
+           "property paper", "business paper", "divorce paper", "tax paper"]
+
+_FILLERS = ["", " please", " asap", " for my mother", " in St. George's", " before election",
+            " again", " today", " for my son who was born last week"]
+
+def generate_messages(count: int, seed: int = 42, creole_ratio: float = 0.5) -> List[str]:
+    """
+    Build a deterministic mix of English and Creole messages
+    """
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        if rng.random() < creole_ratio:
+            text = rng.choice(_CREOLE_TEMPLATES).format(paper=rng.choice(_PAPERS))
+        else:
+            text = rng.choice(_ENGLISH_TEMPLATES).format(doc=rng.choice(_DOCUMENTS))
+        text += rng.choice(_FILLERS)
+        if rng.random() < 0.1:
+            text = text.upper()
+        elif rng.random() < 0.2:
+            text = text.lower()
+        messages.append(text)
+    return messages
+
+def golden_corpus(count: int = 2000, seed: int = 42) -> List[str]:
+    return GOLDEN_MESSAGES + generate_messages(count, seed)
+
+# The first templates of each language ask the same four questions: cost, requirements, where, how long
+_SHARED_QUESTIONS = 4
+
+def labelled_questions() -> List[Tuple[str, Tuple[str, int]]]:
+    """
+    Every template/document question with a label that is equal only for paraphrases
+    """
+    questions = []
+    for index, template in enumerate(_ENGLISH_TEMPLATES):
+        questions.extend((template.format(doc=doc), (f"en{index}", d)) for d, doc in enumerate(_DOCUMENTS))
+    for index, template in enumerate(_CREOLE_TEMPLATES):
+        kind = f"en{index}" if index < _SHARED_QUESTIONS else f"gd{index}"
+        questions.extend((template.format(paper=paper), (kind, d)) for d, paper in enumerate(_PAPERS))
+    return questions
@@ -0,0 +1,64 @@
+# Load test: concurrent LLMService calls against a local mock completion server
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from config import settings
+from benchmarks.mock_openai import MockCompletionState, MockServer, create_mock_app
+
+async def run_load(requests: int, latency_ms: float) -> dict:
+    """
+    Fire concurrent chats through LLMService and measure how many overlapped upstream
+    """
+    state = MockCompletionState(latency_ms=latency_ms)
+    server = MockServer(create_mock_app(state)).start()
+
+    settings.OPENAI_API_KEY = "mock-key"
+    settings.OPENAI_BASE_URL = server.base_url
+
+    from services.llm import LLMService
+    service = LLMService()
+
+    try:
+        started = time.perf_counter()
+        results = await asyncio.gather(*[
+            service.generate_response(f"How do I get a birth certificate? ({i})")
+            for i in range(requests)
+        ])
+        elapsed = time.perf_counter() - started
+    finally:
+        await service.close()
+        server.stop()
+
+    return {
+        "requests": requests,
+        "latency_ms": latency_ms,
+        "elapsed_s": elapsed,
+        "sequential_estimate_s": requests * latency_ms / 1000,
+        "peak_in_flight": state.peak_in_flight,
+        "upstream_requests": state.total_requests,
+        "fallbacks": sum(1 for r in results if r["fallback"])
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="LLMService concurrency load test")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=500.0)
+    args = parser.parse_args()
+
+    print("🚀 LLMService concurrency load test\n")
+    report = asyncio.run(run_load(args.requests, args.latency_ms))
+    for key, value in report.items():
+        print(f"{key:>22}: {value:.3f}" if isinstance(value, float) else f"{key:>22}: {value}")
+
+    overlapped = report["peak_in_flight"] > 1 and report["elapsed_s"] < report["sequential_estimate_s"] / 2
+    print("\n✅ In-flight requests overlapped" if overlapped else "\n❌ Requests were serialized")
+    sys.exit(0 if overlapped else 1)
+
+if __name__ == "__main__":
+    main()
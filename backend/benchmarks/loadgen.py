@@ -0,0 +1,403 @@
+# Load generator: drives the app in-process or over HTTP against a mock OpenAI server
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from config import settings
+from benchmarks.corpus import generate_messages
+from benchmarks.mock_openai import MockCompletionState, MockServer, create_mock_app, find_free_port
+
+API = "/api/v1/chatbot"
+
+DOCUMENT_QUERIES = ["what do I need", "how much does it cost", "how long does it take", "where do I go",
+                    "what are the steps", "requirements please"]
+
+class RequestMix:
+    """
+    Weighted choice of request kinds, parsed from e.g. "chat=0.6,document=0.25,translate=0.15"
+    """
+    KINDS = ("chat", "chat_stream", "document", "translate")
+
+    def __init__(self, spec: str, rng: random.Random):
+        self.weights = {}
+        for part in spec.split(","):
+            kind, _, weight = part.partition("=")
+            kind = kind.strip()
+            if kind not in self.KINDS:
+                raise ValueError(f"Unknown request kind {kind!r}, expected one of {', '.join(self.KINDS)}")
+            self.weights[kind] = float(weight or 1)
+        self.rng = rng
+
+    def choose(self) -> str:
+        return self.rng.choices(list(self.weights), weights=list(self.weights.values()))[0]
+
+class LoadGenerator:
+    """
+    Sends the mix through one HTTP client and records latency per request kind.
+    Chat turns continue an earlier session with probability followup_ratio.
+    Stream TTFB is only recorded when measure_ttfb is set: in-process, ASGITransport
+    hands over the body once the response is complete, so it would equal full latency.
+    """
+    def __init__(self, client: httpx.AsyncClient, mix: RequestMix, messages: List[str], rng: random.Random,
+                 followup_ratio: float, unique: bool, measure_ttfb: bool = True):
+        self.client = client
+        self.measure_ttfb = measure_ttfb
+        self.mix = mix
+        self.messages = messages
+        self.rng = rng
+        self.followup_ratio = followup_ratio
+        self.unique = unique
+        self.sessions: List[str] = []
+        self.sequence = 0
+        self.records: List[Dict] = []
+        self.measure_from = 0.0
+
+    def _message(self) -> str:
+        self.sequence += 1
+        message = self.rng.choice(self.messages)
+        # Distinct text defeats the response caches when sizing for cold traffic
+        return f"{message} (ref {self.sequence})" if self.unique else message
+
+    def _session(self) -> Optional[str]:
+        if self.sessions and self.rng.random() < self.followup_ratio:
+            return self.rng.choice(self.sessions)
+        return None
+
+    async def send(self, kind: str, scheduled: float):
+        record = {"kind": kind, "ok": False, "fallback": False, "ttfb_ms": None}
+        try:
+            if kind == "chat":
+                response = await self.client.post(f"{API}/chat", json={
+                    "message": self._message(), "language": "auto", "session_id": self._session()
+                })
+                record["ok"] = response.status_code == 200
+                if record["ok"]:
+                    body = response.json()
+                    record["fallback"] = body.get("fallback", False)
+                    self._remember(body["session_id"])
+            elif kind == "chat_stream":
+                await self._stream(record, scheduled)
+            elif kind == "document":
+                document_type = self.rng.choice(settings.LEGAL_CATEGORIES)
+                response = await self.client.post(f"{API}/documents/{document_type}", json={
+                    "document_type": document_type, "query": self.rng.choice(DOCUMENT_QUERIES), "language": "en"
+                })
+                record["ok"] = response.status_code == 200
+            else:
+                response = await self.client.post(f"{API}/translate", params={
+                    "message": self.rng.choice(self.messages), "target_language": self.rng.choice(["en", "en-GD"])
+                })
+                record["ok"] = response.status_code == 200
+        except httpx.HTTPError as e:
+            record["error"] = type(e).__name__
+        finished = time.perf_counter()
+        # Measured from the scheduled arrival, so queueing in front of the app counts
+        record["latency_ms"] = (finished - scheduled) * 1000
+        if scheduled >= self.measure_from:
+            self.records.append(record)
+
+    async def _stream(self, record: Dict, scheduled: float):
+        async with self.client.stream("POST", f"{API}/chat/stream", json={
+            "message": self._message(), "language": "auto", "session_id": self._session()
+        }) as response:
+            record["ok"] = response.status_code == 200
+            event = None
+            async for line in response.aiter_lines():
+                if record["ttfb_ms"] is None and self.measure_ttfb:
+                    record["ttfb_ms"] = (time.perf_counter() - scheduled) * 1000
+                if line.startswith("event: "):
+                    event = line[7:]
+                elif line.startswith("data: ") and event == "done":
+                    body = json.loads(line[6:])
+                    record["fallback"] = body.get("fallback", False)
+                    self._remember(body["session_id"])
+
+    def _remember(self, session_id: str):
+        if len(self.sessions) < 1000:
+            self.sessions.append(session_id)
+
+    async def closed_loop(self, concurrency: int, deadline: float, limit: Optional[int]):
+        """
+        `concurrency` users, each sending its next request as soon as the last one returns
+        """
+        sent = 0
+
+        async def user():
+            nonlocal sent
+            while time.perf_counter() < deadline and (limit is None or sent < limit):
+                sent += 1
+                await self.send(self.mix.choose(), time.perf_counter())
+
+        await asyncio.gather(*[user() for _ in range(concurrency)])
+
+    async def open_loop(self, rate: float, deadline: float, limit: Optional[int]):
+        """
+        Poisson arrivals at `rate` per second, independent of how fast the app answers
+        """
+        tasks = set()
+        sent = 0
+        next_arrival = time.perf_counter()
+        while next_arrival < deadline and (limit is None or sent < limit):
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(self.send(self.mix.choose(), next_arrival))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            sent += 1
+            next_arrival += self.rng.expovariate(rate)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+def summarize(records: List[Dict], elapsed: float) -> Dict:
+    latencies = sorted(record["latency_ms"] for record in records)
+    errors = sum(1 for record in records if not record["ok"])
+    chats = [record for record in records if record["kind"] in ("chat", "chat_stream")]
+    ttfb = sorted(record["ttfb_ms"] for record in records if record["ttfb_ms"] is not None)
+    summary = {
+        "requests": len(records),
+        "throughput_rps": round(len(records) / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(errors / len(records), 4) if records else 0.0,
+        "fallback_rate": round(sum(record["fallback"] for record in chats) / len(chats), 4) if chats else None
+    }
+    if latencies:
+        summary.update({f"p{int(q * 100)}_ms": round(percentile(latencies, q), 1) for q in (0.5, 0.9, 0.95, 0.99)})
+        summary["max_ms"] = round(latencies[-1], 1)
+    if ttfb:
+        summary["ttfb_p95_ms"] = round(percentile(ttfb, 0.95), 1)
+    return summary
+
+def create_schema(database_url: str):
+    """
+    Create the tables once up front; uvicorn workers starting together would
+    otherwise race each other through create_all on a fresh database
+    """
+    from sqlalchemy import create_engine
+    from services.db import create_schema, sync_database_url
+    engine = create_engine(sync_database_url(database_url))
+    with engine.begin() as connection:
+        create_schema(connection)
+    engine.dispose()
+
+class AppUnderTest:
+    """
+    The app in-process through ASGITransport (lifespan included), as a uvicorn
+    subprocess with the given worker count, or an already running server at `url`
+    """
+    def __init__(self, mode: str, url: Optional[str], workers: int, overrides: Dict):
+        self.mode = mode
+        self.url = url
+        self.workers = workers
+        self.overrides = overrides
+        self.process = None
+        self._lifespan = None
+
+    async def __aenter__(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        timeout = httpx.Timeout(120.0)
+        if self.mode == "inprocess":
+            # Chat services are built when the routes are imported, so settings go first
+            for key, value in self.overrides.items():
+                setattr(settings, key, value)
+            from app.main import app
+            self.app = app
+            await self._send_lifespan("startup")
+            self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadgen",
+                                            limits=limits, timeout=timeout)
+            return self.client
+        if self.url is None:
+            port = find_free_port()
+            self.url = f"http://127.0.0.1:{port}"
+            if "DATABASE_URL" in self.overrides:
+                create_schema(self.overrides["DATABASE_URL"])
+            env = {key: str(value).lower() if isinstance(value, bool) else str(value)
+                   for key, value in self.overrides.items()}
+            self.process = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+                 "--workers", str(self.workers), "--log-level", "warning"],
+                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                env={**os.environ, **env}
+            )
+            await self._wait_ready()
+        self.client = httpx.AsyncClient(base_url=self.url, limits=limits, timeout=timeout)
+        return self.client
+
+    async def _wait_ready(self, timeout: float = 60.0):
+        deadline = time.perf_counter() + timeout
+        async with httpx.AsyncClient(base_url=self.url) as probe:
+            while time.perf_counter() < deadline:
+                if self.process.poll() is not None:
+                    raise RuntimeError("uvicorn exited during startup")
+                try:
+                    if (await probe.get("/health")).status_code == 200:
+                        return
+                except httpx.HTTPError:
+                    pass
+                await asyncio.sleep(0.2)
+        raise RuntimeError(f"{self.url} did not become healthy within {timeout:.0f}s")
+
+    async def _send_lifespan(self, phase: str):
+        if self._lifespan is None:
+            inbox, outbox = asyncio.Queue(), asyncio.Queue()
+            scope = {"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}
+            self._lifespan = (inbox, outbox, asyncio.create_task(self.app(scope, inbox.get, outbox.put)))
+        inbox, outbox, task = self._lifespan
+        await inbox.put({"type": f"lifespan.{phase}"})
+        message = await outbox.get()
+        if not message["type"].endswith(".complete"):
+            raise RuntimeError(f"App {phase} failed: {message.get('message')}")
+        if phase == "shutdown":
+            await task
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+        if self.mode == "inprocess":
+            await self._send_lifespan("shutdown")
+        if self.process is not None:
+            self.process.terminate()
+            self.process.wait(timeout=10)
+
+async def run(args) -> Dict:
+    rng = random.Random(args.seed)
+    mix = RequestMix(args.mix, rng)
+    messages = generate_messages(2000, seed=args.seed)
+
+    mock_state = server = None
+    overrides = {}
+    if args.url is None:
+        mock_state = MockCompletionState(latency_ms=args.llm_latency_ms, token_delay_ms=args.llm_token_delay_ms,
+                                         error_rate=args.llm_error_rate, slow_rate=args.llm_slow_rate,
+                                         slow_ms=args.llm_slow_ms, seed=args.seed)
+        server = MockServer(create_mock_app(mock_state)).start()
+        overrides = {
+            "OPENAI_API_KEY": "mock-key",
+            "OPENAI_BASE_URL": server.base_url,
+            "DATABASE_URL": args.database_url or f"sqlite:///{tempfile.mkdtemp(prefix='loadgen-')}/loadgen.db",
+            "PERSISTENCE_ENABLED": args.persistence
+        }
+
+    try:
+        async with AppUnderTest(args.mode, args.url, args.workers, overrides) as client:
+            generator = LoadGenerator(client, mix, messages, rng, args.followup_ratio, args.unique,
+                                      measure_ttfb=args.mode == "http" or args.url is not None)
+            started = time.perf_counter()
+            generator.measure_from = started + args.warmup
+            deadline = started + args.warmup + args.duration
+            limit = args.requests
+            if args.rate:
+                await generator.open_loop(args.rate, deadline, limit)
+            else:
+                await generator.closed_loop(args.concurrency, deadline, limit)
+            elapsed = time.perf_counter() - max(generator.measure_from, started)
+            health = None
+            try:
+                health = (await client.get("/health")).json()
+            except Exception:
+                pass
+    finally:
+        if server is not None:
+            server.stop()
+
+    records = generator.records
+    report = {
+        "config": {
+            "mode": args.mode if args.url is None else f"http {args.url}",
+            "workers": args.workers if args.mode == "http" and args.url is None else None,
+            "load": f"{args.rate}/s open loop" if args.rate else f"{args.concurrency} concurrent users",
+            "mix": mix.weights,
+            "llm_latency_ms": args.llm_latency_ms,
+            "llm_error_rate": args.llm_error_rate
+        },
+        "overall": summarize(records, elapsed),
+        "by_kind": {kind: summarize([r for r in records if r["kind"] == kind], elapsed) for kind in mix.weights}
+    }
+    if mock_state is not None:
+        report["upstream"] = {
+            "requests": mock_state.total_requests,
+            "peak_in_flight": mock_state.peak_in_flight,
+            "errors_injected": mock_state.errors_injected
+        }
+    if health is not None:
+        report["breaker"] = health.get("llm", {}).get("breaker", {}).get("state")
+    return report
+
+def print_summary(name: str, summary: Dict):
+    latency = " ".join(f"{key[:-3]}={summary[key]:.0f}" for key in ("p50_ms", "p95_ms", "p99_ms", "max_ms") if key in summary)
+    fallback = f" fallback={summary['fallback_rate']:.1%}" if summary.get("fallback_rate") is not None else ""
+    ttfb = f" ttfb_p95={summary['ttfb_p95_ms']:.0f}" if "ttfb_p95_ms" in summary else ""
+    print(f"{name:>12}: {summary['requests']:6d} req {summary['throughput_rps']:8.1f} req/s "
+          f"errors={summary['error_rate']:.1%}{fallback}  ms: {latency}{ttfb}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Capacity-planning load generator for the NutmegAI API")
+    parser.add_argument("--mode", choices=["inprocess", "http"], default="inprocess",
+                        help="ASGI app in this process, or a uvicorn subprocess (or --url) over HTTP")
+    parser.add_argument("--url", help="Drive an already running server instead of starting one")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for --mode http")
+    parser.add_argument("--concurrency", type=int, default=20, help="Closed-loop users when --rate is not set")
+    parser.add_argument("--rate", type=float, help="Open-loop arrivals per second")
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds of traffic excluded from the results")
+    parser.add_argument("--requests", type=int, help="Stop after this many requests")
+    parser.add_argument("--mix", default="chat=0.6,document=0.25,translate=0.15",
+                        help="Weights for chat, chat_stream, document and translate")
+    parser.add_argument("--followup-ratio", type=float, default=0.3, help="Chats continuing an earlier session")
+    parser.add_argument("--unique", action="store_true", help="Make every chat message distinct to bypass caches")
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0)
+    parser.add_argument("--llm-token-delay-ms", type=float, default=20.0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-slow-rate", type=float, default=0.0)
+    parser.add_argument("--llm-slow-ms", type=float, default=5000.0)
+    parser.add_argument("--persistence", action="store_true", help="Keep write-behind persistence on")
+    parser.add_argument("--database-url", help="Defaults to a throwaway SQLite file")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--p95-slo-ms", type=float, help="Fail when overall p95 latency exceeds this")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    config = report["config"]
+    print(f"🚀 {config['mode']}, {config['load']}, mix {config['mix']}, "
+          f"mock LLM {config['llm_latency_ms']:.0f} ms / {config['llm_error_rate']:.0%} errors\n")
+    print_summary("overall", report["overall"])
+    for kind, summary in report["by_kind"].items():
+        if summary["requests"]:
+            print_summary(kind, summary)
+    if "chat_stream" in report["config"]["mix"] and args.mode == "inprocess" and args.url is None:
+        print("\nStream TTFB not reported in-process (the ASGI transport buffers bodies); use --mode http")
+    if "upstream" in report:
+        upstream = report["upstream"]
+        print(f"\nUpstream: {upstream['requests']} completions, peak {upstream['peak_in_flight']} in flight, "
+              f"{upstream['errors_injected']} injected errors; breaker {report.get('breaker')}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+    overall = report["overall"]
+    checks = {f"Error rate at most {args.max_error_rate:.1%}": overall["error_rate"] <= args.max_error_rate}
+    if args.p95_slo_ms:
+        checks[f"p95 within {args.p95_slo_ms:.0f} ms"] = overall.get("p95_ms", float("inf")) <= args.p95_slo_ms
+    print()
+    for name, ok in checks.items():
+        print(f"{'✅' if ok else '❌'} {name}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+if __name__ == "__main__":
+    main()
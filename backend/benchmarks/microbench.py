@@ -0,0 +1,211 @@
+# Microbenchmarks: NLP helpers and RAG lookups with ops/sec, allocations and baseline comparison
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from config import settings
+from benchmarks.corpus import generate_messages
+from benchmarks.mock_openai import StubCompletionClient
+from utils.helpers import detect_language, extract_legal_intent, translate_creole
+from utils.metrics import registry
+
+def run_sync(coroutine):
+    """
+    Drive a coroutine that never suspends without an event loop, so async lookups
+    are timed without scheduler overhead
+    """
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    coroutine.close()
+    raise RuntimeError("benchmarked coroutine suspended")
+
+def build_cases(messages):
+    """
+    Name -> (function of one input, inputs)
+    """
+    from services.llm import LLMService
+    from services.rag import RAGService
+    settings.OPENAI_API_KEY = settings.OPENAI_API_KEY or "bench-key"
+    rag_service = RAGService()
+    llm_service = LLMService(client=StubCompletionClient(), rag_service=rag_service)
+    document_types = sorted(rag_service.document_knowledge)
+    lookups = [(document_types[i % len(document_types)], message) for i, message in enumerate(messages)]
+    return {
+        "detect_language": (detect_language, messages),
+        "translate_creole.to_en": (lambda text: translate_creole(text, "en"), messages),
+        "translate_creole.to_creole": (lambda text: translate_creole(text, "en-GD"), messages),
+        "extract_legal_intent": (extract_legal_intent, messages),
+        "rag.get_document_info": (lambda lookup: run_sync(rag_service.get_document_info(*lookup)), lookups),
+        "rag.search_documents": (lambda text: run_sync(rag_service.search_documents(text)), messages),
+        "llm._detect_creole": (llm_service._detect_creole, messages)
+    }
+
+def time_case(func, inputs, min_time: float, repeat: int) -> dict:
+    """
+    Calls per second over whole passes of the corpus, best and median of `repeat` runs.
+    The garbage collector is paused so a collection does not land in one run only.
+    """
+    gc.collect()
+    gc.disable()
+    try:
+        return _time_case(func, inputs, min_time, repeat)
+    finally:
+        gc.enable()
+
+def _time_case(func, inputs, min_time: float, repeat: int) -> dict:
+    passes = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(passes):
+            for value in inputs:
+                func(value)
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        passes *= 2
+    rates = [passes * len(inputs) / elapsed]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(passes):
+            for value in inputs:
+                func(value)
+        rates.append(passes * len(inputs) / (time.perf_counter() - started))
+    best = max(rates)
+    return {
+        "ops_per_sec": round(best, 1),
+        "median_ops_per_sec": round(statistics.median(rates), 1),
+        "ns_per_op": round(1e9 / best, 1)
+    }
+
+def measure_allocations(func, inputs, calls: int) -> dict:
+    """
+    tracemalloc view of one call: bytes allocated at its peak, and bytes and blocks
+    still held afterwards (caches, usage counters)
+    """
+    for value in inputs[:calls]:
+        func(value)  # Warm caches so only steady-state allocations are counted
+    tracemalloc.start()
+    try:
+        start_bytes = tracemalloc.get_traced_memory()[0]
+        start_blocks = len(tracemalloc.take_snapshot().traces)
+        # A running total rather than a list, so the bookkeeping itself retains nothing
+        peak_total = 0
+        for i in range(calls):
+            value = inputs[i % len(inputs)]
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            func(value)
+            peak_total += tracemalloc.get_traced_memory()[1] - before
+        end_bytes = tracemalloc.get_traced_memory()[0]
+        end_blocks = len(tracemalloc.take_snapshot().traces)
+    finally:
+        tracemalloc.stop()
+    return {
+        "peak_bytes_per_call": round(peak_total / calls, 1),
+        "retained_bytes_per_call": round((end_bytes - start_bytes) / calls, 1),
+        "retained_blocks_per_call": round((end_blocks - start_blocks) / calls, 3)
+    }
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), timeout=5).stdout.strip() or "unknown"
+    except Exception:
+        return "unknown"
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Cases whose throughput fell, or whose peak allocation grew, by more than threshold
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        change = current["ops_per_sec"] / previous["ops_per_sec"] - 1
+        if change < -threshold:
+            regressions.append(f"{name}: {change:+.1%} ops/sec")
+        # A few bytes of interpreter noise are not a regression
+        grown = current["peak_bytes_per_call"] - previous["peak_bytes_per_call"]
+        if grown > 64 and grown > previous["peak_bytes_per_call"] * threshold:
+            regressions.append(f"{name}: peak allocation {previous['peak_bytes_per_call']:.0f} -> "
+                               f"{current['peak_bytes_per_call']:.0f} bytes/call")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the NLP helpers and RAG service")
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per timed run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--alloc-calls", type=int, default=500)
+    parser.add_argument("--only", nargs="*", help="Run only cases whose name starts with one of these")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against a JSON file from an earlier --output run")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed regression as a fraction")
+    args = parser.parse_args()
+
+    messages = generate_messages(args.messages, seed=args.seed)
+    cases = build_cases(messages)
+    if args.only:
+        cases = {name: case for name, case in cases.items() if name.startswith(tuple(args.only))}
+
+    print(f"🚀 {len(messages)} generated messages (seed {args.seed}), best of {args.repeat} runs\n")
+    print(f"{'case':>28} {'ops/sec':>12} {'ns/op':>9} {'peak B/call':>12} {'kept B/call':>12}")
+    results = {}
+    for name, (func, inputs) in cases.items():
+        result = time_case(func, inputs, args.min_time, args.repeat)
+        result.update(measure_allocations(func, inputs, args.alloc_calls))
+        results[name] = result
+        print(f"{name:>28} {result['ops_per_sec']:12,.0f} {result['ns_per_op']:9.0f} "
+              f"{result['peak_bytes_per_call']:12.0f} {result['retained_bytes_per_call']:12.1f}")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "messages": len(messages),
+            "seed": args.seed,
+            "metrics_enabled": registry.enabled
+        },
+        "results": results
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if not args.baseline:
+        sys.exit(0)
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    print(f"\n🔍 Against baseline {baseline['meta'].get('commit', '?')} ({baseline['meta'].get('timestamp', '?')}), "
+          f"threshold {args.threshold:.0%}")
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is not None:
+            print(f"{name:>28} {current['ops_per_sec'] / previous['ops_per_sec'] - 1:+8.1%}")
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"❌ {regression}")
+    if not regressions:
+        print("✅ No regressions beyond the threshold")
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+# Local mock of the OpenAI chat completions API for load tests
+
+import asyncio
+import random
+import socket
+import threading
+import time
+import uuid
+from typing import Optional
+
+import json
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+MOCK_CONTENT = "Visit the Civil Registry Office in St. George's with your documents and the fee."
+
+class MockCompletionState:
+    """
+    Counters shared between the mock server and the harness driving it.
+    Faults: error_rate of requests fail with error_status, slow_rate take slow_ms.
+    """
+    def __init__(self, latency_ms: float = 500.0, token_delay_ms: float = 20.0, error_rate: float = 0.0,
+                 error_status: int = 503, slow_rate: float = 0.0, slow_ms: float = 0.0, seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.token_delay_ms = token_delay_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.random = random.Random(seed)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_requests = 0
+        self.errors_injected = 0
+
+    def next_latency_ms(self) -> float:
+        return self.slow_ms if self.slow_rate and self.random.random() < self.slow_rate else self.latency_ms
+
+    def should_fail(self) -> bool:
+        return bool(self.error_rate) and self.random.random() < self.error_rate
+
+def create_mock_app(state: MockCompletionState) -> FastAPI:
+    """
+    Build an app that answers /v1/chat/completions after a fixed delay
+    """
+    app = FastAPI(title="Mock OpenAI")
+
+    async def stream_chunks(model: str, include_usage: bool):
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        state.in_flight += 1
+        state.peak_in_flight = max(state.peak_in_flight, state.in_flight)
+        try:
+            await asyncio.sleep(state.next_latency_ms() / 1000)
+            for i, word in enumerate(MOCK_CONTENT.split(" ")):
+                token = word if i == 0 else " " + word
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(state.token_delay_ms / 1000)
+            if include_usage:
+                # As with stream_options.include_usage upstream: a last chunk with no choices
+                words = len(MOCK_CONTENT.split(" "))
+                chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                         "model": model, "choices": [],
+                         "usage": {"prompt_tokens": 0, "completion_tokens": words, "total_tokens": words}}
+                yield f"data: {json.dumps(chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+        finally:
+            state.in_flight -= 1
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        state.total_requests += 1
+        if state.should_fail():
+            state.errors_injected += 1
+            return JSONResponse(status_code=state.error_status, content={
+                "error": {"message": "Injected fault", "type": "server_error", "code": None}
+            })
+        if body.get("stream"):
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+            return StreamingResponse(stream_chunks(body.get("model", "mock"), include_usage),
+                                     media_type="text/event-stream")
+
+        state.in_flight += 1
+        state.peak_in_flight = max(state.peak_in_flight, state.in_flight)
+        try:
+            await asyncio.sleep(state.next_latency_ms() / 1000)
+        finally:
+            state.in_flight -= 1
+
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": MOCK_CONTENT},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        }
+
+    return app
+
+class MockLocalModelState:
+    """
+    A CPU model server in the style of llama.cpp: up to `slots` sequences decode
+    together, each step costing step_ms plus batch_overhead per extra sequence, and
+    further requests wait for a slot. After idle_unload_seconds without traffic the
+    model is paged out and the next request pays load_ms to bring it back.
+    """
+    def __init__(self, slots: int = 4, prefill_ms: float = 40.0, step_ms: float = 8.0, completion_tokens: int = 32,
+                 batch_overhead: float = 0.15, load_ms: float = 1500.0, idle_unload_seconds: float = 5.0):
+        self.slots = slots
+        self.prefill_ms = prefill_ms
+        self.step_ms = step_ms
+        self.completion_tokens = completion_tokens
+        self.batch_overhead = batch_overhead
+        self.load_ms = load_ms
+        self.idle_unload_seconds = idle_unload_seconds
+        self.total_requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.cold_loads = 0
+        self.last_active = time.monotonic()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._load_lock: Optional[asyncio.Lock] = None
+
+    async def _ensure_loaded(self):
+        if self._load_lock is None:
+            self._slots = asyncio.Semaphore(self.slots)
+            self._load_lock = asyncio.Lock()
+        async with self._load_lock:
+            if self.in_flight == 0 and time.monotonic() - self.last_active > self.idle_unload_seconds:
+                self.cold_loads += 1
+                await asyncio.sleep(self.load_ms / 1000)
+                self.last_active = time.monotonic()
+
+    async def decode(self, tokens: int):
+        """
+        Yield once per generated token while holding a decode slot
+        """
+        await self._ensure_loaded()
+        async with self._slots:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                await asyncio.sleep(self.prefill_ms / 1000)
+                for _ in range(tokens):
+                    await asyncio.sleep(self.step_ms * (1 + self.batch_overhead * (self.in_flight - 1)) / 1000)
+                    yield
+            finally:
+                self.in_flight -= 1
+                self.last_active = time.monotonic()
+
+def create_local_model_app(state: MockLocalModelState) -> FastAPI:
+    """
+    Build an OpenAI-compatible app whose latency follows the batched decode model above
+    """
+    app = FastAPI(title="Mock local model")
+    words = MOCK_CONTENT.split(" ")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        state.total_requests += 1
+        tokens = min(body.get("max_tokens") or state.completion_tokens, state.completion_tokens)
+        model = body.get("model", "local")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+        if body.get("stream"):
+            async def stream_chunks():
+                i = 0
+                async for _ in state.decode(tokens):
+                    token = words[i % len(words)] if i == 0 else " " + words[i % len(words)]
+                    i += 1
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                yield "data: [DONE]\n\n"
+            return StreamingResponse(stream_chunks(), media_type="text/event-stream")
+
+        async for _ in state.decode(tokens):
+            pass
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": MOCK_CONTENT},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": tokens, "total_tokens": tokens}
+        }
+
+    return app
+
+class _StubObject:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+class StubCompletionClient:
+    """
+    In-process stand-in for openai.AsyncOpenAI: records every chat.completions.create
+    call and answers through a responder(kwargs) -> str after an optional delay
+    """
+    def __init__(self, responder=None, latency_ms: float = 0.0):
+        self.responder = responder or (lambda kwargs: MOCK_CONTENT)
+        self.latency_ms = latency_ms
+        self.calls = []
+        self.chat = _StubObject(completions=_StubObject(create=self._create))
+
+    async def _create(self, **kwargs):
+        self.calls.append(kwargs)
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        content = self.responder(kwargs)
+        return _StubObject(
+            choices=[_StubObject(message=_StubObject(role="assistant", content=content), finish_reason="stop")],
+            usage=_StubObject(prompt_tokens=0, completion_tokens=0, total_tokens=0)
+        )
+
+    async def close(self):
+        pass
+
+def find_free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class MockServer:
+    """
+    Run a mock app with uvicorn on a background thread
+    """
+    def __init__(self, app: FastAPI, port: Optional[int] = None):
+        self.port = port or find_free_port()
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    def start(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
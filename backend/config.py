@@ -11,15 +11,118 @@ class Settings:
     
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./nutmegai.db")
-    
+
+    # Async engine pool (ignored for in-memory SQLite) and SQLite connection pragmas
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    SQLITE_WAL_ENABLED: bool = os.getenv("SQLITE_WAL_ENABLED", "true").lower() == "true"
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", "268435456"))
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
     # OpenAI Configuration
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4")
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", "")
+
+    # OpenAI connection pool and concurrency
+    OPENAI_TIMEOUT_SECONDS: float = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "30"))
+    OPENAI_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("OPENAI_CONNECT_TIMEOUT_SECONDS", "5"))
+    OPENAI_MAX_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_CONNECTIONS", "50"))
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+    
+    # Completion resilience: retries, circuit breaker and hedged requests
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "2"))
+    LLM_RETRY_BACKOFF_BASE_MS: float = float(os.getenv("LLM_RETRY_BACKOFF_BASE_MS", "200"))
+    LLM_RETRY_BACKOFF_MAX_MS: float = float(os.getenv("LLM_RETRY_BACKOFF_MAX_MS", "2000"))
+    BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+    BREAKER_RECOVERY_SECONDS: float = float(os.getenv("BREAKER_RECOVERY_SECONDS", "30"))
+    LLM_HEDGE_ENABLED: bool = os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true"
+    LLM_HEDGE_PERCENTILE: float = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+    LLM_HEDGE_MIN_SAMPLES: int = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+    LLM_HEDGE_MIN_DELAY_MS: float = float(os.getenv("LLM_HEDGE_MIN_DELAY_MS", "250"))
+    
+    # Local OpenAI-compatible model server and per-turn routing ("auto", "openai" or "local")
+    LOCAL_LLM_BASE_URL: str = os.getenv("LOCAL_LLM_BASE_URL", "")
+    LOCAL_LLM_API_KEY: str = os.getenv("LOCAL_LLM_API_KEY", "")
+    LOCAL_LLM_MODEL: str = os.getenv("LOCAL_LLM_MODEL", "local")
+    LOCAL_LLM_PARALLEL: int = int(os.getenv("LOCAL_LLM_PARALLEL", "4"))
+    LOCAL_LLM_TIMEOUT_SECONDS: float = float(os.getenv("LOCAL_LLM_TIMEOUT_SECONDS", "60"))
+    LOCAL_LLM_KEEPALIVE_SECONDS: float = float(os.getenv("LOCAL_LLM_KEEPALIVE_SECONDS", "60"))
+    LOCAL_LLM_MAX_WORDS: int = int(os.getenv("LOCAL_LLM_MAX_WORDS", "40"))
+    LOCAL_LLM_MAX_PROMPT_TOKENS: int = int(os.getenv("LOCAL_LLM_MAX_PROMPT_TOKENS", "1024"))
+    LLM_ROUTING: str = os.getenv("LLM_ROUTING", "auto")
+    
+    # Conversation history ("memory" or "sql")
+    HISTORY_BACKEND: str = os.getenv("HISTORY_BACKEND", "memory")
+    HISTORY_MAX_SESSIONS: int = int(os.getenv("HISTORY_MAX_SESSIONS", "10000"))
+    HISTORY_MAX_TURNS: int = int(os.getenv("HISTORY_MAX_TURNS", "10"))
+    HISTORY_TTL_SECONDS: float = float(os.getenv("HISTORY_TTL_SECONDS", "3600"))
+    
+    # Write-behind persistence of chat turns
+    PERSISTENCE_ENABLED: bool = os.getenv("PERSISTENCE_ENABLED", "true").lower() == "true"
+    PERSIST_BATCH_SIZE: int = int(os.getenv("PERSIST_BATCH_SIZE", "200"))
+    PERSIST_FLUSH_INTERVAL_MS: float = float(os.getenv("PERSIST_FLUSH_INTERVAL_MS", "250"))
+    PERSIST_QUEUE_MAXSIZE: int = int(os.getenv("PERSIST_QUEUE_MAXSIZE", "10000"))
+    PERSIST_ENQUEUE_TIMEOUT_SECONDS: float = float(os.getenv("PERSIST_ENQUEUE_TIMEOUT_SECONDS", "0.5"))
+    
+    # Response cache for repeated first-turn questions
+    RESPONSE_CACHE_ENABLED: bool = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2048"))
+    RESPONSE_CACHE_TTL_SECONDS: float = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "21600"))
     
+    # Single-flight coalescing of identical concurrent first-turn questions
+    COALESCE_ENABLED: bool = os.getenv("COALESCE_ENABLED", "true").lower() == "true"
+    
+    # Semantic cache for near-duplicate first-turn questions
+    SEMANTIC_CACHE_ENABLED: bool = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+    SEMANTIC_CACHE_THRESHOLD: float = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.75"))
+    SEMANTIC_CACHE_MAX_ENTRIES: int = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "10000"))
+    SEMANTIC_CACHE_DIM: int = int(os.getenv("SEMANTIC_CACHE_DIM", "512"))
+    SEMANTIC_CACHE_PATH: str = os.getenv("SEMANTIC_CACHE_PATH", "")
+    
+    # Knowledge-base answers for structured questions, bypassing the LLM
+    FAST_PATH_ENABLED: bool = os.getenv("FAST_PATH_ENABLED", "true").lower() == "true"
+    FAST_PATH_MAX_WORDS: int = int(os.getenv("FAST_PATH_MAX_WORDS", "30"))
+    
+    # Retrieval-augmented prompt assembly
+    PROMPT_ASSEMBLY_ENABLED: bool = os.getenv("PROMPT_ASSEMBLY_ENABLED", "true").lower() == "true"
+    PROMPT_TOKEN_BUDGET: int = int(os.getenv("PROMPT_TOKEN_BUDGET", "800"))
+    PROMPT_CONTEXT_TOP_K: int = int(os.getenv("PROMPT_CONTEXT_TOP_K", "3"))
+    PROMPT_MAX_HISTORY_MESSAGES: int = int(os.getenv("PROMPT_MAX_HISTORY_MESSAGES", "4"))
+    PROMPT_TOKEN_CACHE_SIZE: int = int(os.getenv("PROMPT_TOKEN_CACHE_SIZE", "4096"))
+    
+    # Rolling summaries of long sessions
+    SUMMARY_ENABLED: bool = os.getenv("SUMMARY_ENABLED", "true").lower() == "true"
+    SUMMARY_TRIGGER_TOKENS: int = int(os.getenv("SUMMARY_TRIGGER_TOKENS", "600"))
+    SUMMARY_KEEP_MESSAGES: int = int(os.getenv("SUMMARY_KEEP_MESSAGES", "4"))
+    SUMMARY_MAX_TOKENS: int = int(os.getenv("SUMMARY_MAX_TOKENS", "200"))
+    SUMMARY_MODEL: str = os.getenv("SUMMARY_MODEL", "")
+    
+    # Knowledge base ("database" loads LegalDocument rows over the built-in defaults)
+    KNOWLEDGE_BASE_SOURCE: str = os.getenv("KNOWLEDGE_BASE_SOURCE", "database")
+    KNOWLEDGE_RELOAD_INTERVAL_SECONDS: float = float(os.getenv("KNOWLEDGE_RELOAD_INTERVAL_SECONDS", "60"))
+    
+    # Creole lexicon ("database" loads CreoleTranslation rows over the built-in dictionary)
+    LEXICON_SOURCE: str = os.getenv("LEXICON_SOURCE", "database")
+    LEXICON_USAGE_FLUSH_SECONDS: float = float(os.getenv("LEXICON_USAGE_FLUSH_SECONDS", "30"))
+    
+    # Prometheus metrics at /metrics; when off, instrumentation is a no-op
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    
+    # Batch translation
+    TRANSLATE_BATCH_MAX_ITEMS: int = int(os.getenv("TRANSLATE_BATCH_MAX_ITEMS", "5000"))
+    TRANSLATE_BATCH_MAX_CHARS: int = int(os.getenv("TRANSLATE_BATCH_MAX_CHARS", "1000000"))
+    TRANSLATE_STREAM_CHUNK_SIZE: int = int(os.getenv("TRANSLATE_STREAM_CHUNK_SIZE", "500"))
+
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    ADMIN_API_KEY: str = os.getenv("ADMIN_API_KEY", "")
     
     # CORS
     BACKEND_CORS_ORIGINS: list = [
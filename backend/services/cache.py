@@ -0,0 +1,108 @@
+# Response cache for repeated first-turn questions
+
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from utils.helpers import translate_creole
+from utils.metrics import COALESCED_REQUESTS
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_message(message: str) -> str:
+    """
+    Fold a message to a canonical English form so equivalent phrasings share a key
+    """
+    normalized = translate_creole(message, "en", track_usage=False).lower()
+    normalized = _PUNCTUATION.sub(" ", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+class ResponseCache:
+    """
+    LRU cache with a per-entry TTL and hit/miss counters
+    """
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self) -> int:
+        """
+        Drop every entry and return how many were removed
+        """
+        removed = len(self._entries)
+        self._entries.clear()
+        return removed
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions
+        }
+
+class SingleFlight:
+    """
+    Shares one in-flight call between concurrent callers asking for the same key,
+    so a burst of identical questions costs a single upstream completion
+    """
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def run(self, key: Hashable, make_call: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(make_call())
+            self._calls[key] = call
+            call.add_done_callback(lambda _: self._forget(key, call))
+            self.leaders += 1
+        else:
+            self.followers += 1
+            COALESCED_REQUESTS.inc()
+        # Shielded so a caller that disconnects does not cancel the call for the rest
+        return await asyncio.shield(call)
+
+    def _forget(self, key: Hashable, call: asyncio.Future):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def stats(self) -> Dict:
+        requests = self.leaders + self.followers
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.followers,
+            "coalesced_ratio": round(self.followers / requests, 4) if requests else 0.0
+        }
@@ -0,0 +1,221 @@
+# Database engines and session factories shared by backend services
+
+import asyncio
+import os
+import sys
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Connection, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+# Add repository root to path to import database models
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from database.models import Base
+from config import settings
+
+# Driver used by the async engine for each configured dialect, and back for the sync engine
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg"
+}
+SYNC_DRIVERS = {
+    "sqlite+aiosqlite": "sqlite",
+    "postgresql+asyncpg": "postgresql"
+}
+
+_async_engine = None
+_async_session_factory = None
+_schema_ready = False
+_write_locks: "weakref.WeakKeyDictionary[AsyncEngine, asyncio.Lock]" = weakref.WeakKeyDictionary()
+
+def _with_driver(url: str, drivers: Dict[str, str]) -> str:
+    parsed = make_url(url)
+    drivername = drivers.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+def async_database_url(url: str = None) -> str:
+    """
+    DATABASE_URL with its async driver, e.g. sqlite:///x.db -> sqlite+aiosqlite:///x.db
+    """
+    return _with_driver(url or settings.DATABASE_URL, ASYNC_DRIVERS)
+
+def sync_database_url(url: str = None) -> str:
+    return _with_driver(url or settings.DATABASE_URL, SYNC_DRIVERS)
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+def _pool_options(url: str) -> Dict:
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # In-memory databases live in one shared connection, not a pool
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": True
+    }
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Applied to every new SQLite connection. WAL lets readers run alongside the writer,
+    synchronous=NORMAL skips an fsync per commit (safe in WAL mode short of power loss),
+    mmap serves reads from the page cache and busy_timeout waits out a held write lock.
+    """
+    cursor = dbapi_connection.cursor()
+    if settings.SQLITE_WAL_ENABLED:
+        cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.close()
+
+def create_schema(connection: Connection):
+    """
+    Create missing tables, columns and indexes on a sync connection (or inside run_sync)
+    """
+    Base.metadata.create_all(connection)
+    add_missing_columns(connection)
+    ensure_indexes(connection)
+
+def add_missing_columns(connection: Connection):
+    """
+    Add nullable columns that were introduced after a table was created,
+    since create_all only creates missing tables and never alters existing ones
+    """
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+
+def ensure_indexes(connection: Connection):
+    """
+    Create indexes declared on models after their table already existed.
+    On a large table this is a one-off build that blocks writers while it runs.
+    """
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(connection)
+
+def get_async_engine() -> AsyncEngine:
+    """
+    Return the process-wide async engine (aiosqlite or asyncpg) with a tuned pool
+    """
+    global _async_engine
+    if _async_engine is None:
+        url = async_database_url()
+        _async_engine = create_async_engine(url, **_pool_options(url))
+        if _is_sqlite(url):
+            event.listen(_async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return _async_engine
+
+def get_async_session_factory() -> async_sessionmaker:
+    """
+    Return an async_sessionmaker bound to the shared async engine
+    """
+    global _async_session_factory
+    if _async_session_factory is None:
+        _async_session_factory = async_sessionmaker(bind=get_async_engine(), expire_on_commit=False)
+    return _async_session_factory
+
+async def init_models():
+    """
+    Create missing tables, columns and indexes once per process, before the first query
+    """
+    global _schema_ready
+    if not _schema_ready:
+        async with get_async_engine().begin() as connection:
+            await connection.run_sync(create_schema)
+        _schema_ready = True
+
+async def get_db_session() -> AsyncIterator[AsyncSession]:
+    """
+    FastAPI dependency yielding one session per request; uncommitted work is rolled back on exit
+    """
+    async with get_async_session_factory()() as session:
+        yield session
+
+@asynccontextmanager
+async def write_session(session_factory: async_sessionmaker = None) -> AsyncIterator[AsyncSession]:
+    """
+    Session for a transaction that writes. SQLite takes one writer at a time and its
+    busy handler polls, so under load a waiting writer can be starved past busy_timeout;
+    writers in this process queue on a lock per engine instead, and BEGIN IMMEDIATE takes
+    the write lock before the first read so the transaction never has to upgrade.
+    Other databases get a plain session.
+    """
+    async with (session_factory or get_async_session_factory())() as session:
+        engine = session.bind
+        if engine.dialect.name != "sqlite":
+            yield session
+            return
+        lock = _write_locks.get(engine)
+        if lock is None:
+            lock = _write_locks[engine] = asyncio.Lock()
+        async with lock:
+            await session.execute(text("BEGIN IMMEDIATE"))
+            try:
+                yield session
+            finally:
+                # Ends a transaction the caller did not commit before the next writer starts
+                await session.rollback()
+
+@asynccontextmanager
+async def snapshot_session(session_factory: async_sessionmaker = None) -> AsyncIterator[AsyncSession]:
+    """
+    Session whose reads all see the same committed state. The SQLite driver only opens
+    a transaction before a write, so each SELECT would otherwise see whatever was
+    committed by then; BEGIN pins one snapshot. Other databases read at REPEATABLE READ.
+    """
+    async with (session_factory or get_async_session_factory())() as session:
+        if session.bind.dialect.name == "sqlite":
+            await session.execute(text("BEGIN"))
+        else:
+            await session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        try:
+            yield session
+        finally:
+            await session.rollback()
+
+async def dispose_engines():
+    """
+    Close pooled connections on shutdown
+    """
+    global _async_engine, _async_session_factory, _schema_ready
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
+        _schema_ready = False
+
+def pool_stats() -> Dict:
+    """
+    Checked-out and idle connections of the async pool
+    """
+    if _async_engine is None:
+        return {"status": "not started"}
+    pool = _async_engine.pool
+    stats = {"dialect": _async_engine.dialect.name, "driver": _async_engine.dialect.driver, "pool": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        if hasattr(pool, name):
+            stats[name] = getattr(pool, name)()
+    return stats
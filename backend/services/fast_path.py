@@ -0,0 +1,116 @@
+# Deterministic answers to structured document questions, served without the LLM
+
+import time
+from typing import Dict, Optional
+from config import settings
+from utils.helpers import (
+    extract_legal_intent, format_contact_info, format_process_steps, format_requirements_list
+)
+
+def _leader(scores: Dict[str, int]) -> Optional[str]:
+    """
+    The label whose score is strictly higher than every other, or None on a tie
+    """
+    if not scores:
+        return None
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    if len(ranked) > 1 and ranked[0][1] == ranked[1][1]:
+        return None
+    return ranked[0][0]
+
+class FastPathRouter:
+    """
+    Answers a message straight from the knowledge base when it clearly names one
+    document and one lookup intent (fees, requirements, process or contact).
+    Anything ambiguous, conversational, urgent or long is left for the LLM, since
+    the knowledge base has nothing to say about special circumstances.
+    """
+    ACTIONS = ("get_fees", "get_requirements", "get_process", "get_contact")
+    DEGRADED_NOTICE = "I can't reach my full assistant right now, but here is what I know:\n\n"
+
+    def __init__(self, rag_service, max_words: int = None, llm_latency_prior_ms: float = 1500.0):
+        self.rag_service = rag_service
+        self.max_words = max_words or settings.FAST_PATH_MAX_WORDS
+        self.requests = 0
+        self.hits = 0
+        self.latency_saved_ms = 0.0
+        self.fast_path_ms = 0.0
+        # Moving average of real completion latency, used to estimate the time saved per hit
+        self.llm_latency_ms = llm_latency_prior_ms
+        self.llm_samples = 0
+        self.degraded_answers = 0
+
+    def route(self, message: str) -> Optional[str]:
+        """
+        Return a formatted answer, or None when the message should go to the LLM
+        """
+        started = time.perf_counter()
+        self.requests += 1
+        answer = self._answer(message)
+        if answer is None:
+            return None
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.hits += 1
+        self.fast_path_ms += elapsed_ms
+        self.latency_saved_ms += max(self.llm_latency_ms - elapsed_ms, 0.0)
+        return answer
+
+    def _answer(self, message: str) -> Optional[str]:
+        if len(message.split()) > self.max_words:
+            return None
+        intent = extract_legal_intent(message)
+        scores = intent["scores"]
+        document_type = _leader(scores["document_type"])
+        action = _leader(scores["action"])
+        if document_type is None or action not in self.ACTIONS or intent["urgency"] == "urgent":
+            return None
+        info = self.rag_service.document_knowledge.get(document_type)
+        if info is None:
+            return None
+        return self.format_answer(document_type, action, info)
+
+    def degraded_answer(self, message: str) -> Optional[str]:
+        """
+        Best-effort knowledge-base answer while the LLM is unavailable: any message that
+        names one document gets the matching section, or an overview of the document
+        """
+        scores = extract_legal_intent(message)["scores"]
+        document_type = _leader(scores["document_type"])
+        info = self.rag_service.document_knowledge.get(document_type) if document_type else None
+        if info is None:
+            return None
+        self.degraded_answers += 1
+        action = _leader(scores["action"])
+        if action in self.ACTIONS:
+            return self.DEGRADED_NOTICE + self.format_answer(document_type, action, info)
+        title = document_type.replace("_", " ").title()
+        return (self.DEGRADED_NOTICE + f"**{title}**\n{info['information']}\n\n"
+                + format_requirements_list(info["requirements"]) + "\n" + format_contact_info(info["contact_info"]))
+
+    @staticmethod
+    def format_answer(document_type: str, action: str, info: Dict) -> str:
+        title = document_type.replace("_", " ").title()
+        if action == "get_fees":
+            return (f"**{title} Fees**\nThe fee for a {title.lower()} is {info['fees']}.\n"
+                    f"Processing time: {info['estimated_time']}.")
+        if action == "get_requirements":
+            return f"**{title}**\n" + format_requirements_list(info["requirements"])
+        if action == "get_process":
+            return (f"**{title}**\n" + format_process_steps(info["process_steps"])
+                    + f"Processing time: {info['estimated_time']}.")
+        return format_contact_info(info["contact_info"])
+
+    def record_llm_latency(self, elapsed_ms: float):
+        self.llm_samples += 1
+        self.llm_latency_ms += (elapsed_ms - self.llm_latency_ms) / min(self.llm_samples, 100)
+
+    def stats(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "hits": self.hits,
+            "hit_ratio": round(self.hits / self.requests, 4) if self.requests else 0.0,
+            "avg_fast_path_ms": round(self.fast_path_ms / self.hits, 3) if self.hits else 0.0,
+            "avg_llm_latency_ms": round(self.llm_latency_ms, 1),
+            "latency_saved_ms": round(self.latency_saved_ms, 1),
+            "degraded_answers": self.degraded_answers
+        }
@@ -0,0 +1,303 @@
+# Conversation history stores keyed by chat session
+
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select
+from config import settings
+from services.db import get_async_session_factory, write_session
+from database.models import ChatSession, ChatMessage
+
+class HistoryStore:
+    """
+    Interface for per-session conversation history
+    """
+    # True when appended messages are already written to ChatMessage by the store
+    persistent = False
+
+    async def get_history(self, session_id: str) -> List[Dict]:
+        raise NotImplementedError
+
+    async def append(self, session_id: str, messages: List[Dict], language: str = "en"):
+        raise NotImplementedError
+
+    async def get_context(self, session_id: str) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Return the raw messages not yet summarized and the session summary, if any
+        """
+        return await self.get_history(session_id), None
+
+    async def compact(self, session_id: str, summary: str, messages: List[Dict],
+                      previous_summary: Optional[str] = None) -> int:
+        """
+        Replace the given oldest messages of the session with a summary, unless the
+        session summary is no longer previous_summary (another compaction won).
+        Returns how many messages were replaced.
+        """
+        raise NotImplementedError
+
+    def stats(self) -> Dict:
+        raise NotImplementedError
+
+class _SessionHistory:
+    __slots__ = ("messages", "last_access", "size_bytes", "summary")
+
+    def __init__(self, max_messages: int):
+        self.messages = deque(maxlen=max_messages)
+        self.last_access = time.monotonic()
+        self.size_bytes = 0
+        self.summary = None
+
+class InMemoryHistoryStore(HistoryStore):
+    """
+    In-process LRU store with a session TTL and a per-session turn cap
+    """
+    def __init__(self, max_sessions: int, max_turns: int, ttl_seconds: float):
+        self.max_sessions = max_sessions
+        self.max_messages = max_turns * 2  # One turn is a user message plus the reply
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, _SessionHistory]" = OrderedDict()
+        self._size_bytes = 0
+        self.evictions_lru = 0
+        self.evictions_ttl = 0
+        self.truncated_messages = 0
+        self.compacted_messages = 0
+
+    async def get_history(self, session_id: str) -> List[Dict]:
+        history, _ = await self.get_context(session_id)
+        return history
+
+    async def get_context(self, session_id: str) -> Tuple[List[Dict], Optional[str]]:
+        self._expire(time.monotonic())
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return [], None
+        entry.last_access = time.monotonic()
+        self._sessions.move_to_end(session_id)
+        return list(entry.messages), entry.summary
+
+    async def compact(self, session_id: str, summary: str, messages: List[Dict],
+                      previous_summary: Optional[str] = None) -> int:
+        entry = self._sessions.get(session_id)
+        if entry is None or entry.summary != previous_summary:
+            return 0
+        # Only drop the exact messages that were summarized, in case the deque moved on
+        removed = 0
+        while removed < len(messages) and entry.messages and entry.messages[0] is messages[removed]:
+            dropped = entry.messages.popleft()
+            entry.size_bytes -= len(dropped["content"])
+            self._size_bytes -= len(dropped["content"])
+            removed += 1
+        if removed:
+            entry.summary = summary
+            self.compacted_messages += removed
+        return removed
+
+    async def append(self, session_id: str, messages: List[Dict], language: str = "en"):
+        now = time.monotonic()
+        self._expire(now)
+        
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            entry = _SessionHistory(self.max_messages)
+            self._sessions[session_id] = entry
+            while len(self._sessions) > self.max_sessions:
+                self._evict_oldest()
+                self.evictions_lru += 1
+        else:
+            self._sessions.move_to_end(session_id)
+        
+        for message in messages:
+            if len(entry.messages) == entry.messages.maxlen:
+                dropped = entry.messages[0]
+                entry.size_bytes -= len(dropped["content"])
+                self._size_bytes -= len(dropped["content"])
+                self.truncated_messages += 1
+            entry.messages.append({"role": message["role"], "content": message["content"]})
+            entry.size_bytes += len(message["content"])
+            self._size_bytes += len(message["content"])
+        entry.last_access = now
+
+    def stats(self) -> Dict:
+        return {
+            "backend": "memory",
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "content_bytes": self._size_bytes,
+            "evictions_lru": self.evictions_lru,
+            "evictions_ttl": self.evictions_ttl,
+            "truncated_messages": self.truncated_messages,
+            "compacted_messages": self.compacted_messages
+        }
+
+    def _expire(self, now: float):
+        # Least recently used sessions sit at the front, so expired ones are found first
+        while self._sessions:
+            entry = next(iter(self._sessions.values()))
+            if now - entry.last_access < self.ttl_seconds:
+                break
+            self._evict_oldest()
+            self.evictions_ttl += 1
+
+    def _evict_oldest(self):
+        _, entry = self._sessions.popitem(last=False)
+        self._size_bytes -= entry.size_bytes
+
+class SQLHistoryStore(HistoryStore):
+    """
+    History backed by the ChatSession and ChatMessage tables.
+    With a writer, appends go through the write-behind queue instead of a commit per turn,
+    and reads add the session's rows still waiting in that queue.
+    """
+    persistent = True
+
+    def __init__(self, max_turns: int, ttl_seconds: float, session_factory=None, writer=None):
+        self.max_messages = max_turns * 2
+        self.ttl_seconds = ttl_seconds
+        self.session_factory = session_factory or get_async_session_factory()
+        self.writer = writer
+        self.reads = 0
+        self.writes = 0
+        self.expired_reads = 0
+
+    async def get_history(self, session_id: str) -> List[Dict]:
+        history, _ = await self.get_context(session_id)
+        return history
+
+    async def get_context(self, session_id: str) -> Tuple[List[Dict], Optional[str]]:
+        self.reads += 1
+        return await self._load(session_id)
+
+    async def compact(self, session_id: str, summary: str, messages: List[Dict],
+                      previous_summary: Optional[str] = None) -> int:
+        return await self._compact(session_id, summary, messages, previous_summary)
+
+    async def append(self, session_id: str, messages: List[Dict], language: str = "en"):
+        self.writes += 1
+        if self.writer is not None:
+            for message in messages:
+                await self.writer.record_message(
+                    session_id,
+                    "user" if message["role"] == "user" else "bot",
+                    message["content"],
+                    language=language,
+                    confidence=message.get("confidence", 1.0)
+                )
+            return
+        await self._store(session_id, messages, language)
+
+    def stats(self) -> Dict:
+        return {
+            "backend": "sql",
+            "reads": self.reads,
+            "writes": self.writes,
+            "expired_reads": self.expired_reads
+        }
+
+    async def _window(self, db, session_id: str, through_id: int, limit: int):
+        # The newest unsummarized messages, newest first
+        result = await db.execute(
+            select(ChatMessage)
+            .where(ChatMessage.session_id == session_id, ChatMessage.id > (through_id or 0))
+            .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+    async def _chat_session(self, db, session_id: str) -> Optional[ChatSession]:
+        result = await db.execute(select(ChatSession).where(ChatSession.session_id == session_id).limit(1))
+        return result.scalars().first()
+
+    def _pending(self, session_id: str) -> List[Dict]:
+        # Taken before the query: rows flushed meanwhile are then in both and dropped by _entries
+        return self.writer.pending_messages(session_id) if self.writer is not None else []
+
+    async def _entries(self, db, session_id: str, chat_session: Optional[ChatSession], pending: List[Dict],
+                       limit: int) -> List[Tuple[Optional[ChatMessage], Dict]]:
+        """
+        The newest unsummarized messages oldest first, stored rows then queued ones, each
+        with its ChatMessage row (None while still queued)
+        """
+        rows = []
+        if chat_session is not None:
+            rows = list(reversed(await self._window(db, session_id, chat_session.summary_through_id, limit)))
+        stored = {(row.created_at, row.message_type, row.content) for row in rows}
+        entries = [(row, row.message_type, row.content) for row in rows] + [
+            (None, row["message_type"], row["content"]) for row in pending
+            if (row["created_at"], row["message_type"], row["content"]) not in stored
+        ]
+        return [
+            (row, {"role": "user" if message_type == "user" else "assistant", "content": content})
+            for row, message_type, content in entries[-limit:]
+        ]
+
+    async def _load(self, session_id: str) -> Tuple[List[Dict], Optional[str]]:
+        pending = self._pending(session_id)
+        async with self.session_factory() as db:
+            chat_session = await self._chat_session(db, session_id)
+            if (chat_session is not None and not pending
+                    and chat_session.updated_at < datetime.utcnow() - timedelta(seconds=self.ttl_seconds)):
+                self.expired_reads += 1
+                return [], None
+            entries = await self._entries(db, session_id, chat_session, pending, self.max_messages)
+        return [message for _, message in entries], chat_session.summary if chat_session is not None else None
+
+    async def _compact(self, session_id: str, summary: str, messages: List[Dict],
+                       previous_summary: Optional[str]) -> int:
+        pending = self._pending(session_id)
+        async with write_session(self.session_factory) as db:
+            chat_session = await self._chat_session(db, session_id)
+            if chat_session is None or chat_session.summary != previous_summary:
+                return 0
+            # Find the summarized messages in the same merged view the reader builds, widened
+            # for turns added since. Only rows already written can be marked; otherwise, or when
+            # they are no longer in view, the raw turns stay and the next turn tries again.
+            entries = await self._entries(db, session_id, chat_session, pending, self.max_messages * 2)
+            keys = [(message["role"], message["content"]) for _, message in entries]
+            wanted = [(message["role"], message["content"]) for message in messages]
+            start = next((i for i in range(len(keys) - len(wanted) + 1) if keys[i:i + len(wanted)] == wanted), None)
+            if not wanted or start is None:
+                return 0
+            older = [row for row, _ in entries[start:start + len(wanted)]]
+            if any(row is None for row in older):
+                return 0
+            chat_session.summary = summary
+            chat_session.summary_through_id = max(row.id for row in older)
+            await db.commit()
+        return len(older)
+
+    async def _store(self, session_id: str, messages: List[Dict], language: str):
+        async with write_session(self.session_factory) as db:
+            chat_session = await self._chat_session(db, session_id)
+            if chat_session is None:
+                db.add(ChatSession(session_id=session_id, language_preference=language))
+            else:
+                chat_session.updated_at = datetime.utcnow()
+            for message in messages:
+                db.add(ChatMessage(
+                    session_id=session_id,
+                    message_type="user" if message["role"] == "user" else "bot",
+                    content=message["content"],
+                    language=language
+                ))
+            await db.commit()
+
+def create_history_store(backend: Optional[str] = None, writer=None) -> HistoryStore:
+    """
+    Build the history store selected by HISTORY_BACKEND
+    """
+    backend = backend or settings.HISTORY_BACKEND
+    if backend == "sql":
+        return SQLHistoryStore(
+            max_turns=settings.HISTORY_MAX_TURNS,
+            ttl_seconds=settings.HISTORY_TTL_SECONDS,
+            writer=writer
+        )
+    if backend == "memory":
+        return InMemoryHistoryStore(
+            max_sessions=settings.HISTORY_MAX_SESSIONS,
+            max_turns=settings.HISTORY_MAX_TURNS,
+            ttl_seconds=settings.HISTORY_TTL_SECONDS
+        )
+    raise ValueError(f"Unknown history backend: {backend}")
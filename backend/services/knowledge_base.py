@@ -0,0 +1,218 @@
+# Immutable knowledge-base snapshots loaded from the LegalDocument table
+
+import hashlib
+import json
+import logging
+import time
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+from sqlalchemy import func, select
+from services.db import get_async_session_factory, snapshot_session
+from services.search_index import BM25Index
+from database.models import LegalDocument
+
+logger = logging.getLogger(__name__)
+
+# Relative weight of each knowledge-base field when ranking search results
+SEARCH_FIELD_BOOSTS = {
+    "title": 3.0,
+    "information": 1.5,
+    "requirements": 1.0,
+    "process_steps": 1.0
+}
+
+# Passage-level index used to ground chat prompts
+PASSAGE_FIELD_BOOSTS = {
+    "title": 2.0,
+    "text": 1.0
+}
+
+# Intents a document query can resolve to, each with its own precomputed response
+DOCUMENT_INTENTS = ("requirements", "process", "contact", "fees", "full")
+
+DOCUMENT_NOT_FOUND = MappingProxyType({
+    "information": "Document type not found. Please check the available document types.",
+    "requirements": (),
+    "process_steps": (),
+    "contact_info": {},
+    "estimated_time": "Unknown",
+    "fees": "Unknown"
+})
+
+def serialize_document_response(projection: Mapping) -> bytes:
+    # Nested read-only mappings (contact_info) are not dicts, so json needs them converted
+    return json.dumps(dict(projection), ensure_ascii=False, separators=(",", ":"), default=dict).encode("utf-8")
+
+DOCUMENT_NOT_FOUND_BODY = serialize_document_response(DOCUMENT_NOT_FOUND)
+
+def classify_document_query(query: str) -> str:
+    """
+    Map a free-text document query to one of DOCUMENT_INTENTS
+    """
+    query_lower = query.lower()
+    if "requirement" in query_lower or "need" in query_lower:
+        return "requirements"
+    if "process" in query_lower or "step" in query_lower or "how" in query_lower:
+        return "process"
+    if "contact" in query_lower or "where" in query_lower or "phone" in query_lower:
+        return "contact"
+    if "cost" in query_lower or "fee" in query_lower or "money" in query_lower:
+        return "fees"
+    return "full"
+
+def _project_document(document_type: str, info: Dict) -> Dict[str, Mapping]:
+    """
+    Build the read-only response for every intent of one document
+    """
+    base = {
+        "information": info["information"],
+        "requirements": (),
+        "process_steps": (),
+        "contact_info": info["contact_info"],
+        "estimated_time": info["estimated_time"],
+        "fees": info["fees"]
+    }
+    return {
+        "requirements": MappingProxyType({**base, "requirements": info["requirements"]}),
+        "process": MappingProxyType({**base, "process_steps": info["process_steps"]}),
+        "contact": MappingProxyType(base),
+        "fees": MappingProxyType({
+            **base,
+            "information": f"The fee for {document_type.replace('_', ' ')} is {info['fees']}."
+        }),
+        "full": MappingProxyType(dict(info))
+    }
+
+def _document_passages(document_type: str, info: Dict) -> Dict[str, str]:
+    """
+    Split one document into short self-contained passages, one per section
+    """
+    title = document_type.replace("_", " ").title()
+    contact = info["contact_info"]
+    contact_parts = [contact.get(key) for key in ("office", "address", "phone", "email", "hours")]
+    return {
+        f"{document_type}:overview": f"{title}: {info['information']}",
+        f"{document_type}:requirements": f"{title} requirements (what you need to bring): " + "; ".join(info["requirements"]),
+        f"{document_type}:process": f"{title} process (steps and how long it takes): " + "; ".join(info["process_steps"])
+                                    + f". Processing time: {info['estimated_time']}",
+        f"{document_type}:fees": f"{title} fee (cost to apply): {info['fees']}. Processing time: {info['estimated_time']}",
+        f"{document_type}:contact": f"{title} office and contact (where to go): "
+                                    + ", ".join(part for part in contact_parts if part)
+    }
+
+class KnowledgeSnapshot:
+    """
+    A versioned, read-only view of the knowledge base with its search index and
+    the precomputed per-intent responses (as mappings and as serialized JSON).
+    Snapshots are never mutated; a reload builds a new one and swaps the reference.
+    The version only counts reloads within a process; the digest identifies the content
+    and is what persisted state derived from it should be keyed on.
+    """
+    __slots__ = ("version", "source", "fingerprint", "loaded_at", "documents", "search_index",
+                 "projections", "response_bodies", "passages", "passage_index", "digest")
+
+    def __init__(self, version: int, source: str, fingerprint: Optional[Tuple],
+                 documents: Mapping[str, Dict], search_index: BM25Index):
+        self.version = version
+        self.source = source
+        self.fingerprint = fingerprint
+        self.loaded_at = time.time()
+        self.documents = documents
+        self.search_index = search_index
+        self.projections = {
+            doc_type: _project_document(doc_type, info) for doc_type, info in documents.items()
+        }
+        self.response_bodies = {
+            doc_type: {intent: serialize_document_response(projection) for intent, projection in projections.items()}
+            for doc_type, projections in self.projections.items()
+        }
+        self.passages = {}
+        for doc_type, info in documents.items():
+            self.passages.update(_document_passages(doc_type, info))
+        self.digest = hashlib.sha1("\0".join(
+            f"{passage_id}\0{text}" for passage_id, text in sorted(self.passages.items())
+        ).encode("utf-8")).hexdigest()
+        self.passage_index = BM25Index.build({
+            passage_id: {"title": passage_id.replace("_", " ").replace(":", " "), "text": text}
+            for passage_id, text in self.passages.items()
+        }, PASSAGE_FIELD_BOOSTS)
+
+    def describe(self) -> Dict:
+        return {
+            "version": self.version,
+            "source": self.source,
+            "digest": self.digest,
+            "loaded_at": self.loaded_at,
+            "document_count": len(self.documents),
+            "document_types": sorted(self.documents)
+        }
+
+def _freeze_document(info: Dict) -> Mapping:
+    return MappingProxyType({
+        "information": info["information"],
+        "requirements": tuple(info["requirements"]),
+        "process_steps": tuple(info["process_steps"]),
+        "contact_info": MappingProxyType(dict(info["contact_info"])),
+        "estimated_time": info["estimated_time"],
+        "fees": info["fees"]
+    })
+
+def build_snapshot(documents: Dict[str, Dict], version: int, source: str,
+                   fingerprint: Optional[Tuple] = None) -> KnowledgeSnapshot:
+    """
+    Freeze parsed documents and index them for search
+    """
+    frozen = {doc_type: _freeze_document(info) for doc_type, info in documents.items()}
+    search_index = BM25Index.build({
+        doc_type: {
+            "title": doc_type.replace("_", " "),
+            "information": info["information"],
+            "requirements": " ".join(info["requirements"]),
+            "process_steps": " ".join(info["process_steps"])
+        }
+        for doc_type, info in frozen.items()
+    }, SEARCH_FIELD_BOOSTS)
+    return KnowledgeSnapshot(version, source, fingerprint, MappingProxyType(frozen), search_index)
+
+async def _fingerprint(db) -> Tuple:
+    count, latest = (await db.execute(
+        select(func.count(LegalDocument.id), func.max(LegalDocument.updated_at))
+    )).one()
+    return count, latest.isoformat() if latest else None
+
+async def read_fingerprint(session_factory=None) -> Tuple:
+    """
+    Cheap change detector: row count and latest updated_at of LegalDocument
+    """
+    session_factory = session_factory or get_async_session_factory()
+    async with session_factory() as db:
+        return await _fingerprint(db)
+
+async def load_documents(defaults: Dict[str, Dict], session_factory=None) -> Tuple[Dict[str, Dict], Tuple]:
+    """
+    Parse LegalDocument rows once, layered over the built-in defaults.
+    Inactive rows remove their document type.
+    The fingerprint is read first and in the same snapshot as the rows, so a write
+    committed meanwhile moves the fingerprint on the next poll instead of hiding
+    behind one that already counts it.
+    """
+    documents = dict(defaults)
+    async with snapshot_session(session_factory) as db:
+        fingerprint = await _fingerprint(db)
+        rows = (await db.execute(select(LegalDocument))).scalars().all()
+        for row in rows:
+            if not row.is_active:
+                documents.pop(row.document_type, None)
+                continue
+            try:
+                documents[row.document_type] = {
+                    "information": row.description,
+                    "requirements": json.loads(row.requirements or "[]"),
+                    "process_steps": json.loads(row.process_steps or "[]"),
+                    "contact_info": json.loads(row.contact_info or "{}"),
+                    "estimated_time": row.estimated_time or "Unknown",
+                    "fees": row.fees or "Unknown"
+                }
+            except (TypeError, ValueError) as e:
+                logger.warning("Skipping malformed LegalDocument %s: %s", row.document_type, e)
+    return documents, fingerprint
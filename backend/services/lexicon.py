@@ -0,0 +1,132 @@
+# Creole lexicon loaded from CreoleTranslation with batched usage_count updates
+
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import bindparam, func, select, update
+from config import settings
+from services.db import get_async_session_factory, write_session
+from database.models import CreoleTranslation
+from utils.helpers import apply_lexicon, restore_translation_usage, take_translation_usage
+
+logger = logging.getLogger(__name__)
+
+_translations = CreoleTranslation.__table__
+
+async def load_lexicon(session_factory=None) -> List[Tuple[int, str, str, float]]:
+    """
+    Read (id, english_text, creole_text, confidence) for every CreoleTranslation row
+    """
+    session_factory = session_factory or get_async_session_factory()
+    async with session_factory() as db:
+        rows = (await db.execute(
+            select(CreoleTranslation.id, CreoleTranslation.english_text,
+                   CreoleTranslation.creole_text, CreoleTranslation.confidence)
+            .order_by(CreoleTranslation.id)
+        )).all()
+    return [tuple(row) for row in rows if row.english_text and row.creole_text]
+
+async def write_usage(usage: Dict[int, int], session_factory=None) -> int:
+    """
+    Add hit counts to usage_count with one executemany UPDATE
+    """
+    if not usage:
+        return 0
+    session_factory = session_factory or get_async_session_factory()
+    statement = (
+        update(_translations)
+        .where(_translations.c.id == bindparam("entry_id"))
+        .values(usage_count=func.coalesce(_translations.c.usage_count, 0) + bindparam("increment"))
+    )
+    async with write_session(session_factory) as db:
+        await db.execute(statement, [{"entry_id": entry_id, "increment": count} for entry_id, count in usage.items()])
+        await db.commit()
+    return len(usage)
+
+class LexiconService:
+    """
+    Keeps the shared translator and detector on the CreoleTranslation lexicon and
+    periodically flushes the in-memory hit counters to usage_count.
+    """
+    def __init__(self, session_factory=None, flush_interval_seconds: float = None):
+        self._session_factory = session_factory
+        self.flush_interval = flush_interval_seconds or settings.LEXICON_USAGE_FLUSH_SECONDS
+        self.source = "builtin"
+        self.version = 0
+        self.summary: Dict = {}
+        self.flushes = 0
+        self.rows_updated = 0
+        self.hits_written = 0
+        self.flush_errors = 0
+        self._flusher: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+    @property
+    def session_factory(self):
+        if self._session_factory is None:
+            self._session_factory = get_async_session_factory()
+        return self._session_factory
+
+    async def reload(self) -> Dict:
+        """
+        Load the lexicon from the database; an empty table keeps the built-in dictionary
+        """
+        entries = await load_lexicon(self.session_factory)
+        if entries:
+            self.summary = apply_lexicon(entries)
+            self.source = "database"
+            self.version += 1
+        return self.describe()
+
+    async def flush(self) -> int:
+        """
+        Write the hits gathered since the last flush; failed writes are retried next time
+        """
+        async with self._flush_lock:
+            usage = take_translation_usage()
+            if not usage:
+                return 0
+            try:
+                updated = await write_usage(usage, self.session_factory)
+            except Exception as e:
+                restore_translation_usage(usage)
+                self.flush_errors += 1
+                logger.warning("Lexicon usage flush failed: %s", e)
+                return 0
+            self.flushes += 1
+            self.rows_updated += updated
+            self.hits_written += sum(usage.values())
+            return updated
+
+    def start(self):
+        if self._flusher is None and self.flush_interval > 0:
+            self._flusher = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stop the periodic flush and write whatever is still counted
+        """
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def describe(self) -> Dict:
+        return {
+            "source": self.source,
+            "version": self.version,
+            **self.summary,
+            "flushes": self.flushes,
+            "rows_updated": self.rows_updated,
+            "hits_written": self.hits_written,
+            "flush_errors": self.flush_errors
+        }
@@ -1,15 +1,391 @@
 # LLM integration logic (e.g., Llama/OpenAI)
 
+import asyncio
+import hashlib
 import openai
+import httpx
 import uuid
 import json
-from typing import Dict, List, Optional
+import time
+import logging
+from typing import AsyncIterator, Callable, Dict, List, Optional
 from config import settings
+from services.history import HistoryStore, create_history_store
+from services.persistence import ChatPersistenceQueue
+from services.cache import ResponseCache, SingleFlight, normalize_message
+from services.semantic_cache import SemanticCache
+from services.fast_path import FastPathRouter
+from services.prompt import PromptAssembler, TokenCounter, summary_message
+from services.summarizer import ConversationSummarizer
+from services.resilience import ResilientCaller
+from utils.helpers import extract_legal_intent
+from utils.metrics import (DIRECT_ANSWERS, FALLBACKS, LLM_FIRST_TOKEN_SECONDS,
+                           LLM_REQUEST_SECONDS, LLM_TOKENS, span)
+
+logger = logging.getLogger(__name__)
+
+def create_openai_client(base_url: Optional[str] = None, api_key: Optional[str] = None,
+                         max_connections: Optional[int] = None, timeout: Optional[float] = None) -> openai.AsyncOpenAI:
+    """
+    Build a shared async OpenAI client backed by a bounded HTTP connection pool;
+    the overrides point it at an OpenAI-compatible local server instead
+    """
+    max_connections = max_connections or settings.OPENAI_MAX_CONNECTIONS
+    timeout = timeout or settings.OPENAI_TIMEOUT_SECONDS
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=min(settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS, max_connections)
+        ),
+        timeout=httpx.Timeout(
+            timeout,
+            connect=settings.OPENAI_CONNECT_TIMEOUT_SECONDS
+        )
+    )
+    return openai.AsyncOpenAI(
+        api_key=api_key or settings.OPENAI_API_KEY,
+        base_url=base_url or settings.OPENAI_BASE_URL or None,
+        timeout=timeout,
+        # Retries are done by ResilientCaller so they can respect the circuit breaker
+        max_retries=0,
+        http_client=http_client
+    )
+
+class LLMBackend:
+    """
+    An OpenAI-compatible chat completions endpoint with its own concurrency limit
+    and circuit breaker, so one backend failing or saturating leaves the others alone
+    """
+    def __init__(self, name: str, client, model: str, max_concurrency: int,
+                 resilience: Optional[ResilientCaller] = None, timeout: Optional[float] = None):
+        self.name = name
+        self.client = client
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.concurrency_limit = asyncio.Semaphore(max_concurrency)
+        self.resilience = resilience or ResilientCaller()
+        self.timeout = timeout or settings.OPENAI_TIMEOUT_SECONDS
+        # Called with the latency of every answered completion, in milliseconds
+        self.on_latency: Optional[Callable[[float], None]] = None
+        self.requests = 0
+        self.in_flight = 0
+        self.last_used = time.monotonic()
+
+    async def complete(self, messages: List[Dict], hedge: bool = True, **options):
+        self.requests += 1
+        return await self.resilience.call(lambda: self._create(messages, **options), hedge=hedge)
+
+    async def _create(self, messages: List[Dict], observe: bool = True, **options):
+        """
+        One upstream completion attempt, holding a concurrency slot only while it runs
+        """
+        params = {"max_tokens": 500, "temperature": 0.7, **options}
+        async with self.concurrency_limit:
+            self.in_flight += 1
+            started = time.perf_counter()
+            try:
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    timeout=self.timeout,
+                    **params
+                )
+            finally:
+                self.in_flight -= 1
+                self.last_used = time.monotonic()
+            elapsed = time.perf_counter() - started
+            if observe:
+                LLM_REQUEST_SECONDS.observe(elapsed, self.name)
+                self._record_usage(getattr(response, "usage", None))
+                if self.on_latency is not None:
+                    self.on_latency(elapsed * 1000)
+            return response
+
+    def _record_usage(self, usage):
+        if usage is None:
+            return
+        if isinstance(usage, dict):
+            # Clients that predate stream usage keep it on chunks as an unparsed extra field
+            prompt_tokens, completion_tokens = usage.get("prompt_tokens"), usage.get("completion_tokens")
+        else:
+            prompt_tokens, completion_tokens = usage.prompt_tokens, usage.completion_tokens
+        LLM_TOKENS.inc(self.name, "prompt", amount=prompt_tokens or 0)
+        LLM_TOKENS.inc(self.name, "completion", amount=completion_tokens or 0)
+
+    async def stream(self, messages: List[Dict]) -> AsyncIterator[str]:
+        """
+        Yield response tokens, holding a concurrency slot until the stream ends
+        """
+        self.requests += 1
+        async with self.concurrency_limit:
+            self.in_flight += 1
+            started = time.perf_counter()
+            try:
+                stream = await self.resilience.call(lambda: self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    max_tokens=500,
+                    temperature=0.7,
+                    stream=True,
+                    # The final chunk then carries token usage, as non-streamed responses do.
+                    # Sent as a raw body field since the pinned openai client has no stream_options argument.
+                    extra_body={"stream_options": {"include_usage": True}},
+                    timeout=self.timeout
+                ), hedge=False)
+                first_token = True
+                try:
+                    async for chunk in stream:
+                        self._record_usage(getattr(chunk, "usage", None))
+                        if not chunk.choices:
+                            continue
+                        token = chunk.choices[0].delta.content
+                        if token:
+                            if first_token:
+                                LLM_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - started, self.name)
+                                first_token = False
+                            yield token
+                except Exception as e:
+                    # The stream opened and then broke, which call() could not see
+                    self.resilience.record_failure(e)
+                    raise
+            finally:
+                self.in_flight -= 1
+                self.last_used = time.monotonic()
+            elapsed = time.perf_counter() - started
+            LLM_REQUEST_SECONDS.observe(elapsed, self.name)
+            if self.on_latency is not None:
+                self.on_latency(elapsed * 1000)
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        await self.client.close()
+
+    def stats(self) -> Dict:
+        return {
+            "model": self.model,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "resilience": self.resilience.stats()
+        }
+
+class LocalLLMBackend(LLMBackend):
+    """
+    A CPU-hosted model behind an OpenAI-compatible server (llama.cpp server,
+    llama-cpp-python, Ollama). In-flight requests are capped at the server's parallel
+    slots so concurrent turns decode together in one batch rather than piling up in
+    its queue, and a keepalive ping while idle keeps the model loaded and the pooled
+    connections open.
+    """
+    def __init__(self, client=None, model: Optional[str] = None, parallel: Optional[int] = None,
+                 keepalive_seconds: Optional[float] = None):
+        parallel = parallel or settings.LOCAL_LLM_PARALLEL
+        client = client or create_openai_client(
+            base_url=settings.LOCAL_LLM_BASE_URL,
+            api_key=settings.LOCAL_LLM_API_KEY or "local",
+            max_connections=parallel,
+            timeout=settings.LOCAL_LLM_TIMEOUT_SECONDS
+        )
+        # A hedge would double the work of a CPU box that is already the bottleneck
+        super().__init__("local", client, model or settings.LOCAL_LLM_MODEL, parallel,
+                         ResilientCaller(hedge_enabled=False), timeout=settings.LOCAL_LLM_TIMEOUT_SECONDS)
+        self.keepalive_seconds = keepalive_seconds if keepalive_seconds is not None else settings.LOCAL_LLM_KEEPALIVE_SECONDS
+        self._keepalive_task: Optional[asyncio.Task] = None
+        self.keepalive_pings = 0
+        self.keepalive_failures = 0
+        self.last_ping_ms: Optional[float] = None
+
+    async def warm(self) -> bool:
+        """
+        Send a one-token completion so the model is loaded before users need it
+        """
+        started = time.perf_counter()
+        try:
+            await self.resilience.call(lambda: self._create(
+                [{"role": "user", "content": "ping"}], observe=False, max_tokens=1, temperature=0.0
+            ), hedge=False)
+        except Exception as e:
+            self.keepalive_failures += 1
+            logger.warning("Local model keepalive failed: %s", e)
+            return False
+        self.keepalive_pings += 1
+        self.last_ping_ms = (time.perf_counter() - started) * 1000
+        return True
+
+    async def start(self):
+        if self._keepalive_task is None:
+            await self.warm()
+            if self.keepalive_seconds > 0:
+                self._keepalive_task = asyncio.create_task(self._keepalive())
+
+    async def _keepalive(self):
+        while True:
+            idle = time.monotonic() - self.last_used
+            await asyncio.sleep(max(self.keepalive_seconds - idle, 0.1))
+            # Real traffic keeps the model warm too; only ping after a quiet interval
+            if time.monotonic() - self.last_used >= self.keepalive_seconds:
+                await self.warm()
+
+    async def close(self):
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            try:
+                await self._keepalive_task
+            except asyncio.CancelledError:
+                pass
+            self._keepalive_task = None
+        await super().close()
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        stats.update({
+            "keepalive_seconds": self.keepalive_seconds,
+            "keepalive_pings": self.keepalive_pings,
+            "keepalive_failures": self.keepalive_failures,
+            "last_ping_ms": round(self.last_ping_ms, 1) if self.last_ping_ms is not None else None
+        })
+        return stats
+
+class BackendRouter:
+    """
+    Picks the backend for each turn. In "auto" mode routine turns (a recognised
+    document and action, or brief small talk, in a short message that is not urgent
+    and fits a small prompt) go to the local model and everything else to OpenAI.
+    The remaining backends follow as fallbacks when the preferred one fails.
+    """
+    SMALL_TALK_WORDS = 5
+
+    def __init__(self, backends: Dict[str, LLMBackend], mode: Optional[str] = None,
+                 max_words: Optional[int] = None, max_prompt_tokens: Optional[int] = None):
+        self.backends = backends
+        self.mode = mode or settings.LLM_ROUTING
+        self.max_words = max_words or settings.LOCAL_LLM_MAX_WORDS
+        self.max_prompt_tokens = max_prompt_tokens or settings.LOCAL_LLM_MAX_PROMPT_TOKENS
+        self.routed = {name: 0 for name in backends}
+        self.failovers = 0
+
+    def is_routine(self, turn: "ChatTurn") -> bool:
+        words = len(turn.message.split())
+        if turn.summary or words > self.max_words:
+            return False
+        if turn.prompt_tokens is not None and turn.prompt_tokens > self.max_prompt_tokens:
+            return False
+        intent = extract_legal_intent(turn.message)
+        if intent["urgency"] == "urgent":
+            return False
+        if intent["document_type"] is None and intent["action"] is None:
+            return words <= self.SMALL_TALK_WORDS
+        return intent["document_type"] is not None and intent["action"] is not None
+
+    def select(self, turn: "ChatTurn") -> List[LLMBackend]:
+        """
+        Backends to try for this turn, preferred first
+        """
+        if self.mode == "auto" and "local" in self.backends and "openai" in self.backends:
+            preferred = "local" if self.is_routine(turn) else "openai"
+        elif self.mode in self.backends:
+            preferred = self.mode
+        else:
+            preferred = next(iter(self.backends))
+        self.routed[preferred] += 1
+        return [self.backends[preferred]] + [backend for name, backend in self.backends.items() if name != preferred]
+
+    def stats(self) -> Dict:
+        return {
+            "mode": self.mode,
+            "routed": dict(self.routed),
+            "failovers": self.failovers,
+            "backends": {name: backend.stats() for name, backend in self.backends.items()}
+        }
+
+class ChatTurn:
+    """
+    Per-request state shared by the prepare, complete and fallback steps
+    """
+    __slots__ = ("message", "language", "session_id", "is_creole", "history", "messages",
+                 "normalized_message", "prompt_variant", "semantic_partition", "prompt_tokens", "summary")
+
+    def __init__(self, message: str, language: str, session_id: str, is_creole: bool,
+                 history: List[Dict], messages: List[Dict], summary: Optional[str] = None):
+        self.message = message
+        self.language = language
+        self.session_id = session_id
+        self.is_creole = is_creole
+        self.history = history
+        self.messages = messages
+        self.normalized_message = None
+        self.prompt_variant = None
+        self.semantic_partition = None
+        self.prompt_tokens = None
+        self.summary = summary
+
+    @property
+    def cacheable(self) -> bool:
+        # Only first-turn answers are independent of the conversation so far
+        return self.normalized_message is not None
+
+    @property
+    def cache_key(self):
+        return (self.normalized_message, self.language, self.prompt_variant)
 
 class LLMService:
-    def __init__(self):
-        self.client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-        self.conversation_history = {}
+    def __init__(self, client: Optional[openai.AsyncOpenAI] = None, history_store: Optional[HistoryStore] = None,
+                 persistence: Optional[ChatPersistenceQueue] = None, rag_service=None, local_client=None):
+        # OpenAI, plus an OpenAI-compatible local model when one is configured; without
+        # an OpenAI key the local model serves everything
+        backends = {}
+        if client is not None or settings.OPENAI_API_KEY or not settings.LOCAL_LLM_BASE_URL:
+            backends["openai"] = LLMBackend(
+                "openai", client or create_openai_client(), settings.OPENAI_MODEL, settings.LLM_MAX_CONCURRENCY
+            )
+        if local_client is not None or settings.LOCAL_LLM_BASE_URL:
+            backends["local"] = LocalLLMBackend(client=local_client)
+        for backend in backends.values():
+            backend.on_latency = self._record_llm_latency
+        self.router = BackendRouter(backends)
+        
+        # The first backend also runs summaries and reports health
+        self.primary = next(iter(backends.values()))
+        self.client = self.primary.client
+        self.concurrency_limit = self.primary.concurrency_limit
+        self.resilience = self.primary.resilience
+        
+        self.persistence = persistence
+        self.history_store = history_store or create_history_store(writer=persistence)
+        
+        # Answers to repeated first-turn questions
+        self.response_cache = ResponseCache(
+            max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS
+        ) if settings.RESPONSE_CACHE_ENABLED else None
+        
+        # Answers to near-duplicate first-turn questions
+        self.semantic_cache = SemanticCache(
+            capacity=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+            threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+            dim=settings.SEMANTIC_CACHE_DIM,
+            path=settings.SEMANTIC_CACHE_PATH or None
+        ) if settings.SEMANTIC_CACHE_ENABLED else None
+        
+        # Identical first-turn questions asked at the same time share one completion
+        self.single_flight = SingleFlight() if settings.COALESCE_ENABLED else None
+        
+        # Structured lookups answered from the knowledge base without a completion
+        self.fast_path = FastPathRouter(rag_service) if rag_service is not None and settings.FAST_PATH_ENABLED else None
+        
+        # Grounds prompts in retrieved knowledge under a token budget
+        self.token_counter = TokenCounter()
+        self.prompt_assembler = PromptAssembler(
+            rag_service, counter=self.token_counter
+        ) if rag_service is not None and settings.PROMPT_ASSEMBLY_ENABLED else None
+        
+        # Folds older turns of long sessions into a rolling summary in the background
+        self.summarizer = ConversationSummarizer(
+            self.client, self.history_store, self.concurrency_limit,
+            counter=self.token_counter, caller=self.resilience
+        ) if settings.SUMMARY_ENABLED else None
         
         # Grenadian Creole patterns and responses
         self.creole_patterns = {
@@ -84,63 +460,257 @@ class LLMService:
         """
         Generate AI response with Grenadian Creole understanding
         """
+        turn = await self._prepare_turn(message, language, session_id)
+        
+        cached = await self._get_direct_answer(turn)
+        if cached is not None:
+            return await self._complete_turn(turn, cached)
+        
+        try:
+            # Generate response on the routed backend without blocking the event loop
+            if self.single_flight is not None and turn.cacheable:
+                ai_response = await self.single_flight.run(turn.cache_key, lambda: self._complete_and_cache(turn))
+            else:
+                ai_response = await self._complete_and_cache(turn)
+            return await self._complete_turn(turn, ai_response)
+            
+        except Exception as e:
+            # Fallback response if every backend fails or has its circuit breaker open
+            return self._fallback_result(turn)
+
+    async def _complete_and_cache(self, turn: "ChatTurn") -> str:
+        # Cached before the shared call finishes, so late arrivals hit the cache instead
+        ai_response = await self._complete_with_failover(turn)
+        await self._cache_response(turn, ai_response)
+        return ai_response
+
+    async def _complete_with_failover(self, turn: "ChatTurn") -> str:
+        """
+        Ask the routed backend first and the others in turn if it fails
+        """
+        backends = self.router.select(turn)
+        for position, backend in enumerate(backends):
+            try:
+                response = await backend.complete(turn.messages)
+                return response.choices[0].message.content
+            except Exception:
+                if position == len(backends) - 1:
+                    raise
+                self.router.failovers += 1
+
+    async def stream_response(self, message: str, language: str = "en", session_id: Optional[str] = None) -> AsyncIterator[Dict]:
+        """
+        Stream AI response tokens as they arrive, followed by a final summary event
+        """
+        turn = await self._prepare_turn(message, language, session_id)
+        
+        cached = await self._get_direct_answer(turn)
+        if cached is not None:
+            yield {"event": "token", "data": {"token": cached}}
+            yield {"event": "done", "data": await self._complete_turn(turn, cached)}
+            return
+        
+        chunks = []
+        backends = self.router.select(turn)
+        try:
+            for position, backend in enumerate(backends):
+                try:
+                    async for token in backend.stream(turn.messages):
+                        chunks.append(token)
+                        yield {"event": "token", "data": {"token": token}}
+                    break
+                except Exception:
+                    # Fail over only while the user has not seen any tokens
+                    if chunks or position == len(backends) - 1:
+                        raise
+                    self.router.failovers += 1
+            
+            ai_response = "".join(chunks)
+            await self._cache_response(turn, ai_response)
+            result = await self._complete_turn(turn, ai_response)
+            
+        except Exception as e:
+            if chunks:
+                # Keep what the user has already seen rather than replacing it
+                result = await self._complete_turn(turn, "".join(chunks))
+            else:
+                result = self._fallback_result(turn)
+                yield {"event": "token", "data": {"token": result["response"]}}
+        
+        yield {"event": "done", "data": result}
+
+    async def _prepare_turn(self, message: str, language: str, session_id: Optional[str]) -> "ChatTurn":
+        """
+        Resolve the session and build the message list sent to the model
+        """
         if not session_id:
             session_id = str(uuid.uuid4())
         
-        # Initialize conversation history for new session
-        if session_id not in self.conversation_history:
-            self.conversation_history[session_id] = []
+        with span("history_load"):
+            history, summary = await self.history_store.get_context(session_id)
         
         # Detect if message is in Grenadian Creole
-        is_creole = self._detect_creole(message)
+        with span("detect_creole"):
+            is_creole = self._detect_creole(message)
+        
+        with span("prompt_build"):
+            # Build system prompt based on language
+            system_prompt = self._build_system_prompt(language, is_creole)
+            
+            # Add conversation context
+            prompt = None
+            if self.prompt_assembler is not None:
+                prompt = self.prompt_assembler.assemble(system_prompt, history, message, summary)
+                messages = prompt.messages
+            else:
+                messages = [{"role": "system", "content": system_prompt}]
+                if summary:
+                    messages.append(summary_message(summary))
+                messages.extend(history[-5:])  # Last 5 messages for context
+                messages.append({"role": "user", "content": message})
         
-        # Build system prompt based on language
-        system_prompt = self._build_system_prompt(language, is_creole)
+        turn = ChatTurn(message, language, session_id, is_creole, history, messages, summary)
+        if prompt is not None:
+            turn.prompt_tokens = prompt.prompt_tokens
         
-        # Add conversation context
-        messages = [{"role": "system", "content": system_prompt}]
-        messages.extend(self.conversation_history[session_id][-5:])  # Last 5 messages for context
-        messages.append({"role": "user", "content": message})
+        if not history and (self.response_cache is not None or self.semantic_cache is not None
+                            or self.single_flight is not None):
+            with span("normalize_message"):
+                turn.normalized_message = normalize_message(message)
+            # Grounded answers depend on the knowledge content too, so a change starts a new variant,
+            # including across restarts when the semantic cache is persisted
+            variant = system_prompt if prompt is None else f"{system_prompt}\0{self.prompt_assembler.rag_service.snapshot.digest}"
+            turn.prompt_variant = hashlib.sha1(variant.encode("utf-8")).hexdigest()[:12]
+            # Similar wording about another document or action must never share an answer,
+            # so semantic matches are only searched among questions with the same intent
+            intent = extract_legal_intent(turn.normalized_message)
+            turn.semantic_partition = f"{language}:{turn.prompt_variant}:{intent['document_type']}:{intent['action']}"
         
-        try:
-            # Generate response using OpenAI
-            response = self.client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=messages,
-                max_tokens=500,
-                temperature=0.7
+        return turn
+
+    async def _get_direct_answer(self, turn: "ChatTurn") -> Optional[str]:
+        """
+        Answer without a completion: a knowledge-base lookup first, then the caches
+        """
+        if self.fast_path is not None:
+            with span("fast_path"):
+                answer = self.fast_path.route(turn.message)
+            if answer is not None:
+                DIRECT_ANSWERS.inc("fast_path")
+                return answer
+        with span("cache_lookup"):
+            return await self._get_cached_response(turn)
+
+    def _record_llm_latency(self, elapsed_ms: float):
+        if self.fast_path is not None:
+            self.fast_path.record_llm_latency(elapsed_ms)
+
+    async def _get_cached_response(self, turn: "ChatTurn") -> Optional[str]:
+        """
+        Look for an exact match first, then for a semantically similar question
+        """
+        if not turn.cacheable:
+            return None
+        if self.response_cache is not None:
+            cached = self.response_cache.get(turn.cache_key)
+            if cached is not None:
+                DIRECT_ANSWERS.inc("exact_cache")
+                return cached
+        if self.semantic_cache is not None:
+            # A full index takes milliseconds to search, which would stall every other request on the loop
+            match = await asyncio.to_thread(
+                self.semantic_cache.lookup, turn.normalized_message, turn.semantic_partition
             )
-            
-            ai_response = response.choices[0].message.content
-            
-            # Update conversation history
-            self.conversation_history[session_id].append({"role": "user", "content": message})
-            self.conversation_history[session_id].append({"role": "assistant", "content": ai_response})
-            
+            if match is not None:
+                DIRECT_ANSWERS.inc("semantic_cache")
+                return match[0]
+        return None
+
+    async def _cache_response(self, turn: "ChatTurn", ai_response: str):
+        if not turn.cacheable or not ai_response:
+            return
+        if self.response_cache is not None:
+            self.response_cache.set(turn.cache_key, ai_response)
+        if self.semantic_cache is not None:
+            # Waits on the lock a lookup thread may hold, so it is kept off the loop as well
+            await asyncio.to_thread(
+                self.semantic_cache.add, turn.normalized_message, turn.semantic_partition, ai_response
+            )
+
+    async def _complete_turn(self, turn: "ChatTurn", ai_response: str) -> Dict:
+        """
+        Record a finished exchange and derive its suggested actions and confidence
+        """
+        message, session_id = turn.message, turn.session_id
+        language = "en-GD" if turn.is_creole else "en"
+        
+        with span("post_process"):
             # Extract suggested actions
             suggested_actions = self._extract_suggested_actions(message, ai_response)
             
             # Calculate confidence based on response quality
-            confidence = self._calculate_confidence(message, ai_response, is_creole)
-            
-            return {
-                "response": ai_response,
-                "session_id": session_id,
-                "confidence": confidence,
-                "suggested_actions": suggested_actions,
-                "language_detected": "en-GD" if is_creole else "en"
-            }
-            
-        except Exception as e:
-            # Fallback response if OpenAI fails
-            fallback_response = self._generate_fallback_response(message, language, is_creole)
-            return {
-                "response": fallback_response,
-                "session_id": session_id,
-                "confidence": 0.6,
-                "suggested_actions": ["Contact support", "Try rephrasing your question"],
-                "language_detected": "en-GD" if is_creole else "en"
-            }
+            confidence = self._calculate_confidence(message, ai_response, turn.is_creole)
+        
+        # Update conversation history
+        exchange = [
+            {"role": "user", "content": message},
+            {"role": "assistant", "content": ai_response, "confidence": confidence}
+        ]
+        with span("history_append"):
+            await self.history_store.append(session_id, exchange, language=language)
+        
+        # Compact long sessions off the request path
+        if self.summarizer is not None:
+            self.summarizer.maybe_schedule(session_id, turn.history + exchange, turn.summary)
+        
+        # Persist the turn unless the history store already writes it
+        if self.persistence is not None and not self.history_store.persistent:
+            await self.persistence.record_message(session_id, "user", message, language=language)
+            await self.persistence.record_message(session_id, "bot", ai_response, language=language, confidence=confidence)
+        
+        return {
+            "response": ai_response,
+            "session_id": session_id,
+            "confidence": confidence,
+            "suggested_actions": suggested_actions,
+            "language_detected": language,
+            "fallback": False
+        }
+
+    def _fallback_result(self, turn: "ChatTurn") -> Dict:
+        """
+        Build the response returned when OpenAI is unavailable, preferring what the
+        knowledge base can say about the document the user asked about
+        """
+        degraded = self.fast_path.degraded_answer(turn.message) if self.fast_path is not None else None
+        fallback_response = degraded or self._generate_fallback_response(turn.message, turn.language, turn.is_creole)
+        FALLBACKS.inc("knowledge_base" if degraded else "generic")
+        return {
+            "response": fallback_response,
+            "session_id": turn.session_id,
+            "confidence": 0.6,
+            "suggested_actions": ["Contact support", "Try rephrasing your question"],
+            "language_detected": "en-GD" if turn.is_creole else "en",
+            "fallback": True
+        }
+
+    async def start(self):
+        """
+        Warm the local model and start its keepalive
+        """
+        for backend in self.router.backends.values():
+            await backend.start()
+
+    async def close(self):
+        """
+        Release pooled HTTP connections held by the backend clients
+        """
+        if self.summarizer is not None:
+            await self.summarizer.close()
+        if self.semantic_cache is not None:
+            self.semantic_cache.flush()
+        for backend in self.router.backends.values():
+            await backend.close()
 
     def _detect_creole(self, message: str) -> bool:
         """
@@ -0,0 +1,104 @@
+# Keyset-paginated reads of a session's stored chat messages
+
+import base64
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.models import ChatSession, ChatMessage
+
+ORDERS = ("asc", "desc")
+
+def encode_cursor(created_at: Optional[datetime], message_id: int) -> str:
+    """
+    Opaque cursor for the position just after a message. created_at is nullable in
+    the schema; such rows are paged by id alone and get an empty timestamp here.
+    """
+    timestamp = created_at.isoformat() if created_at is not None else ""
+    return base64.urlsafe_b64encode(f"{timestamp}|{message_id}".encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """
+    Inverse of encode_cursor; raises ValueError for anything it did not produce
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, message_id = raw.split("|")
+        return (datetime.fromisoformat(created_at) if created_at else None), int(message_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+def _serialize(row: ChatMessage) -> Dict:
+    return {
+        "id": row.id,
+        "message_type": row.message_type,
+        "content": row.content,
+        "language": row.language,
+        "confidence": row.confidence,
+        "created_at": row.created_at.isoformat() if row.created_at else None
+    }
+
+def _undated_page(session_id: str, descending: bool, after: Optional[int]):
+    # Rows without a created_at, in id order; equality on NULL still seeks the index
+    statement = select(ChatMessage).where(ChatMessage.session_id == session_id, ChatMessage.created_at.is_(None))
+    if after is not None:
+        statement = statement.where(ChatMessage.id < after if descending else ChatMessage.id > after)
+    return statement.order_by(ChatMessage.id.desc() if descending else ChatMessage.id)
+
+def _dated_page(session_id: str, descending: bool, after: Optional[Tuple[datetime, int]]):
+    statement = select(ChatMessage).where(ChatMessage.session_id == session_id)
+    if after is None:
+        statement = statement.where(ChatMessage.created_at.is_not(None))
+    else:
+        created_at, message_id = after
+        # The leading created_at bound is what lets the index seek; the OR breaks ties on id
+        if descending:
+            statement = statement.where(ChatMessage.created_at <= created_at, or_(
+                ChatMessage.created_at < created_at,
+                and_(ChatMessage.created_at == created_at, ChatMessage.id < message_id)
+            ))
+        else:
+            statement = statement.where(ChatMessage.created_at >= created_at, or_(
+                ChatMessage.created_at > created_at,
+                and_(ChatMessage.created_at == created_at, ChatMessage.id > message_id)
+            ))
+    if descending:
+        return statement.order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+    return statement.order_by(ChatMessage.created_at, ChatMessage.id)
+
+async def fetch_message_page(db: AsyncSession, session_id: str, limit: int, cursor: Optional[str] = None,
+                             order: str = "asc") -> Tuple[List[Dict], Optional[str]]:
+    """
+    One page of a session's messages ordered by (created_at, id) and the cursor of the next page.
+    Pages continue from the last row seen instead of using OFFSET, so the
+    (session_id, created_at, id) index is entered at the cursor and every page costs the same.
+    Rows without a created_at sort before all others, by id.
+    """
+    if order not in ORDERS:
+        raise ValueError(f"order must be one of {', '.join(ORDERS)}")
+    descending = order == "desc"
+    position = decode_cursor(cursor) if cursor is not None else None
+    # Undated and dated rows are two runs, each read with its own index seek
+    runs = [True, False] if descending else [False, True]
+    if position is not None:
+        runs = runs[runs.index(position[0] is not None):]
+    rows = []
+    for index, dated in enumerate(runs):
+        after = position if index == 0 else None
+        if dated:
+            statement = _dated_page(session_id, descending, after)
+        else:
+            statement = _undated_page(session_id, descending, after[1] if after else None)
+        # One extra row tells whether another page exists without a COUNT
+        rows.extend((await db.execute(statement.limit(limit + 1 - len(rows)))).scalars().all())
+        if len(rows) > limit:
+            break
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return [_serialize(row) for row in rows], next_cursor
+
+async def session_exists(db: AsyncSession, session_id: str) -> bool:
+    result = await db.execute(select(ChatSession.id).where(ChatSession.session_id == session_id).limit(1))
+    return result.first() is not None
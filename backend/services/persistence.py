@@ -0,0 +1,201 @@
+# Write-behind persistence of chat turns and document queries
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import insert, select, update
+from config import settings
+from services.db import get_async_session_factory, write_session
+from database.models import ChatSession, ChatMessage, DocumentQuery
+
+logger = logging.getLogger(__name__)
+
+class ChatPersistenceQueue:
+    """
+    Buffers chat rows in memory and writes them in bulk off the request path.
+    A batch is flushed when it reaches batch_size rows or flush_interval_ms elapses.
+    """
+    def __init__(self, batch_size: int = None, flush_interval_ms: float = None,
+                 max_queue_size: int = None, enqueue_timeout_seconds: float = None, session_factory=None):
+        self.batch_size = batch_size or settings.PERSIST_BATCH_SIZE
+        self.flush_interval = (flush_interval_ms or settings.PERSIST_FLUSH_INTERVAL_MS) / 1000
+        self.enqueue_timeout = enqueue_timeout_seconds if enqueue_timeout_seconds is not None else settings.PERSIST_ENQUEUE_TIMEOUT_SECONDS
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size or settings.PERSIST_QUEUE_MAXSIZE)
+        self._session_factory = session_factory
+        self._worker: Optional[asyncio.Task] = None
+        self._known_sessions = set()
+        # Message rows enqueued but not yet written, per session, in queue order
+        self._pending: Dict[str, List[Dict]] = {}
+        self.rows_written = 0
+        self.batches_written = 0
+        self.rows_dropped = 0
+        self.write_errors = 0
+
+    @property
+    def session_factory(self):
+        if self._session_factory is None:
+            self._session_factory = get_async_session_factory()
+        return self._session_factory
+
+    async def start(self):
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Flush everything still queued and stop the worker
+        """
+        if self._worker is None:
+            return
+        await self.queue.put(None)
+        await self._worker
+        self._worker = None
+
+    async def record_message(self, session_id: str, message_type: str, content: str,
+                             language: str = "en", confidence: float = 1.0):
+        row = {
+            "session_id": session_id,
+            "message_type": message_type,
+            "content": content,
+            "language": language,
+            "confidence": confidence,
+            "created_at": datetime.utcnow()
+        }
+        if await self._enqueue(("message", row)):
+            self._pending.setdefault(session_id, []).append(row)
+
+    def pending_messages(self, session_id: str) -> List[Dict]:
+        """
+        Message rows of a session still waiting in the queue or in the batch being written
+        """
+        return list(self._pending.get(session_id, ()))
+
+    async def record_document_query(self, session_id: str, document_type: str, query_text: str,
+                                    response_text: str, language: str = "en"):
+        await self._enqueue(("document_query", {
+            "session_id": session_id,
+            "document_type": document_type,
+            "query_text": query_text,
+            "response_text": response_text,
+            "language": language,
+            "created_at": datetime.utcnow()
+        }))
+
+    def stats(self) -> Dict:
+        return {
+            "queued": self.queue.qsize(),
+            "rows_written": self.rows_written,
+            "batches_written": self.batches_written,
+            "rows_dropped": self.rows_dropped,
+            "write_errors": self.write_errors
+        }
+
+    async def _enqueue(self, item) -> bool:
+        # Backpressure: wait for room, but never hold a request longer than the timeout
+        try:
+            await asyncio.wait_for(self.queue.put(item), timeout=self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            self.rows_dropped += 1
+            logger.warning("Persistence queue full, dropped %s row", item[0])
+            return False
+        return True
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        closing = False
+        while not closing:
+            item = await self.queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+        
+        # Drain whatever arrived behind the shutdown marker
+        remaining_items = []
+        while not self.queue.empty():
+            item = self.queue.get_nowait()
+            if item is not None:
+                remaining_items.append(item)
+        for start in range(0, len(remaining_items), self.batch_size):
+            await self._flush(remaining_items[start:start + self.batch_size])
+
+    async def _flush(self, batch: List):
+        try:
+            await self._write_batch(batch)
+            self.rows_written += len(batch)
+            self.batches_written += 1
+        except Exception as e:
+            self.write_errors += 1
+            logger.exception("Failed to persist batch of %d rows: %s", len(batch), e)
+        finally:
+            self._release_pending(batch)
+
+    def _release_pending(self, batch: List):
+        # Batches leave the queue in order, so a session's written rows are the head of its list
+        written: Dict[str, int] = {}
+        for kind, row in batch:
+            if kind == "message":
+                written[row["session_id"]] = written.get(row["session_id"], 0) + 1
+        for session_id, count in written.items():
+            pending = self._pending.get(session_id)
+            if pending is None:
+                continue
+            del pending[:count]
+            if not pending:
+                del self._pending[session_id]
+
+    async def _write_batch(self, batch: List):
+        messages = [row for kind, row in batch if kind == "message"]
+        queries = [row for kind, row in batch if kind == "document_query"]
+        
+        async with write_session(self.session_factory) as db:
+            # Parent sessions must exist before their rows reference them
+            session_languages = {}
+            new_sessions = []
+            for row in messages + queries:
+                if row["session_id"] not in self._known_sessions:
+                    session_languages.setdefault(row["session_id"], row["language"])
+            if session_languages:
+                existing = set((await db.execute(
+                    select(ChatSession.session_id).where(ChatSession.session_id.in_(list(session_languages)))
+                )).scalars())
+                new_sessions = [
+                    {"session_id": session_id, "language_preference": language}
+                    for session_id, language in session_languages.items() if session_id not in existing
+                ]
+                if new_sessions:
+                    await db.execute(insert(ChatSession), new_sessions)
+            
+            # Keep active sessions from expiring by age: history reads check updated_at
+            touched = {row["session_id"] for row in messages + queries}
+            touched.difference_update(row["session_id"] for row in new_sessions)
+            if touched:
+                await db.execute(
+                    update(ChatSession)
+                    .where(ChatSession.session_id.in_(list(touched)))
+                    .values(updated_at=datetime.utcnow())
+                )
+            
+            if messages:
+                await db.execute(insert(ChatMessage), messages)
+            if queries:
+                await db.execute(insert(DocumentQuery), queries)
+            await db.commit()
+        
+        self._known_sessions.update(session_languages)
+        if len(self._known_sessions) > 100000:
+            self._known_sessions.clear()
@@ -0,0 +1,231 @@
+# Prompt assembly: retrieved knowledge and recent history packed under a token budget
+
+import re
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from config import settings
+from utils.helpers import translate_creole
+from utils.metrics import span
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - falls back to the heuristic counter
+    tiktoken = None
+
+_HEURISTIC_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+# Chat formatting overhead per message and for the reply primer, as counted by OpenAI
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 2
+
+CONTEXT_HEADER = "Reference information from the Grenadian registry knowledge base (use it when relevant):"
+SUMMARY_HEADER = "Summary of the earlier conversation:"
+
+def summary_message(summary: str) -> Dict:
+    return {"role": "system", "content": f"{SUMMARY_HEADER} {summary}"}
+
+class TokenCounter:
+    """
+    Counts tokens with tiktoken when it is installed, otherwise estimates them:
+    one token per punctuation mark and per started four characters of a word.
+    Counts are memoised, since history messages are re-counted on every turn.
+    """
+    def __init__(self, model: str = None, cache_size: int = None):
+        self.count = lru_cache(maxsize=cache_size or settings.PROMPT_TOKEN_CACHE_SIZE)(self._count)
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.encoding_for_model(model or settings.OPENAI_MODEL)
+            except KeyError:
+                self.encoding = tiktoken.get_encoding("cl100k_base")
+        self.name = self.encoding.name if self.encoding is not None else "heuristic"
+
+    def _count(self, text: str) -> int:
+        if self.encoding is not None:
+            return len(self.encoding.encode(text))
+        return sum((len(token) + 3) // 4 for token in _HEURISTIC_TOKEN.findall(text))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """
+        Longest prefix of text that counts as at most max_tokens
+        """
+        if max_tokens <= 0:
+            return ""
+        if self.count(text) <= max_tokens:
+            return text
+        if self.encoding is not None:
+            text = self.encoding.decode(self.encoding.encode(text)[:max_tokens])
+        # Prefixes are counted uncached so they do not crowd real messages out of the memo
+        low, high = 0, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self._count(text[:middle]) <= max_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        return text[:low].rstrip()
+
+class AssembledPrompt:
+    """
+    Messages for one completion plus what went into them
+    """
+    __slots__ = ("messages", "prompt_tokens", "passages", "history_messages", "assembly_ms")
+
+    def __init__(self, messages: List[Dict], prompt_tokens: int, passages: List[str],
+                 history_messages: int, assembly_ms: float):
+        self.messages = messages
+        self.prompt_tokens = prompt_tokens
+        self.passages = passages
+        self.history_messages = history_messages
+        self.assembly_ms = assembly_ms
+
+class PromptAssembler:
+    """
+    Builds the message list for a turn: the static system prompt, the session summary
+    if there is one, the top-k knowledge passages for the message and the last user
+    turn, and the most recent history, newest first, until the token budget is spent.
+    Recent history may use at most half of what is left after the fixed parts. The latest
+    exchange is always kept, truncated if it is too long; older messages that do not fit
+    are skipped so shorter ones before them can still be included.
+    """
+    def __init__(self, rag_service, token_budget: int = None, top_k: int = None,
+                 max_history_messages: int = None, counter: Optional[TokenCounter] = None):
+        self.rag_service = rag_service
+        self.token_budget = token_budget or settings.PROMPT_TOKEN_BUDGET
+        self.top_k = top_k or settings.PROMPT_CONTEXT_TOP_K
+        self.max_history_messages = max_history_messages or settings.PROMPT_MAX_HISTORY_MESSAGES
+        self.counter = counter or TokenCounter()
+        # System prompts come from a handful of templates, so their counts are kept for good
+        self._system_tokens: Dict[str, int] = {}
+        # Passage counts are valid for one knowledge snapshot
+        self._passage_tokens: Dict[str, int] = {}
+        self._passage_version = None
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.assembly_ms = 0.0
+
+    def _message_tokens(self, text: str) -> int:
+        return self.counter.count(text) + TOKENS_PER_MESSAGE
+
+    def system_prompt_tokens(self, system_prompt: str) -> int:
+        tokens = self._system_tokens.get(system_prompt)
+        if tokens is None:
+            tokens = self._system_tokens[system_prompt] = self._message_tokens(system_prompt)
+        return tokens
+
+    def _fit_exchange(self, exchange: List[Dict], budget: int) -> List[Dict]:
+        """
+        Messages of the latest exchange, the longest truncated so that all of them fit the
+        budget: each gets an even share, and what short messages leave over goes to the rest
+        """
+        tokens = [self._message_tokens(previous["content"]) for previous in exchange]
+        allowed = list(tokens)
+        if sum(tokens) > budget:
+            left, pending = budget, len(exchange)
+            for i in sorted(range(len(exchange)), key=tokens.__getitem__):
+                allowed[i] = min(tokens[i], left // pending)
+                left -= allowed[i]
+                pending -= 1
+        fitted = []
+        for previous, count, allowance in zip(exchange, tokens, allowed):
+            content = previous["content"]
+            if allowance < count:
+                content = self.counter.truncate(content, allowance - TOKENS_PER_MESSAGE)
+                if not content:
+                    continue
+            fitted.append({"role": previous["role"], "content": content})
+        return fitted
+
+    def retrieve(self, message: str, history: List[Dict]) -> List[Tuple[str, str, int]]:
+        """
+        Top-k (passage_id, text, tokens) for the message and the previous user turn
+        """
+        snapshot = self.rag_service.snapshot
+        if snapshot.version != self._passage_version:
+            self._passage_tokens = {}
+            self._passage_version = snapshot.version
+        query = message
+        for previous in reversed(history):
+            if previous["role"] == "user":
+                query = f"{previous['content']} {message}"
+                break
+        query = translate_creole(query, "en", track_usage=False)
+        results = []
+        with span("rag_retrieve"):
+            hits = snapshot.passage_index.search(query, k=self.top_k)
+        for passage_id, _ in hits:
+            text = snapshot.passages[passage_id]
+            tokens = self._passage_tokens.get(passage_id)
+            if tokens is None:
+                tokens = self._passage_tokens[passage_id] = self.counter.count(text) + 1
+            results.append((passage_id, text, tokens))
+        return results
+
+    def assemble(self, system_prompt: str, history: List[Dict], message: str,
+                 summary: Optional[str] = None) -> AssembledPrompt:
+        started = time.perf_counter()
+        used = self.system_prompt_tokens(system_prompt) + self._message_tokens(message) + TOKENS_PER_REPLY
+        summarized = summary_message(summary) if summary else None
+        if summarized is not None:
+            used += self._message_tokens(summarized["content"])
+        remaining = max(self.token_budget - used, 0)
+
+        # The latest exchange (from the last user message on) always goes in, then older
+        # messages newest first, skipping any that no longer fit
+        history_budget = remaining // 2
+        window = history[-self.max_history_messages:]
+        latest_exchange = max((i for i, previous in enumerate(window) if previous["role"] == "user"),
+                              default=max(len(window) - 2, 0))
+        recent = self._fit_exchange(window[latest_exchange:], history_budget)
+        for previous in recent:
+            history_budget -= self._message_tokens(previous["content"])
+        for previous in reversed(window[:latest_exchange]):
+            tokens = self._message_tokens(previous["content"])
+            if tokens > history_budget:
+                continue
+            history_budget -= tokens
+            recent.insert(0, {"role": previous["role"], "content": previous["content"]})
+        history_tokens = sum(self._message_tokens(previous["content"]) for previous in recent)
+        remaining -= history_tokens
+        used += history_tokens
+
+        # Passages in rank order; a large one is skipped so smaller ones can still fit
+        passages = []
+        context_tokens = self._message_tokens(CONTEXT_HEADER)
+        for passage_id, text, tokens in self.retrieve(message, history):
+            if context_tokens + tokens > remaining:
+                continue
+            context_tokens += tokens
+            passages.append((passage_id, text))
+
+        messages = [{"role": "system", "content": system_prompt}]
+        if summarized is not None:
+            messages.append(summarized)
+        if passages:
+            context = "\n".join([CONTEXT_HEADER] + [f"- {text}" for _, text in passages])
+            messages.append({"role": "system", "content": context})
+            used += context_tokens
+        messages.extend(recent)
+        messages.append({"role": "user", "content": message})
+
+        assembly_ms = (time.perf_counter() - started) * 1000
+        self.requests += 1
+        self.prompt_tokens += used
+        self.assembly_ms += assembly_ms
+        return AssembledPrompt(
+            messages=messages,
+            prompt_tokens=used,
+            passages=[passage_id for passage_id, _ in passages],
+            history_messages=len(recent),
+            assembly_ms=assembly_ms
+        )
+
+    def stats(self) -> Dict:
+        return {
+            "tokenizer": self.counter.name,
+            "token_budget": self.token_budget,
+            "requests": self.requests,
+            "avg_prompt_tokens": round(self.prompt_tokens / self.requests, 1) if self.requests else 0.0,
+            "avg_assembly_ms": round(self.assembly_ms / self.requests, 3) if self.requests else 0.0
+        }
@@ -1,371 +1,382 @@
 # Retrieval-augmented generation pipeline
 
+import asyncio
 import json
-from typing import Dict, List, Optional
+import logging
+from typing import Dict, List, Mapping, Optional
 from config import settings
+from utils.metrics import span
+from services.knowledge_base import (
+    DOCUMENT_NOT_FOUND, DOCUMENT_NOT_FOUND_BODY, KnowledgeSnapshot, build_snapshot, classify_document_query,
+    load_documents, read_fingerprint
+)
+
+logger = logging.getLogger(__name__)
+
+# Comprehensive legal document knowledge base, used until (and alongside) LegalDocument rows
+DEFAULT_DOCUMENT_KNOWLEDGE = {
+    "birth_certificate": {
+        "information": "Birth certificates are official documents that record a person's birth. They are essential for various legal purposes including school enrollment, passport applications, and government services.",
+        "requirements": [
+            "Completed birth registration form",
+            "Parent's valid identification (passport, national ID, or driver's license)",
+            "Hospital birth record or midwife's certificate",
+            "Witness statement (if applicable)",
+            "Payment of EC$25.00 fee"
+        ],
+        "process_steps": [
+            "Visit the Civil Registry Office in St. George's",
+            "Submit all required documents",
+            "Pay the application fee",
+            "Wait for processing (3-5 business days)",
+            "Collect the certificate in person or arrange for delivery"
+        ],
+        "contact_info": {
+            "office": "Civil Registry Office",
+            "address": "Ministerial Complex, Botanical Gardens, St. George's",
+            "phone": "+1 (473) 440-2251",
+            "email": "civilregistry@gov.gd",
+            "hours": "Monday-Friday, 8:00 AM - 4:00 PM"
+        },
+        "estimated_time": "3-5 business days",
+        "fees": "EC$25.00"
+    },
+    "death_certificate": {
+        "information": "Death certificates are official documents that record a person's death. They are required for legal proceedings, insurance claims, and estate matters.",
+        "requirements": [
+            "Medical certificate of death from a doctor",
+            "Funeral director's statement",
+            "Next of kin's identification",
+            "Completed application form",
+            "Payment of EC$20.00 fee"
+        ],
+        "process_steps": [
+            "Obtain medical certificate of death",
+            "Contact funeral director for statement",
+            "Visit Civil Registry Office",
+            "Submit all documents and payment",
+            "Wait for processing (2-3 business days)",
+            "Collect certificate"
+        ],
+        "contact_info": {
+            "office": "Civil Registry Office",
+            "address": "Ministerial Complex, Botanical Gardens, St. George's",
+            "phone": "+1 (473) 440-2251",
+            "email": "civilregistry@gov.gd",
+            "hours": "Monday-Friday, 8:00 AM - 4:00 PM"
+        },
+        "estimated_time": "2-3 business days",
+        "fees": "EC$20.00"
+    },
+    "marriage_certificate": {
+        "information": "Marriage certificates are official documents that prove a legal marriage. They are required for name changes, insurance, and other legal purposes.",
+        "requirements": [
+            "Marriage license (obtained before ceremony)",
+            "Officiant's certificate of marriage",
+            "Witness statements",
+            "Both parties' identification",
+            "Payment of EC$30.00 fee"
+        ],
+        "process_steps": [
+            "Apply for marriage license (21 days notice required)",
+            "Conduct marriage ceremony with licensed officiant",
+            "Submit marriage certificate to Civil Registry",
+            "Wait for official registration",
+            "Obtain certified copy of marriage certificate"
+        ],
+        "contact_info": {
+            "office": "Civil Registry Office",
+            "address": "Ministerial Complex, Botanical Gardens, St. George's",
+            "phone": "+1 (473) 440-2251",
+            "email": "civilregistry@gov.gd",
+            "hours": "Monday-Friday, 8:00 AM - 4:00 PM"
+        },
+        "estimated_time": "5-7 business days",
+        "fees": "EC$30.00"
+    },
+    "divorce_decree": {
+        "information": "Divorce decrees are court-issued documents that legally end a marriage. They are required for remarriage and other legal proceedings.",
+        "requirements": [
+            "Petition for divorce",
+            "Marriage certificate",
+            "Grounds for divorce documentation",
+            "Legal representation (recommended)",
+            "Court filing fees"
+        ],
+        "process_steps": [
+            "Consult with a lawyer",
+            "File petition with the High Court",
+            "Serve papers to spouse",
+            "Attend court hearings",
+            "Obtain final decree",
+            "Register decree with Civil Registry"
+        ],
+        "contact_info": {
+            "office": "High Court of Grenada",
+            "address": "Carenage, St. George's",
+            "phone": "+1 (473) 440-2251",
+            "email": "courts@gov.gd",
+            "hours": "Monday-Friday, 8:00 AM - 4:00 PM"
+        },
+        "estimated_time": "3-6 months",
+        "fees": "Varies based on complexity"
+    },
+    "property_deed": {
+        "information": "Property deeds are legal documents that prove ownership of real estate. They are essential for property transactions and inheritance matters.",
+        "requirements": [
+            "Survey plan of the property",
+            "Title search report",
+            "Transfer documents",
+            "Stamp duty payment",
+            "Legal representation (required)"
+        ],
+        "process_steps": [
+            "Conduct title search",
+            "Obtain survey plan",
+            "Prepare transfer documents",
+            "Pay stamp duty",
+            "Register with Land Registry",
+            "Obtain certified copy of deed"
+        ],
+        "contact_info": {
+            "office": "Land Registry Office",
+            "address": "Ministerial Complex, Botanical Gardens, St. George's",
+            "phone": "+1 (473) 440-2251",
+            "email": "landregistry@gov.gd",
+            "hours": "Monday-Friday, 8:00 AM - 4:00 PM"
+        },
+        "estimated_time": "2-4 weeks",
+        "fees": "Based on property value"
+    },
+    "business_registration": {
+        "information": "Business registration is required for operating a business in Grenada. It provides legal recognition and tax identification.",
+        "requirements": [
+            "Business name reservation",
+            "Completed registration form",
+            "Business plan",
+            "Identification documents",
+            "Registration fee payment"
+        ],
+        "process_steps": [
+            "Reserve business name",
+            "Complete registration application",
+            "Submit required documents",
+            "Pay registration fees",
+            "Obtain business license",
+            "Register for taxes"
+        ],
+        "contact_info": {
+            "office": "Companies Registry",
+            "address": "Ministerial Complex, Botanical Gardens, St. George's",
+            "phone": "+1 (473) 440-2251",
+            "email": "companies@gov.gd",
+            "hours": "Monday-Friday, 8:00 AM - 4:00 PM"
+        },
+        "estimated_time": "5-10 business days",
+        "fees": "EC$200.00 - EC$500.00"
+    },
+    "passport_application": {
+        "information": "Grenadian passports are travel documents issued to citizens. They are required for international travel and serve as proof of citizenship.",
+        "requirements": [
+            "Completed passport application form",
+            "Birth certificate",
+            "National ID or previous passport",
+            "Two passport photos",
+            "Payment of passport fee"
+        ],
+        "process_steps": [
+            "Complete application form",
+            "Gather required documents",
+            "Visit Passport Office",
+            "Submit application and payment",
+            "Wait for processing",
+            "Collect passport"
+        ],
+        "contact_info": {
+            "office": "Passport Office",
+            "address": "Ministerial Complex, Botanical Gardens, St. George's",
+            "phone": "+1 (473) 440-2251",
+            "email": "passports@gov.gd",
+            "hours": "Monday-Friday, 8:00 AM - 4:00 PM"
+        },
+        "estimated_time": "10-15 business days",
+        "fees": "EC$150.00"
+    },
+    "national_id": {
+        "information": "National ID cards are official identification documents for Grenadian citizens. They are required for various government services and transactions.",
+        "requirements": [
+            "Completed ID application form",
+            "Birth certificate",
+            "Proof of address",
+            "Passport photo",
+            "Application fee"
+        ],
+        "process_steps": [
+            "Complete application form",
+            "Gather required documents",
+            "Visit ID Office",
+            "Submit application and payment",
+            "Wait for processing",
+            "Collect ID card"
+        ],
+        "contact_info": {
+            "office": "National ID Office",
+            "address": "Ministerial Complex, Botanical Gardens, St. George's",
+            "phone": "+1 (473) 440-2251",
+            "email": "nationalid@gov.gd",
+            "hours": "Monday-Friday, 8:00 AM - 4:00 PM"
+        },
+        "estimated_time": "7-10 business days",
+        "fees": "EC$50.00"
+    },
+    "voter_registration": {
+        "information": "Voter registration allows citizens to participate in elections. Registration is required to vote in national and local elections.",
+        "requirements": [
+            "Completed voter registration form",
+            "Proof of citizenship",
+            "Proof of address",
+            "Identification document",
+            "Age 18 or older"
+        ],
+        "process_steps": [
+            "Complete registration form",
+            "Gather required documents",
+            "Visit Electoral Office",
+            "Submit application",
+            "Wait for verification",
+            "Receive voter ID card"
+        ],
+        "contact_info": {
+            "office": "Electoral Office",
+            "address": "Ministerial Complex, Botanical Gardens, St. George's",
+            "phone": "+1 (473) 440-2251",
+            "email": "electoral@gov.gd",
+            "hours": "Monday-Friday, 8:00 AM - 4:00 PM"
+        },
+        "estimated_time": "5-7 business days",
+        "fees": "Free"
+    },
+    "tax_documents": {
+        "information": "Tax documents include various forms and certificates required for tax compliance and business operations in Grenada.",
+        "requirements": [
+            "Business registration certificate",
+            "Financial records",
+            "Completed tax forms",
+            "Supporting documentation",
+            "Payment of taxes due"
+        ],
+        "process_steps": [
+            "Register for tax identification",
+            "Maintain proper records",
+            "Complete tax returns",
+            "Submit to Inland Revenue",
+            "Pay taxes due",
+            "Obtain tax clearance certificate"
+        ],
+        "contact_info": {
+            "office": "Inland Revenue Department",
+            "address": "Ministerial Complex, Botanical Gardens, St. George's",
+            "phone": "+1 (473) 440-2251",
+            "email": "tax@gov.gd",
+            "hours": "Monday-Friday, 8:00 AM - 4:00 PM"
+        },
+        "estimated_time": "Varies by document type",
+        "fees": "Varies by tax type"
+    }
+}
 
 class RAGService:
-    def __init__(self):
-        # Comprehensive legal document knowledge base
-        self.document_knowledge = {
-            "birth_certificate": {
-                "information": "Birth certificates are official documents that record a person's birth. They are essential for various legal purposes including school enrollment, passport applications, and government services.",
-                "requirements": [
-                    "Completed birth registration form",
-                    "Parent's valid identification (passport, national ID, or driver's license)",
-                    "Hospital birth record or midwife's certificate",
-                    "Witness statement (if applicable)",
-                    "Payment of EC$25.00 fee"
-                ],
-                "process_steps": [
-                    "Visit the Civil Registry Office in St. George's",
-                    "Submit all required documents",
-                    "Pay the application fee",
-                    "Wait for processing (3-5 business days)",
-                    "Collect the certificate in person or arrange for delivery"
-                ],
-                "contact_info": {
-                    "office": "Civil Registry Office",
-                    "address": "Ministerial Complex, Botanical Gardens, St. George's",
-                    "phone": "+1 (473) 440-2251",
-                    "email": "civilregistry@gov.gd",
-                    "hours": "Monday-Friday, 8:00 AM - 4:00 PM"
-                },
-                "estimated_time": "3-5 business days",
-                "fees": "EC$25.00"
-            },
-            "death_certificate": {
-                "information": "Death certificates are official documents that record a person's death. They are required for legal proceedings, insurance claims, and estate matters.",
-                "requirements": [
-                    "Medical certificate of death from a doctor",
-                    "Funeral director's statement",
-                    "Next of kin's identification",
-                    "Completed application form",
-                    "Payment of EC$20.00 fee"
-                ],
-                "process_steps": [
-                    "Obtain medical certificate of death",
-                    "Contact funeral director for statement",
-                    "Visit Civil Registry Office",
-                    "Submit all documents and payment",
-                    "Wait for processing (2-3 business days)",
-                    "Collect certificate"
-                ],
-                "contact_info": {
-                    "office": "Civil Registry Office",
-                    "address": "Ministerial Complex, Botanical Gardens, St. George's",
-                    "phone": "+1 (473) 440-2251",
-                    "email": "civilregistry@gov.gd",
-                    "hours": "Monday-Friday, 8:00 AM - 4:00 PM"
-                },
-                "estimated_time": "2-3 business days",
-                "fees": "EC$20.00"
-            },
-            "marriage_certificate": {
-                "information": "Marriage certificates are official documents that prove a legal marriage. They are required for name changes, insurance, and other legal purposes.",
-                "requirements": [
-                    "Marriage license (obtained before ceremony)",
-                    "Officiant's certificate of marriage",
-                    "Witness statements",
-                    "Both parties' identification",
-                    "Payment of EC$30.00 fee"
-                ],
-                "process_steps": [
-                    "Apply for marriage license (21 days notice required)",
-                    "Conduct marriage ceremony with licensed officiant",
-                    "Submit marriage certificate to Civil Registry",
-                    "Wait for official registration",
-                    "Obtain certified copy of marriage certificate"
-                ],
-                "contact_info": {
-                    "office": "Civil Registry Office",
-                    "address": "Ministerial Complex, Botanical Gardens, St. George's",
-                    "phone": "+1 (473) 440-2251",
-                    "email": "civilregistry@gov.gd",
-                    "hours": "Monday-Friday, 8:00 AM - 4:00 PM"
-                },
-                "estimated_time": "5-7 business days",
-                "fees": "EC$30.00"
-            },
-            "divorce_decree": {
-                "information": "Divorce decrees are court-issued documents that legally end a marriage. They are required for remarriage and other legal proceedings.",
-                "requirements": [
-                    "Petition for divorce",
-                    "Marriage certificate",
-                    "Grounds for divorce documentation",
-                    "Legal representation (recommended)",
-                    "Court filing fees"
-                ],
-                "process_steps": [
-                    "Consult with a lawyer",
-                    "File petition with the High Court",
-                    "Serve papers to spouse",
-                    "Attend court hearings",
-                    "Obtain final decree",
-                    "Register decree with Civil Registry"
-                ],
-                "contact_info": {
-                    "office": "High Court of Grenada",
-                    "address": "Carenage, St. George's",
-                    "phone": "+1 (473) 440-2251",
-                    "email": "courts@gov.gd",
-                    "hours": "Monday-Friday, 8:00 AM - 4:00 PM"
-                },
-                "estimated_time": "3-6 months",
-                "fees": "Varies based on complexity"
-            },
-            "property_deed": {
-                "information": "Property deeds are legal documents that prove ownership of real estate. They are essential for property transactions and inheritance matters.",
-                "requirements": [
-                    "Survey plan of the property",
-                    "Title search report",
-                    "Transfer documents",
-                    "Stamp duty payment",
-                    "Legal representation (required)"
-                ],
-                "process_steps": [
-                    "Conduct title search",
-                    "Obtain survey plan",
-                    "Prepare transfer documents",
-                    "Pay stamp duty",
-                    "Register with Land Registry",
-                    "Obtain certified copy of deed"
-                ],
-                "contact_info": {
-                    "office": "Land Registry Office",
-                    "address": "Ministerial Complex, Botanical Gardens, St. George's",
-                    "phone": "+1 (473) 440-2251",
-                    "email": "landregistry@gov.gd",
-                    "hours": "Monday-Friday, 8:00 AM - 4:00 PM"
-                },
-                "estimated_time": "2-4 weeks",
-                "fees": "Based on property value"
-            },
-            "business_registration": {
-                "information": "Business registration is required for operating a business in Grenada. It provides legal recognition and tax identification.",
-                "requirements": [
-                    "Business name reservation",
-                    "Completed registration form",
-                    "Business plan",
-                    "Identification documents",
-                    "Registration fee payment"
-                ],
-                "process_steps": [
-                    "Reserve business name",
-                    "Complete registration application",
-                    "Submit required documents",
-                    "Pay registration fees",
-                    "Obtain business license",
-                    "Register for taxes"
-                ],
-                "contact_info": {
-                    "office": "Companies Registry",
-                    "address": "Ministerial Complex, Botanical Gardens, St. George's",
-                    "phone": "+1 (473) 440-2251",
-                    "email": "companies@gov.gd",
-                    "hours": "Monday-Friday, 8:00 AM - 4:00 PM"
-                },
-                "estimated_time": "5-10 business days",
-                "fees": "EC$200.00 - EC$500.00"
-            },
-            "passport_application": {
-                "information": "Grenadian passports are travel documents issued to citizens. They are required for international travel and serve as proof of citizenship.",
-                "requirements": [
-                    "Completed passport application form",
-                    "Birth certificate",
-                    "National ID or previous passport",
-                    "Two passport photos",
-                    "Payment of passport fee"
-                ],
-                "process_steps": [
-                    "Complete application form",
-                    "Gather required documents",
-                    "Visit Passport Office",
-                    "Submit application and payment",
-                    "Wait for processing",
-                    "Collect passport"
-                ],
-                "contact_info": {
-                    "office": "Passport Office",
-                    "address": "Ministerial Complex, Botanical Gardens, St. George's",
-                    "phone": "+1 (473) 440-2251",
-                    "email": "passports@gov.gd",
-                    "hours": "Monday-Friday, 8:00 AM - 4:00 PM"
-                },
-                "estimated_time": "10-15 business days",
-                "fees": "EC$150.00"
-            },
-            "national_id": {
-                "information": "National ID cards are official identification documents for Grenadian citizens. They are required for various government services and transactions.",
-                "requirements": [
-                    "Completed ID application form",
-                    "Birth certificate",
-                    "Proof of address",
-                    "Passport photo",
-                    "Application fee"
-                ],
-                "process_steps": [
-                    "Complete application form",
-                    "Gather required documents",
-                    "Visit ID Office",
-                    "Submit application and payment",
-                    "Wait for processing",
-                    "Collect ID card"
-                ],
-                "contact_info": {
-                    "office": "National ID Office",
-                    "address": "Ministerial Complex, Botanical Gardens, St. George's",
-                    "phone": "+1 (473) 440-2251",
-                    "email": "nationalid@gov.gd",
-                    "hours": "Monday-Friday, 8:00 AM - 4:00 PM"
-                },
-                "estimated_time": "7-10 business days",
-                "fees": "EC$50.00"
-            },
-            "voter_registration": {
-                "information": "Voter registration allows citizens to participate in elections. Registration is required to vote in national and local elections.",
-                "requirements": [
-                    "Completed voter registration form",
-                    "Proof of citizenship",
-                    "Proof of address",
-                    "Identification document",
-                    "Age 18 or older"
-                ],
-                "process_steps": [
-                    "Complete registration form",
-                    "Gather required documents",
-                    "Visit Electoral Office",
-                    "Submit application",
-                    "Wait for verification",
-                    "Receive voter ID card"
-                ],
-                "contact_info": {
-                    "office": "Electoral Office",
-                    "address": "Ministerial Complex, Botanical Gardens, St. George's",
-                    "phone": "+1 (473) 440-2251",
-                    "email": "electoral@gov.gd",
-                    "hours": "Monday-Friday, 8:00 AM - 4:00 PM"
-                },
-                "estimated_time": "5-7 business days",
-                "fees": "Free"
-            },
-            "tax_documents": {
-                "information": "Tax documents include various forms and certificates required for tax compliance and business operations in Grenada.",
-                "requirements": [
-                    "Business registration certificate",
-                    "Financial records",
-                    "Completed tax forms",
-                    "Supporting documentation",
-                    "Payment of taxes due"
-                ],
-                "process_steps": [
-                    "Register for tax identification",
-                    "Maintain proper records",
-                    "Complete tax returns",
-                    "Submit to Inland Revenue",
-                    "Pay taxes due",
-                    "Obtain tax clearance certificate"
-                ],
-                "contact_info": {
-                    "office": "Inland Revenue Department",
-                    "address": "Ministerial Complex, Botanical Gardens, St. George's",
-                    "phone": "+1 (473) 440-2251",
-                    "email": "tax@gov.gd",
-                    "hours": "Monday-Friday, 8:00 AM - 4:00 PM"
-                },
-                "estimated_time": "Varies by document type",
-                "fees": "Varies by tax type"
-            }
-        }
+    def __init__(self, session_factory=None):
+        self.session_factory = session_factory
+        self._reload_lock = asyncio.Lock()
+        self._poller: Optional[asyncio.Task] = None
+        
+        # Serve the built-in knowledge until the database snapshot is loaded
+        self.snapshot: KnowledgeSnapshot = build_snapshot(DEFAULT_DOCUMENT_KNOWLEDGE, version=0, source="builtin")
 
-    async def get_document_info(self, document_type: str, query: str, language: str = "en") -> Dict:
+    @property
+    def document_knowledge(self) -> Mapping[str, Dict]:
+        return self.snapshot.documents
+
+    async def reload_knowledge(self, force: bool = False) -> bool:
         """
-        Retrieve information about a specific document type
+        Read LegalDocument through the async engine, build a new snapshot off the event loop
+        and swap it in. Readers keep using the previous snapshot until the swap. Returns True if swapped.
         """
-        if document_type not in self.document_knowledge:
-            return {
-                "information": "Document type not found. Please check the available document types.",
-                "requirements": [],
-                "process_steps": [],
-                "contact_info": {},
-                "estimated_time": "Unknown",
-                "fees": "Unknown"
-            }
-        
-        doc_info = self.document_knowledge[document_type].copy()
-        
-        # Customize response based on query
-        if "requirement" in query.lower() or "need" in query.lower():
-            return {
-                "information": doc_info["information"],
-                "requirements": doc_info["requirements"],
-                "process_steps": [],
-                "contact_info": doc_info["contact_info"],
-                "estimated_time": doc_info["estimated_time"],
-                "fees": doc_info["fees"]
-            }
-        elif "process" in query.lower() or "step" in query.lower() or "how" in query.lower():
-            return {
-                "information": doc_info["information"],
-                "requirements": [],
-                "process_steps": doc_info["process_steps"],
-                "contact_info": doc_info["contact_info"],
-                "estimated_time": doc_info["estimated_time"],
-                "fees": doc_info["fees"]
-            }
-        elif "contact" in query.lower() or "where" in query.lower() or "phone" in query.lower():
-            return {
-                "information": doc_info["information"],
-                "requirements": [],
-                "process_steps": [],
-                "contact_info": doc_info["contact_info"],
-                "estimated_time": doc_info["estimated_time"],
-                "fees": doc_info["fees"]
-            }
-        elif "cost" in query.lower() or "fee" in query.lower() or "money" in query.lower():
-            return {
-                "information": f"The fee for {document_type.replace('_', ' ')} is {doc_info['fees']}.",
-                "requirements": [],
-                "process_steps": [],
-                "contact_info": doc_info["contact_info"],
-                "estimated_time": doc_info["estimated_time"],
-                "fees": doc_info["fees"]
-            }
-        else:
-            return doc_info
+        async with self._reload_lock:
+            current = self.snapshot
+            if not force and current.fingerprint is not None:
+                fingerprint = await read_fingerprint(self.session_factory)
+                if fingerprint == current.fingerprint:
+                    return False
+            documents, fingerprint = await load_documents(DEFAULT_DOCUMENT_KNOWLEDGE, self.session_factory)
+            snapshot = await asyncio.to_thread(
+                build_snapshot, documents, current.version + 1, "database", fingerprint
+            )
+            # A single reference assignment, so readers see either the old or the new snapshot
+            self.snapshot = snapshot
+            logger.info("Loaded knowledge snapshot v%d with %d documents", snapshot.version, len(documents))
+            return True
 
-    async def search_documents(self, search_query: str) -> List[Dict]:
+    def start_auto_reload(self, interval_seconds: float):
+        """
+        Poll LegalDocument for changes and reload when its fingerprint moves
+        """
+        if self._poller is None and interval_seconds > 0:
+            self._poller = asyncio.create_task(self._poll(interval_seconds))
+
+    async def stop_auto_reload(self):
+        if self._poller is not None:
+            self._poller.cancel()
+            try:
+                await self._poller
+            except asyncio.CancelledError:
+                pass
+            self._poller = None
+
+    async def _poll(self, interval_seconds: float):
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.reload_knowledge()
+            except Exception as e:
+                logger.warning("Knowledge base reload failed: %s", e)
+
+    async def get_document_info(self, document_type: str, query: str, language: str = "en") -> Mapping:
+        """
+        Retrieve information about a specific document type.
+        The result is a shared read-only mapping; copy it before modifying.
+        """
+        with span("rag_document_info"):
+            projections = self.snapshot.projections.get(document_type)
+            if projections is None:
+                return DOCUMENT_NOT_FOUND
+            return projections[classify_document_query(query)]
+
+    def get_document_response_body(self, document_type: str, query: str) -> bytes:
+        """
+        Return the pre-serialized DocumentResponse JSON for the query
+        """
+        with span("rag_document_body"):
+            bodies = self.snapshot.response_bodies.get(document_type)
+            if bodies is None:
+                return DOCUMENT_NOT_FOUND_BODY
+            return bodies[classify_document_query(query)]
+
+    async def search_documents(self, search_query: str, limit: int = 5) -> List[Dict]:
         """
         Search through all document types for relevant information
         """
+        snapshot = self.snapshot
         results = []
-        query_lower = search_query.lower()
-        
-        for doc_type, info in self.document_knowledge.items():
-            relevance_score = 0
-            
-            # Check if query terms appear in document information
-            if any(term in info["information"].lower() for term in query_lower.split()):
-                relevance_score += 2
-            
-            # Check requirements
-            for req in info["requirements"]:
-                if any(term in req.lower() for term in query_lower.split()):
-                    relevance_score += 1
-            
-            # Check process steps
-            for step in info["process_steps"]:
-                if any(term in step.lower() for term in query_lower.split()):
-                    relevance_score += 1
-            
-            if relevance_score > 0:
-                results.append({
-                    "document_type": doc_type,
-                    "relevance_score": relevance_score,
-                    "information": info["information"][:200] + "...",
-                    "contact_info": info["contact_info"]
-                })
-        
-        # Sort by relevance score
-        results.sort(key=lambda x: x["relevance_score"], reverse=True)
-        return results[:5]  # Return top 5 results
\ No newline at end of file
+        with span("rag_search"):
+            hits = snapshot.search_index.search(search_query, k=limit)
+        for doc_type, score in hits:
+            info = snapshot.documents[doc_type]
+            results.append({
+                "document_type": doc_type,
+                "relevance_score": round(score, 4),
+                "information": info["information"][:200] + "...",
+                "contact_info": info["contact_info"]
+            })
+        return results
@@ -0,0 +1,233 @@
+# Resilience for upstream completion calls: circuit breaker, jittered retries, hedging
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+import httpx
+import openai
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling upstream while the circuit breaker is open
+    """
+
+def is_transient(error: Exception) -> bool:
+    """
+    Errors worth retrying: timeouts, dropped connections, rate limits and 5xx responses
+    """
+    if isinstance(error, (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return isinstance(error, (asyncio.TimeoutError, httpx.TransportError))
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures and rejects calls for
+    recovery_seconds. Then it lets a single probe through (half-open): success closes
+    it again, failure re-opens it for another recovery period.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = None, recovery_seconds: float = None):
+        self.failure_threshold = failure_threshold or settings.BREAKER_FAILURE_THRESHOLD
+        self.recovery_seconds = recovery_seconds if recovery_seconds is not None else settings.BREAKER_RECOVERY_SECONDS
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.recovery_seconds:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+        if self.state != self.CLOSED:
+            logger.info("LLM circuit breaker closed")
+        self.state = self.CLOSED
+
+    def release_probe(self):
+        """
+        Give up the half-open probe without a verdict, e.g. when the probing call was
+        cancelled, so the next call can probe instead of the breaker staying stuck
+        """
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold):
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self.times_opened += 1
+            logger.warning("LLM circuit breaker opened after %d consecutive failures", self.consecutive_failures)
+
+    def stats(self) -> Dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "retry_in_seconds": round(max(self.recovery_seconds - (time.monotonic() - self.opened_at), 0.0), 1)
+            if self.state == self.OPEN else 0.0
+        }
+
+class LatencyTracker:
+    """
+    Sliding window of recent call latencies with a lazily refreshed percentile
+    """
+    def __init__(self, window: int = 200, refresh_every: int = 20):
+        self.samples = deque(maxlen=window)
+        self.refresh_every = refresh_every
+        self._since_refresh = 0
+        self._cached: Optional[float] = None
+
+    def observe(self, elapsed_ms: float):
+        self.samples.append(elapsed_ms)
+        self._since_refresh += 1
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        if self._cached is None or self._since_refresh >= self.refresh_every:
+            ordered = sorted(self.samples)
+            self._cached = ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+            self._since_refresh = 0
+        return self._cached
+
+class ResilientCaller:
+    """
+    Runs an upstream call through the circuit breaker with bounded, full-jitter
+    retries for transient errors. When hedging is on and enough latencies have been
+    seen, a duplicate request is sent once the first one outlives the configured
+    percentile, and whichever answers first wins.
+    """
+    def __init__(self, breaker: Optional[CircuitBreaker] = None, max_retries: int = None,
+                 backoff_base_ms: float = None, backoff_max_ms: float = None, hedge_enabled: bool = None,
+                 hedge_percentile: float = None, hedge_min_samples: int = None, hedge_min_delay_ms: float = None):
+        self.breaker = breaker or CircuitBreaker()
+        self.max_retries = max_retries if max_retries is not None else settings.LLM_MAX_RETRIES
+        self.backoff_base_ms = backoff_base_ms or settings.LLM_RETRY_BACKOFF_BASE_MS
+        self.backoff_max_ms = backoff_max_ms or settings.LLM_RETRY_BACKOFF_MAX_MS
+        self.hedge_enabled = settings.LLM_HEDGE_ENABLED if hedge_enabled is None else hedge_enabled
+        self.hedge_percentile = hedge_percentile or settings.LLM_HEDGE_PERCENTILE
+        self.hedge_min_samples = hedge_min_samples or settings.LLM_HEDGE_MIN_SAMPLES
+        self.hedge_min_delay_ms = hedge_min_delay_ms if hedge_min_delay_ms is not None else settings.LLM_HEDGE_MIN_DELAY_MS
+        self.latency = LatencyTracker()
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+
+    def hedge_delay_ms(self) -> Optional[float]:
+        if not self.hedge_enabled or len(self.latency.samples) < self.hedge_min_samples:
+            return None
+        return max(self.latency.percentile(self.hedge_percentile), self.hedge_min_delay_ms)
+
+    def backoff_seconds(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max_ms, self.backoff_base_ms * 2 ** attempt)) / 1000
+
+    async def call(self, make_request: Callable[[], Awaitable[T]], hedge: bool = True) -> T:
+        if not self.breaker.allow():
+            raise CircuitOpenError("LLM circuit breaker is open")
+        probe = self.breaker.state == CircuitBreaker.HALF_OPEN
+        self.calls += 1
+        attempt = 0
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    result = await (self._hedged(make_request) if hedge else make_request())
+                except Exception as e:
+                    transient = is_transient(e)
+                    if transient and attempt < self.max_retries and self.breaker.state == CircuitBreaker.CLOSED:
+                        self.retries += 1
+                        await asyncio.sleep(self.backoff_seconds(attempt))
+                        attempt += 1
+                        continue
+                    self.failures += 1
+                    if transient:
+                        self.breaker.record_failure()
+                    else:
+                        # The service answered; a bad request says nothing about its health
+                        self.breaker.record_success()
+                    raise
+                self.latency.observe((time.perf_counter() - started) * 1000)
+                self.breaker.record_success()
+                return result
+        except BaseException:
+            # Cancellation bypasses the handlers above and would leave the probe slot taken
+            if probe and self.breaker.state == CircuitBreaker.HALF_OPEN:
+                self.breaker.release_probe()
+            raise
+
+    def record_failure(self, error: Exception):
+        """
+        Count a failure that happened after call() returned, e.g. a stream cut off mid-way
+        """
+        if is_transient(error):
+            self.breaker.record_failure()
+
+    async def _hedged(self, make_request: Callable[[], Awaitable[T]]) -> T:
+        delay_ms = self.hedge_delay_ms()
+        if delay_ms is None:
+            return await make_request()
+        primary = asyncio.ensure_future(make_request())
+        done, _ = await asyncio.wait({primary}, timeout=delay_ms / 1000)
+        if done:
+            return primary.result()
+
+        self.hedges_sent += 1
+        hedge = asyncio.ensure_future(make_request())
+        pending = {primary, hedge}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedges_won += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict:
+        p95 = self.latency.percentile(0.95)
+        return {
+            "breaker": self.breaker.stats(),
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "hedging": self.hedge_enabled,
+            "hedges_sent": self.hedges_sent,
+            "hedges_won": self.hedges_won,
+            "p95_latency_ms": round(p95, 1) if p95 is not None else None
+        }
@@ -0,0 +1,80 @@
+# Inverted index with BM25F scoring for knowledge-base search
+
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+
+_TOKEN = re.compile(r"\w+")
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase word tokens with a light plural fold ("certificates" -> "certificate")
+    """
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+class BM25Index:
+    """
+    BM25F over named fields. Per-term document weights are fully precomputed at
+    build time, so a query is a sum over the postings of its terms plus a top-k heap.
+    """
+    def __init__(self, field_boosts: Dict[str, float], k1: float = 1.2, b: float = 0.75):
+        self.field_boosts = field_boosts
+        self.k1 = k1
+        self.b = b
+        self.doc_ids: List[str] = []
+        self.postings: Dict[str, List[Tuple[int, float]]] = {}
+
+    @classmethod
+    def build(cls, documents: Dict[str, Dict[str, str]], field_boosts: Dict[str, float],
+              k1: float = 1.2, b: float = 0.75) -> "BM25Index":
+        index = cls(field_boosts, k1, b)
+        index.doc_ids = list(documents)
+        
+        # Tokenize every field once and collect field lengths
+        field_tokens = []
+        total_lengths = defaultdict(int)
+        for fields in documents.values():
+            tokenized = {name: tokenize(fields.get(name, "")) for name in field_boosts}
+            for name, tokens in tokenized.items():
+                total_lengths[name] += len(tokens)
+            field_tokens.append(tokenized)
+        doc_count = len(field_tokens) or 1
+        avg_lengths = {name: (total_lengths[name] / doc_count) or 1.0 for name in field_boosts}
+        
+        # Length-normalized, boosted term frequency per document (BM25F pseudo-tf)
+        pseudo_tf: Dict[str, Dict[int, float]] = defaultdict(dict)
+        for doc_index, tokenized in enumerate(field_tokens):
+            combined = defaultdict(float)
+            for name, tokens in tokenized.items():
+                if not tokens:
+                    continue
+                norm = 1 - b + b * len(tokens) / avg_lengths[name]
+                for term, tf in Counter(tokens).items():
+                    combined[term] += field_boosts[name] * tf / norm
+            for term, weight in combined.items():
+                pseudo_tf[term][doc_index] = weight
+        
+        for term, docs in pseudo_tf.items():
+            idf = math.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            index.postings[term] = [
+                (doc_index, idf * tf * (k1 + 1) / (tf + k1)) for doc_index, tf in docs.items()
+            ]
+        return index
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[str, float]]:
+        """
+        Return the top-k (doc_id, score) pairs for the query
+        """
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            for doc_index, weight in self.postings.get(term, ()):
+                scores[doc_index] += weight
+        top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(self.doc_ids[doc_index], score) for doc_index, score in top]
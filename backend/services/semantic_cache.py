@@ -0,0 +1,249 @@
+# Semantic cache of LLM answers over hashed n-gram embeddings
+
+import json
+import os
+import re
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+_TOKEN = re.compile(r"\w+")
+
+# Function words carry little meaning for FAQ matching and would dominate short questions.
+# Question and intent words (what, how, much, can, get, go, ...) stay in: they are what tells
+# "how much is a passport" apart from "where do I go for a passport".
+_STOPWORDS = frozenset({
+    "a", "an", "the", "is", "are", "do", "does", "did", "i", "me", "my", "you", "to", "for",
+    "of", "in", "on", "at", "it", "please"
+})
+
+# Pleasantries that say nothing about the question, after normalize_message's Creole folding
+_GREETINGS = re.compile(
+    r"\b(?:good (?:morning|afternoon|evening)|how are you(?: doing)?|what s happening|you know|hello|thank you|thanks)\b"
+)
+
+# Ways of asking the same thing, folded to one word so they embed alike
+_SYNONYMS = [(re.compile(pattern), word) for pattern, word in (
+    (r"\bhow much\b|\bprices?\b|\bfees?\b|\bcharges?\b|\bcosts?\b", "cost"),
+    (r"\bhow long\b|\btakes?\b", "duration"),
+    (r"\bpapers?\b|\bcertificates?\b", "certificate"),
+    (r"\brequirements?\b|(?<!tax )\bdocuments\b|\bbring\b|\bneed\b", "need"),
+    (r"\bapply\b|\bgo\b", "go")
+)]
+
+# Words shared by most questions; the document they qualify should decide the match
+_FEATURE_WEIGHTS = {"certificate": 0.5}
+
+class HashingEmbedder:
+    """
+    CPU-only embedder: content-word unigrams/bigrams and character trigrams
+    hashed into a fixed-size vector. Greetings are dropped, synonyms folded and
+    repeated words counted once, so "birth paper cost" and "how much is a birth
+    certificate" embed alike.
+    Weights were tuned with benchmarks/check_semantic_cache.py.
+    """
+    def __init__(self, dim: int = 512, bigram_weight: float = 0.5, trigram_weight: float = 0.3):
+        self.dim = dim
+        self.bigram_weight = bigram_weight
+        self.trigram_weight = trigram_weight
+
+    def words(self, text: str) -> List[str]:
+        text = _GREETINGS.sub(" ", text.lower())
+        for pattern, word in _SYNONYMS:
+            text = pattern.sub(word, text)
+        return list(dict.fromkeys(word for word in _TOKEN.findall(text) if word not in _STOPWORDS))
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        words = self.words(text)
+        weights = [_FEATURE_WEIGHTS.get(word, 1.0) for word in words]
+        features = list(zip(words, weights))
+        features.extend((f"{a} {b}", self.bigram_weight * min(wa, wb))
+                        for (a, wa), (b, wb) in zip(features, features[1:]))
+        for word, weight in zip(words, weights):
+            padded = f"#{word}#"
+            features.extend((f"~{padded[i:i + 3]}", self.trigram_weight * weight) for i in range(len(padded) - 2))
+        for feature, weight in features:
+            digest = zlib.crc32(feature.encode("utf-8"))
+            # Low bit picks the sign so unrelated collisions tend to cancel out
+            vector[(digest >> 1) % self.dim] += weight if digest & 1 else -weight
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+class SemanticCache:
+    """
+    Bounded nearest-neighbour cache of answers. Vectors live in a preallocated matrix,
+    optionally a memory-mapped file, and are searched with one matrix-vector product.
+    Entries are replaced oldest-first once capacity is reached.
+    Safe to call from worker threads: lookups and writes to the matrix share one lock.
+
+    On disk, every add appends (slot, vector checksum, partition, answer) to an answers
+    log before the vector is written. The OS writes memmap pages back whenever it likes,
+    so on load a slot is only trusted when its vector still matches the checksum logged
+    with its answer; otherwise the slot is dropped rather than answered from another question.
+    """
+    def __init__(self, capacity: int, threshold: float, dim: int = 512, path: Optional[str] = None):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.embedder = HashingEmbedder(dim)
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        
+        self._answers: List[Optional[str]] = [None] * capacity
+        self._partitions: List[Optional[str]] = [None] * capacity
+        self._partition_ids = np.full(capacity, -1, dtype=np.int32)
+        self._partition_index: Dict[str, int] = {}
+        self._size = 0
+        self._next = 0
+        self._log = None
+        
+        if path:
+            self._vectors, reused = self._open_vectors(path, capacity, dim)
+            if reused:
+                self._load_log()
+            self._compact_log()
+        else:
+            self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+
+    def lookup(self, text: str, partition: str) -> Optional[Tuple[str, float]]:
+        """
+        Return the cached answer and its similarity when one is close enough.
+        At 100k entries the search costs milliseconds, so async callers should run it in a thread.
+        """
+        query = self.embedder.embed(text)
+        with self._lock:
+            partition_id = self._partition_index.get(partition)
+            if partition_id is None or self._size == 0:
+                self.misses += 1
+                return None
+            scores = self._vectors[:self._size] @ query
+            scores[self._partition_ids[:self._size] != partition_id] = -1.0
+            best = int(np.argmax(scores))
+            similarity = float(scores[best])
+            if similarity < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return self._answers[best], similarity
+
+    def add(self, text: str, partition: str, answer: str):
+        vector = self.embedder.embed(text)
+        with self._lock:
+            slot = self._next
+            if self._log is not None:
+                self._log.write(self._log_line(slot, vector, partition, answer))
+                self._log.flush()
+            self._vectors[slot] = vector
+            self._answers[slot] = answer
+            self._partitions[slot] = partition
+            self._partition_ids[slot] = self._partition_index.setdefault(partition, len(self._partition_index))
+            self._next = (slot + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+    def invalidate(self) -> int:
+        """
+        Forget every entry and return how many were removed
+        """
+        with self._lock:
+            removed = self._size
+            self._answers = [None] * self.capacity
+            self._partitions = [None] * self.capacity
+            self._partition_ids.fill(-1)
+            self._partition_index.clear()
+            self._size = 0
+            self._next = 0
+            if self._log is not None:
+                self._compact_log()
+        return removed
+
+    def flush(self):
+        """
+        Write pending vectors to disk and rewrite the answers log down to the live entries
+        """
+        if not self.path:
+            return
+        with self._lock:
+            self._vectors.flush()
+            self._compact_log()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._size,
+            "capacity": self.capacity,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    @staticmethod
+    def _open_vectors(path: str, capacity: int, dim: int) -> Tuple[np.memmap, bool]:
+        vectors_path = f"{path}.vectors.npy"
+        if os.path.exists(vectors_path):
+            vectors = np.lib.format.open_memmap(vectors_path, mode="r+")
+            if vectors.shape == (capacity, dim) and vectors.dtype == np.float32:
+                return vectors, True
+            del vectors
+        # A resized cache starts empty rather than reinterpreting old rows
+        return np.lib.format.open_memmap(vectors_path, mode="w+", dtype=np.float32, shape=(capacity, dim)), False
+
+    @staticmethod
+    def _log_line(slot: int, vector: np.ndarray, partition: str, answer: str) -> str:
+        checksum = zlib.crc32(np.ascontiguousarray(vector, dtype=np.float32).tobytes())
+        return json.dumps({"slot": slot, "crc": checksum, "partition": partition, "answer": answer}) + "\n"
+
+    def _load_log(self):
+        """
+        Replay the answers log; the last line for a slot wins. A line cut short by a
+        crash ends the replay.
+        """
+        log_path = f"{self.path}.answers.jsonl"
+        if not os.path.exists(log_path):
+            return
+        entries = {}
+        last_slot = None
+        with open(log_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                slot = entry["slot"]
+                if 0 <= slot < self.capacity:
+                    entries[slot] = entry
+                    last_slot = slot
+        if last_slot is None:
+            return
+        for slot, entry in entries.items():
+            if zlib.crc32(self._vectors[slot].tobytes()) != entry["crc"]:
+                # The vector on disk is not the one this answer was stored with
+                continue
+            self._answers[slot] = entry["answer"]
+            self._partitions[slot] = entry["partition"]
+            self._partition_ids[slot] = self._partition_index.setdefault(entry["partition"], len(self._partition_index))
+        self._size = max(entries) + 1
+        self._next = (last_slot + 1) % self.capacity
+
+    def _compact_log(self):
+        """
+        Replace the log with one line per live entry, oldest first, and reopen it for appends
+        """
+        if self._log is not None:
+            self._log.close()
+        log_path = f"{self.path}.answers.jsonl"
+        tmp_path = f"{log_path}.tmp"
+        start = self._next if self._size == self.capacity else 0
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for i in range(self._size):
+                slot = (start + i) % self.capacity
+                if self._answers[slot] is not None:
+                    f.write(self._log_line(slot, self._vectors[slot], self._partitions[slot], self._answers[slot]))
+        os.replace(tmp_path, log_path)
+        self._log = open(log_path, "a", encoding="utf-8")
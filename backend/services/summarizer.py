@@ -0,0 +1,103 @@
+# Rolling conversation summaries generated off the request path
+
+import asyncio
+import logging
+from typing import Dict, List, Optional
+from config import settings
+from services.prompt import TokenCounter
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_INSTRUCTIONS = """Summarize this conversation between a Grenadian and NutmegAI, a legal registry assistant.
+Keep the documents discussed, the user's situation, facts and details already given, advice already provided and open questions.
+Write plain prose in at most {words} words."""
+
+class ConversationSummarizer:
+    """
+    Compacts older turns of long sessions into a rolling summary. A session is
+    summarized once its raw history exceeds trigger_tokens; everything except the
+    newest keep_messages is folded, together with any earlier summary, into a new
+    summary by a background completion, and the history store swaps it in.
+    """
+    def __init__(self, client, history_store, concurrency_limit: Optional[asyncio.Semaphore] = None,
+                 counter: Optional[TokenCounter] = None, trigger_tokens: int = None,
+                 keep_messages: int = None, max_tokens: int = None, caller=None):
+        self.client = client
+        # Optional ResilientCaller, so summaries respect the circuit breaker and retry policy
+        self.caller = caller
+        self.history_store = history_store
+        self.concurrency_limit = concurrency_limit or asyncio.Semaphore(1)
+        self.counter = counter or TokenCounter()
+        self.trigger_tokens = trigger_tokens or settings.SUMMARY_TRIGGER_TOKENS
+        # At least the newest exchange stays verbatim
+        self.keep_messages = max(keep_messages or settings.SUMMARY_KEEP_MESSAGES, 2)
+        self.max_tokens = max_tokens or settings.SUMMARY_MAX_TOKENS
+        self._pending: Dict[str, asyncio.Task] = {}
+        self.scheduled = 0
+        self.completed = 0
+        self.failed = 0
+        self.messages_compacted = 0
+
+    def history_tokens(self, history: List[Dict]) -> int:
+        return sum(self.counter.count(message["content"]) for message in history)
+
+    def maybe_schedule(self, session_id: str, history: List[Dict], summary: Optional[str]) -> bool:
+        """
+        Start a background summary if the session is over its threshold; never waits
+        """
+        if session_id in self._pending or len(history) <= self.keep_messages:
+            return False
+        if self.history_tokens(history) <= self.trigger_tokens:
+            return False
+        older = history[:len(history) - self.keep_messages]
+        task = asyncio.create_task(self._summarize(session_id, older, summary))
+        self._pending[session_id] = task
+        task.add_done_callback(lambda _: self._pending.pop(session_id, None))
+        self.scheduled += 1
+        return True
+
+    async def _summarize(self, session_id: str, older: List[Dict], summary: Optional[str]):
+        try:
+            transcript = "\n".join(
+                f"{'User' if message['role'] == 'user' else 'Assistant'}: {message['content']}" for message in older
+            )
+            if summary:
+                transcript = f"Earlier summary:\n{summary}\n\nConversation since then:\n{transcript}"
+            async def request():
+                async with self.concurrency_limit:
+                    return await self.client.chat.completions.create(
+                        model=settings.SUMMARY_MODEL or settings.OPENAI_MODEL,
+                        messages=[
+                            {"role": "system", "content": SUMMARY_INSTRUCTIONS.format(words=int(self.max_tokens * 0.75))},
+                            {"role": "user", "content": transcript}
+                        ],
+                        max_tokens=self.max_tokens,
+                        temperature=0.2,
+                        timeout=settings.OPENAI_TIMEOUT_SECONDS
+                    )
+            response = await (self.caller.call(request, hedge=False) if self.caller is not None else request())
+            new_summary = (response.choices[0].message.content or "").strip()
+            if not new_summary:
+                raise ValueError("empty summary")
+            self.messages_compacted += await self.history_store.compact(session_id, new_summary, older, summary)
+            self.completed += 1
+        except Exception as e:
+            # The raw turns stay in place, so the next turn simply tries again
+            self.failed += 1
+            logger.warning("Conversation summary failed for session %s: %s", session_id, e)
+
+    async def close(self):
+        """
+        Let summaries already in flight finish
+        """
+        if self._pending:
+            await asyncio.gather(*list(self._pending.values()), return_exceptions=True)
+
+    def stats(self) -> Dict:
+        return {
+            "pending": len(self._pending),
+            "scheduled": self.scheduled,
+            "completed": self.completed,
+            "failed": self.failed,
+            "messages_compacted": self.messages_compacted
+        }
@@ -1,8 +1,12 @@
 # Common helper functions
 
 import re
-from typing import Dict, List, Optional
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
 from config import settings
+from utils.phrase_matcher import PhraseMatcher, split_words
+from utils.metrics import span
 
 # Grenadian Creole patterns and vocabulary
 CREOLE_PATTERNS = {
@@ -38,6 +42,14 @@ CREOLE_PATTERNS = {
     ]
 }
 
+# Standard English patterns that count against a Creole classification
+ENGLISH_PATTERNS = [
+    r"\b(how\s+are\s+you|good\s+morning|good\s+afternoon|good\s+evening)\b",
+    r"\b(what's\s+happening|what\s+is\s+happening)\b",
+    r"\b(certificate|document|registration|application)\b",
+    r"\b(please|thank\s+you|excuse\s+me)\b"
+]
+
 # Translation dictionary for common phrases
 CREOLE_TRANSLATIONS = {
     "en_to_creole": {
@@ -90,115 +102,374 @@ CREOLE_TRANSLATIONS = {
     }
 }
 
+class LanguageDetector:
+    """
+    Scores Creole and English features in one pass over the words of a message.
+    Each pattern counts at most once, matching the per-pattern re.search scoring.
+    Lexicon phrases no built-in pattern already recognises count as one extra feature.
+    """
+    def __init__(self, creole_patterns: Dict[str, List[str]], english_patterns: List[str],
+                 lexicon_phrases: Iterable[str] = ()):
+        self.matcher = PhraseMatcher()
+        feature = 0
+        for patterns in creole_patterns.values():
+            for pattern in patterns:
+                self.matcher.add_pattern(pattern, feature)
+                feature += 1
+        builtin_creole = feature
+        for pattern in english_patterns:
+            self.matcher.add_pattern(pattern, feature)
+            feature += 1
+
+        # Appended after the English features so creole features stay 0..n-1 plus this one
+        self.lexicon_feature = feature
+        self.lexicon_phrase_count = 0
+        for phrase in lexicon_phrases:
+            words, gaps = split_words(phrase.lower())
+            if any(f < builtin_creole for f in self.matcher.match_set(words, gaps)):
+                continue
+            try:
+                self.matcher.add_text(phrase.lower(), self.lexicon_feature)
+            except ValueError:
+                continue
+            self.lexicon_phrase_count += 1
+        self.creole_feature_count = builtin_creole
+
+    def score_words(self, words: List[str], gaps: List[str]) -> Tuple[int, int]:
+        matched = self.matcher.match_set(words, gaps)
+        creole_count, lexicon = self.creole_feature_count, self.lexicon_feature
+        creole_score = sum(1 for feature in matched if feature < creole_count or feature == lexicon)
+        return creole_score, len(matched) - creole_score
+
+    def detect_words(self, words: List[str], gaps: List[str]) -> str:
+        creole_score, english_score = self.score_words(words, gaps)
+        return "en-GD" if creole_score > english_score else "en"
+
+    def detect(self, text: str) -> str:
+        words, gaps = split_words(text.lower())
+        return self.detect_words(words, gaps)
+
+_language_detector = LanguageDetector(CREOLE_PATTERNS, ENGLISH_PATTERNS)
+
 def detect_language(text: str) -> str:
     """
     Detect if text contains Grenadian Creole patterns
     Returns 'en-GD' for Creole, 'en' for English
     """
-    text_lower = text.lower()
-    creole_score = 0
-    english_score = 0
-    
-    # Check for Creole patterns
-    for category, patterns in CREOLE_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, text_lower):
-                creole_score += 1
-    
-    # Check for standard English patterns
-    english_patterns = [
-        r"\b(how\s+are\s+you|good\s+morning|good\s+afternoon|good\s+evening)\b",
-        r"\b(what's\s+happening|what\s+is\s+happening)\b",
-        r"\b(certificate|document|registration|application)\b",
-        r"\b(please|thank\s+you|excuse\s+me)\b"
-    ]
-    
-    for pattern in english_patterns:
-        if re.search(pattern, text_lower):
-            english_score += 1
-    
-    # Determine language based on scores
-    if creole_score > english_score:
-        return "en-GD"
-    else:
-        return "en"
+    with span("detect_language"):
+        return _language_detector.detect(text)
 
-def translate_creole(text: str, target_language: str = "en") -> str:
+def _match_case(source: str, replacement: str) -> str:
     """
-    Translate between English and Grenadian Creole
+    Carry the casing of the matched text over to its replacement
+    """
+    if source.isupper() and any(c.isalpha() for c in source[1:]):
+        return replacement.upper()
+    if source[:1].isupper():
+        return replacement[:1].upper() + replacement[1:]
+    return replacement
+
+def _trie_alternation(phrases: List[str]) -> str:
+    """
+    Build a regex alternation shaped like a character trie. Optional suffixes are
+    greedy, so the longest phrase is tried first and shorter ones only on backtrack.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def render(node: Dict) -> str:
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    return render(trie)
+
+class CreoleTranslator:
+    """
+    Phrase translator compiled once per dictionary. Each direction becomes a single
+    trie-shaped, longest-match-first regex, so text is translated in one left-to-right
+    pass and replaced text is never re-translated by a shorter entry.
+    Hits on entries with a lexicon id are tallied in memory until take_usage() is called.
+    Batches run in worker threads, so the tally is only touched under a lock.
     """
-    if target_language == "en":
-        # Translate Creole to English
-        translated = text
-        for creole, english in CREOLE_TRANSLATIONS["creole_to_en"].items():
-            translated = re.sub(r'\b' + re.escape(creole) + r'\b', english, translated, flags=re.IGNORECASE)
+    DIRECTIONS = {"en": "creole_to_en", "en-GD": "en_to_creole"}
+
+    def __init__(self, translations: Dict[str, Dict]):
+        self._usage: Counter = Counter()
+        self._usage_lock = threading.Lock()
+        self.load(translations)
+
+    def load(self, translations: Dict[str, Dict]):
+        """
+        Compile a new dictionary and swap it in atomically.
+        Values are either the target text or a (target text, entry id) tuple.
+        """
+        compiled = {}
+        for target_language, direction in self.DIRECTIONS.items():
+            lookup = {}
+            for source, target in translations.get(direction, {}).items():
+                lookup[source.lower()] = target if isinstance(target, tuple) else (target, None)
+            if not lookup:
+                continue
+            pattern = re.compile(r"\b(?:" + _trie_alternation(list(lookup)) + r")\b", re.IGNORECASE)
+            compiled[target_language] = (pattern, lookup)
+        self._compiled = compiled
+
+    def translate(self, text: str, target_language: str = "en", track_usage: bool = True) -> str:
+        compiled = self._compiled.get(target_language)
+        if compiled is None:
+            return text
+        if not track_usage:
+            return self._translate(compiled, text, None)
+        hits = Counter()
+        translated = self._translate(compiled, text, hits)
+        if hits:
+            self._add_usage(hits)
         return translated
-    elif target_language == "en-GD":
-        # Translate English to Creole
-        translated = text
-        for english, creole in CREOLE_TRANSLATIONS["en_to_creole"].items():
-            translated = re.sub(r'\b' + re.escape(english) + r'\b', creole, translated, flags=re.IGNORECASE)
+
+    @staticmethod
+    def _translate(compiled: Tuple, text: str, usage: Optional[Counter]) -> str:
+        pattern, lookup = compiled
+
+        def replace(match):
+            matched = match.group(0)
+            entry = lookup.get(matched.lower())
+            if entry is None:
+                return matched
+            target, entry_id = entry
+            if usage is not None and entry_id is not None:
+                usage[entry_id] += 1
+            return _match_case(matched, target)
+
+        return pattern.sub(replace, text)
+
+    def translate_batch(self, texts: List[str], target_language: str = "en") -> List[str]:
+        """
+        Translate many strings, translating each distinct string only once.
+        Usage is still counted once per input string, repeats included.
+        """
+        compiled = self._compiled.get(target_language)
+        if compiled is None:
+            return list(texts)
+        translate = self._translate
+        seen = {}
+        translated = []
+        usage = Counter()
+        for text in texts:
+            cached = seen.get(text)
+            if cached is None:
+                hits = Counter()
+                cached = seen[text] = (translate(compiled, text, hits), hits)
+            result, hits = cached
+            if hits:
+                usage.update(hits)
+            translated.append(result)
+        if usage:
+            self._add_usage(usage)
         return translated
-    else:
-        return text
 
-def extract_legal_intent(text: str) -> Dict:
+    def _add_usage(self, hits: Counter):
+        with self._usage_lock:
+            self._usage.update(hits)
+
+    def take_usage(self) -> Dict[int, int]:
+        """
+        Hand over the hit counts gathered so far and start a fresh tally
+        """
+        with self._usage_lock:
+            usage, self._usage = self._usage, Counter()
+        return dict(usage)
+
+    def restore_usage(self, usage: Dict[int, int]):
+        """
+        Put back counts that could not be written so the next flush retries them
+        """
+        self._add_usage(usage)
+
+def build_translations(entries) -> Dict[str, Dict]:
     """
-    Extract legal document intent from user message
+    Build both translation directions from lexicon entries, e.g. CreoleTranslation rows.
+    Entries are (english_text, creole_text) pairs or (id, english_text, creole_text, confidence)
+    tuples. When a phrase has several translations the highest confidence wins, then the
+    earliest entry. Identity pairs are kept so they shield their words.
     """
-    text_lower = text.lower()
-    intent = {
-        "document_type": None,
-        "action": None,
-        "urgency": "normal",
-        "language": detect_language(text)
-    }
-    
-    # Detect document type
-    document_keywords = {
-        "birth_certificate": ["birth", "birth paper", "birth certificate", "born"],
-        "death_certificate": ["death", "death paper", "death certificate", "passing", "died"],
-        "marriage_certificate": ["marriage", "marriage paper", "marriage certificate", "married", "wedding"],
-        "divorce_decree": ["divorce", "divorce paper", "divorce decree", "divorced"],
-        "property_deed": ["property", "property paper", "property deed", "house", "land", "real estate"],
-        "business_registration": ["business", "business paper", "business registration", "company", "register business"],
-        "passport_application": ["passport", "travel", "travel document"],
-        "national_id": ["id card", "national id", "identification", "id"],
-        "voter_registration": ["voter", "voter card", "voting", "election"],
-        "tax_documents": ["tax", "tax paper", "tax documents", "taxes", "revenue"]
-    }
-    
-    for doc_type, keywords in document_keywords.items():
-        if any(keyword in text_lower for keyword in keywords):
-            intent["document_type"] = doc_type
-            break
-    
-    # Detect action
-    action_keywords = {
-        "get_info": ["information", "info", "what", "how", "tell me"],
-        "get_requirements": ["requirements", "need", "required", "what do i need"],
-        "get_process": ["process", "steps", "procedure", "how to", "how do i"],
-        "get_contact": ["contact", "where", "phone", "address", "location"],
-        "get_fees": ["cost", "fee", "money", "price", "how much"]
+    translations = {"en_to_creole": {}, "creole_to_en": {}}
+    ranks = {"en_to_creole": {}, "creole_to_en": {}}
+    for entry in entries:
+        if len(entry) == 2:
+            entry_id, confidence = None, 1.0
+            english, creole = entry
+        else:
+            entry_id, english, creole, confidence = entry
+        english, creole = english.lower().strip(), creole.lower().strip()
+        confidence = 1.0 if confidence is None else confidence
+        for direction, source, target in (("en_to_creole", english, creole), ("creole_to_en", creole, english)):
+            if source in ranks[direction] and ranks[direction][source] >= confidence:
+                continue
+            ranks[direction][source] = confidence
+            translations[direction][source] = target if entry_id is None else (target, entry_id)
+    return translations
+
+_translator = CreoleTranslator(CREOLE_TRANSLATIONS)
+
+def reload_translations(translations: Dict[str, Dict]):
+    """
+    Replace the active translation dictionary, e.g. after CreoleTranslation rows change
+    """
+    _translator.load(translations)
+
+def apply_lexicon(entries) -> Dict:
+    """
+    Load lexicon entries into the shared translator and language detector, layered
+    over the built-in CREOLE_TRANSLATIONS: an entry replaces the built-in translation
+    of the same phrase, and built-in phrases without an entry stay.
+    Creole phrases the built-in detector patterns miss become detection features.
+    """
+    global _language_detector, _intent_engine
+    entries = list(entries)
+    lexicon = build_translations(entries)
+    translations = {
+        direction: {**CREOLE_TRANSLATIONS[direction], **lexicon[direction]} for direction in lexicon
     }
-    
-    for action, keywords in action_keywords.items():
-        if any(keyword in text_lower for keyword in keywords):
-            intent["action"] = action
-            break
-    
-    # Detect urgency
-    urgency_keywords = {
-        "urgent": ["urgent", "emergency", "asap", "quick", "fast"],
-        "normal": ["normal", "regular", "standard"]
+    lexicon_phrases = [creole for creole, english in lexicon["creole_to_en"].items()
+                       if creole != (english[0] if isinstance(english, tuple) else english)]
+    detector = LanguageDetector(CREOLE_PATTERNS, ENGLISH_PATTERNS, lexicon_phrases)
+    intent_engine = IntentEngine(detector, DOCUMENT_KEYWORDS, ACTION_KEYWORDS, URGENCY_KEYWORDS)
+    _translator.load(translations)
+    _language_detector = detector
+    _intent_engine = intent_engine
+    return {
+        "entries": len(entries),
+        "creole_phrases": len(translations["creole_to_en"]),
+        "english_phrases": len(translations["en_to_creole"]),
+        "detector_phrases_added": detector.lexicon_phrase_count
     }
-    
-    for urgency, keywords in urgency_keywords.items():
-        if any(keyword in text_lower for keyword in keywords):
-            intent["urgency"] = urgency
-            break
-    
-    return intent
+
+def take_translation_usage() -> Dict[int, int]:
+    """
+    Collect per-entry hit counts since the last call
+    """
+    return _translator.take_usage()
+
+def restore_translation_usage(usage: Dict[int, int]):
+    _translator.restore_usage(usage)
+
+def translate_creole(text: str, target_language: str = "en", track_usage: bool = True) -> str:
+    """
+    Translate between English and Grenadian Creole
+    """
+    with span("translate_creole"):
+        return _translator.translate(text, target_language, track_usage)
+
+def translate_creole_batch(texts: List[str], target_language: str = "en") -> List[str]:
+    """
+    Translate many strings with the shared compiled translator
+    """
+    with span("translate_creole_batch"):
+        return _translator.translate_batch(texts, target_language)
+
+# Intent keywords; dict order breaks score ties, as first-match order did before
+DOCUMENT_KEYWORDS = {
+    "birth_certificate": ["birth", "birth paper", "birth certificate", "born"],
+    "death_certificate": ["death", "death paper", "death certificate", "passing", "died"],
+    "marriage_certificate": ["marriage", "marriage paper", "marriage certificate", "married", "wedding"],
+    "divorce_decree": ["divorce", "divorce paper", "divorce decree", "divorced"],
+    "property_deed": ["property", "property paper", "property deed", "house", "land", "real estate"],
+    "business_registration": ["business", "business paper", "business registration", "company", "register business"],
+    "passport_application": ["passport", "travel", "travel document"],
+    "national_id": ["id card", "national id", "identification", "id"],
+    "voter_registration": ["voter", "voter card", "voting", "election"],
+    "tax_documents": ["tax", "tax paper", "tax documents", "taxes", "revenue"]
+}
+
+ACTION_KEYWORDS = {
+    "get_info": ["information", "info", "what", "how", "tell me"],
+    "get_requirements": ["requirements", "need", "required", "what do i need", "what documents"],
+    "get_process": ["process", "steps", "procedure", "how to", "how do i"],
+    "get_contact": ["contact", "where", "phone", "address", "location"],
+    "get_fees": ["cost", "fee", "money", "price", "how much"]
+}
+
+URGENCY_KEYWORDS = {
+    "urgent": ["urgent", "emergency", "asap", "quick", "fast"],
+    "normal": ["normal", "regular", "standard"]
+}
+
+class IntentEngine:
+    """
+    Resolves document type, action, urgency and language in one matcher pass over one
+    tokenization: the language detector's features share the matcher with the intent
+    keywords. Keywords match on whole words only, so "id" no longer fires inside "did"
+    or "valid". Each distinct keyword found adds its word count to its label's score;
+    the highest score wins per slot and ties go to the label listed first.
+    """
+    SLOTS = ("document_type", "action", "urgency")
+
+    def __init__(self, detector: LanguageDetector, document_keywords: Dict[str, List[str]],
+                 action_keywords: Dict[str, List[str]], urgency_keywords: Dict[str, List[str]]):
+        self.detector = detector
+        self.matcher = PhraseMatcher()
+        self.matcher.update(detector.matcher)
+        self.ranks = {}
+        for slot, keywords in zip(self.SLOTS, (document_keywords, action_keywords, urgency_keywords)):
+            self.ranks[slot] = {label: rank for rank, label in enumerate(keywords)}
+            for label, phrases in keywords.items():
+                for phrase in phrases:
+                    words, _ = split_words(phrase)
+                    self.matcher.add_text(phrase, (slot, label, len(words)))
+
+    def score_words(self, words: List[str], gaps: List[str]) -> Dict[str, Dict[str, int]]:
+        scores = {"document_type": {}, "action": {}, "urgency": {}}
+        creole_count, lexicon = self.detector.creole_feature_count, self.detector.lexicon_feature
+        creole_score = english_score = 0
+        for payload in self.matcher.match_set(words, gaps):
+            if payload.__class__ is int:
+                if payload < creole_count or payload == lexicon:
+                    creole_score += 1
+                else:
+                    english_score += 1
+                continue
+            slot, label, weight = payload
+            slot_scores = scores[slot]
+            slot_scores[label] = slot_scores.get(label, 0) + weight
+        scores["language"] = {"en-GD": creole_score, "en": english_score}
+        return scores
+
+    def _best(self, slot: str, slot_scores: Dict[str, int]) -> Optional[str]:
+        ranks = self.ranks[slot]
+        best, best_key = None, None
+        for label, score in slot_scores.items():
+            key = (-score, ranks[label])
+            if best_key is None or key < best_key:
+                best, best_key = label, key
+        return best
+
+    def extract(self, text: str) -> Dict:
+        words, gaps = split_words(text.lower())
+        scores = self.score_words(words, gaps)
+        language = scores["language"]
+        return {
+            "document_type": self._best("document_type", scores["document_type"]),
+            "action": self._best("action", scores["action"]),
+            "urgency": self._best("urgency", scores["urgency"]) or "normal",
+            "language": "en-GD" if language["en-GD"] > language["en"] else "en",
+            "scores": scores
+        }
+
+_intent_engine = IntentEngine(_language_detector, DOCUMENT_KEYWORDS, ACTION_KEYWORDS, URGENCY_KEYWORDS)
+
+def extract_legal_intent(text: str) -> Dict:
+    """
+    Extract legal document intent from user message, with per-label scores
+    """
+    with span("extract_legal_intent"):
+        return _intent_engine.extract(text)
 
 def format_contact_info(contact_info: Dict) -> str:
     """
@@ -0,0 +1,324 @@
+# Lightweight in-process metrics: counters, histograms, timing spans and Prometheus text output
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from config import settings
+
+# Seconds; the low end covers microsecond helpers, the high end slow completions
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+# Updates come from the event loop and from threadpool work such as batch translation,
+# so every write to a series goes through this lock. It is uncontended on the hot path.
+_lock = threading.Lock()
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class MetricsRegistry:
+    """
+    Holds every metric and renders them in the Prometheus text exposition format.
+    When disabled, updates return immediately so instrumented code pays almost nothing.
+    Updates may come from worker threads and are serialised by a module-level lock.
+    """
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: List["_Metric"] = []
+
+    def register(self, metric: "_Metric") -> "_Metric":
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        for metric in self._metrics:
+            metric.reset()
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, registry: MetricsRegistry, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        registry.register(self)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def reset(self):
+        pass
+
+class Counter(_Metric):
+    """
+    Monotonic count per label set, e.g. Counter(...).inc("fast_path")
+    """
+    type = "counter"
+
+    def __init__(self, registry: MetricsRegistry, name: str, help: str, labelnames: Iterable[str] = ()):
+        super().__init__(registry, name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        if not self.registry.enabled:
+            return
+        with _lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def totals(self) -> Dict[str, float]:
+        with _lock:
+            items = list(self._values.items())
+        return {"/".join(labels) or self.name: value for labels, value in items}
+
+    def samples(self) -> List[str]:
+        with _lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in items]
+
+    def reset(self):
+        with _lock:
+            self._values.clear()
+
+class Gauge(_Metric):
+    """
+    Current values read at scrape time from a callback returning {label values: value}
+    """
+    type = "gauge"
+
+    def __init__(self, registry: MetricsRegistry, name: str, help: str, labelnames: Iterable[str] = (),
+                 collect: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None):
+        super().__init__(registry, name, help, labelnames)
+        self.collect = collect
+
+    def samples(self) -> List[str]:
+        if self.collect is None:
+            return []
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in self.collect().items()]
+
+class Histogram(_Metric):
+    """
+    Bucketed distribution per label set. Prometheus derives p50/p95/p99 from the
+    buckets with histogram_quantile(); quantiles() gives the same estimate locally.
+    """
+    type = "histogram"
+
+    def __init__(self, registry: MetricsRegistry, name: str, help: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(registry, name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (last one is +Inf), then sum and count
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def series(self, labels: Tuple[str, ...]) -> list:
+        series = self._series.get(labels)
+        if series is None:
+            with _lock:
+                series = self._series.setdefault(labels, [0] * (len(self.buckets) + 3))
+        return series
+
+    def observe(self, value: float, *labels: str):
+        if not self.registry.enabled:
+            return
+        series = self.series(labels)
+        with _lock:
+            series[bisect_left(self.buckets, value)] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def time(self, *labels: str) -> "Span":
+        return Span(self.buckets, self.series(labels)) if self.registry.enabled else _NOOP_SPAN
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return series[-1] if series is not None else 0
+
+    def quantile(self, fraction: float, *labels: str) -> Optional[float]:
+        """
+        Estimate a quantile by linear interpolation within its bucket
+        """
+        series = self._series.get(labels)
+        if series is None or series[-1] == 0:
+            return None
+        rank = fraction * series[-1]
+        seen = 0
+        for i, upper in enumerate(self.buckets):
+            if seen + series[i] >= rank:
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (upper - lower) * ((rank - seen) / series[i] if series[i] else 0.0)
+            seen += series[i]
+        return self.buckets[-1]
+
+    def quantiles(self) -> Dict[str, Dict]:
+        """
+        p50/p95/p99 and count for every label set, for humans rather than scrapers
+        """
+        report = {}
+        for labels in list(self._series):
+            key = ",".join(labels) or self.name
+            report[key] = {
+                "count": self.count(*labels),
+                **{f"p{round(q * 100)}_ms": round(self.quantile(q, *labels) * 1000, 3) for q in (0.5, 0.95, 0.99)}
+            }
+        return report
+
+    def samples(self) -> List[str]:
+        lines = []
+        with _lock:
+            snapshot = [(labels, list(series)) for labels, series in self._series.items()]
+        for labels, series in snapshot:
+            cumulative = 0
+            for upper, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = f'le="{_format_value(upper)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+    def reset(self):
+        # Zeroed in place, since spans may hold a reference to a series
+        with _lock:
+            for series in self._series.values():
+                series[:] = [0] * len(series)
+
+class Span:
+    """
+    Context manager recording its wall time straight into a histogram series
+    """
+    __slots__ = ("buckets", "series", "started")
+
+    def __init__(self, buckets: Tuple[float, ...], series: list):
+        self.buckets = buckets
+        self.series = series
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started
+        series = self.series
+        with _lock:
+            series[bisect_left(self.buckets, elapsed)] += 1
+            series[-2] += elapsed
+            series[-1] += 1
+        return False
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP_SPAN = _NoopSpan()
+
+registry = MetricsRegistry(enabled=settings.METRICS_ENABLED)
+
+STAGE_SECONDS = Histogram(
+    registry, "nutmegai_stage_duration_seconds",
+    "Time spent in named stages of request handling", ["stage"]
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    registry, "nutmegai_http_request_duration_seconds",
+    "HTTP request latency until the response body is sent", ["method", "route", "status"]
+)
+STREAM_TTFB_SECONDS = Histogram(
+    registry, "nutmegai_chat_stream_ttfb_seconds",
+    "Time from a streaming chat request to its first event"
+)
+LLM_REQUEST_SECONDS = Histogram(
+    registry, "nutmegai_llm_request_duration_seconds",
+    "Upstream completion latency per backend", ["backend"]
+)
+LLM_FIRST_TOKEN_SECONDS = Histogram(
+    registry, "nutmegai_llm_first_token_seconds",
+    "Time from opening a completion stream to its first token per backend", ["backend"]
+)
+LLM_TOKENS = Counter(
+    registry, "nutmegai_llm_tokens_total",
+    "Tokens reported by upstream completions", ["backend", "kind"]
+)
+DIRECT_ANSWERS = Counter(
+    registry, "nutmegai_direct_answers_total",
+    "Chat turns answered without a completion", ["source"]
+)
+COALESCED_REQUESTS = Counter(
+    registry, "nutmegai_coalesced_requests_total",
+    "Chat turns that shared an in-flight completion"
+)
+FALLBACKS = Counter(
+    registry, "nutmegai_fallbacks_total",
+    "Chat turns answered by a fallback because no backend could answer", ["kind"]
+)
+
+_stage_series: Dict[str, list] = {}
+
+def span(stage: str):
+    """
+    Time a block into nutmegai_stage_duration_seconds, e.g. `with span("detect_language"):`
+    """
+    if not registry.enabled:
+        return _NOOP_SPAN
+    series = _stage_series.get(stage)
+    if series is None:
+        series = _stage_series[stage] = STAGE_SECONDS.series((stage,))
+    return Span(STAGE_SECONDS.buckets, series)
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request by method, route template and status.
+    The clock stops once the last body chunk is sent, so streams are timed in full.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not registry.enabled:
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Route templates keep label cardinality bounded; unmatched paths share one label
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, scope["method"], path, str(status["code"]))
@@ -0,0 +1,100 @@
+# Word-level multi-phrase matcher shared by language detection and intent extraction
+
+import re
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+_SPLIT = re.compile(r"(\W+)")
+_ALTERNATION = re.compile(r"^\\b\((.*)\)\\b$")
+_WHITESPACE_GAP = " "
+
+def split_words(text: str) -> Tuple[List[str], List[str]]:
+    """
+    Split text into maximal word runs and the separators between them.
+    gaps[i] sits between words[i] and words[i + 1]; only the first and last word can be empty.
+    """
+    parts = _SPLIT.split(text)
+    return parts[0::2], parts[1::2]
+
+def phrase_from_text(phrase: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """
+    Turn "good  mornin" or "what's happening" into word and gap tuples.
+    Whitespace gaps match any whitespace run; other gaps must match literally.
+    """
+    words, gaps = split_words(phrase.strip())
+    if not words or not all(words):
+        raise ValueError(f"Phrase must start and end with a word character: {phrase!r}")
+    return tuple(words), tuple(_WHITESPACE_GAP if gap.isspace() else gap for gap in gaps)
+
+def phrases_from_pattern(pattern: str) -> List[Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+    """
+    Expand a word-bounded alternation like r"\\b(how\\s+to|where\\s+to)\\b" into phrases
+    """
+    match = _ALTERNATION.match(pattern)
+    if match is None:
+        raise ValueError(f"Unsupported pattern shape: {pattern!r}")
+    phrases = []
+    for alternative in match.group(1).split("|"):
+        text = alternative.replace(r"\s+", " ")
+        if re.search(r"[\\()\[\]{}*+?.^$]", text):
+            raise ValueError(f"Unsupported regex syntax in pattern: {pattern!r}")
+        phrases.append(phrase_from_text(text))
+    return phrases
+
+class PhraseMatcher:
+    """
+    Matches many word phrases against pre-split text in a single left-to-right pass.
+    Phrases are indexed by their first word, so each position costs one dict lookup,
+    and overlapping matches are all reported, as independent re.search calls would.
+    """
+    def __init__(self):
+        self._index: Dict[str, List[Tuple[Tuple[str, ...], Tuple[str, ...], Hashable]]] = {}
+
+    def add(self, phrase: Tuple[Tuple[str, ...], Tuple[str, ...]], payload: Hashable):
+        words, gaps = phrase
+        self._index.setdefault(words[0], []).append((words[1:], gaps, payload))
+
+    def add_pattern(self, pattern: str, payload: Hashable):
+        for phrase in phrases_from_pattern(pattern):
+            self.add(phrase, payload)
+
+    def add_text(self, text: str, payload: Hashable):
+        self.add(phrase_from_text(text), payload)
+
+    def update(self, other: "PhraseMatcher"):
+        """
+        Add every phrase of another matcher, keeping its payloads
+        """
+        for first, entries in other._index.items():
+            self._index.setdefault(first, []).extend(entries)
+
+    def iter_matches(self, words: List[str], gaps: List[str]) -> Iterable[Tuple[int, int, Hashable]]:
+        """
+        Yield (start_word, word_count, payload) for every phrase occurrence
+        """
+        index = self._index
+        count = len(words)
+        for i, word in enumerate(words):
+            entries = index.get(word)
+            if entries is None:
+                continue
+            for rest, rest_gaps, payload in entries:
+                if not rest:
+                    yield i, 1, payload
+                    continue
+                if i + len(rest) >= count:
+                    continue
+                for j, expected in enumerate(rest):
+                    gap = gaps[i + j]
+                    spec = rest_gaps[j]
+                    if spec == _WHITESPACE_GAP:
+                        if not gap.isspace():
+                            break
+                    elif gap != spec:
+                        break
+                    if words[i + j + 1] != expected:
+                        break
+                else:
+                    yield i, len(rest) + 1, payload
+
+    def match_set(self, words: List[str], gaps: List[str]) -> Set[Hashable]:
+        return {payload for _, _, payload in self.iter_matches(words, gaps)}
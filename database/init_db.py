@@ -26,10 +26,9 @@ def init_database():
     session = Session()
     
     try:
-        # Check if data already exists
-        if session.query(LegalDocument).count() == 0:
-            print("Populating legal documents...")
-            populate_legal_documents(session)
+        # Seed any document types that are not in the table yet
+        print("Populating legal documents...")
+        populate_legal_documents(session)
         
         if session.query(CreoleTranslation).count() == 0:
             print("Populating Creole translations...")
@@ -190,10 +189,158 @@ def populate_legal_documents(session):
                 "email": "passports@gov.gd",
                 "hours": "Monday-Friday, 8:00 AM - 4:00 PM"
             })
+        },
+        {
+            "document_type": "divorce_decree",
+            "title": "Divorce Decree",
+            "description": "Divorce decrees are court-issued documents that legally end a marriage. They are required for remarriage and other legal proceedings.",
+            "requirements": json.dumps([
+                "Petition for divorce",
+                "Marriage certificate",
+                "Grounds for divorce documentation",
+                "Legal representation (recommended)",
+                "Court filing fees"
+            ]),
+            "process_steps": json.dumps([
+                "Consult with a lawyer",
+                "File petition with the High Court",
+                "Serve papers to spouse",
+                "Attend court hearings",
+                "Obtain final decree",
+                "Register decree with Civil Registry"
+            ]),
+            "fees": "Varies based on complexity",
+            "estimated_time": "3-6 months",
+            "contact_info": json.dumps({
+                "office": "High Court of Grenada",
+                "address": "Carenage, St. George's",
+                "phone": "+1 (473) 440-2251",
+                "email": "courts@gov.gd",
+                "hours": "Monday-Friday, 8:00 AM - 4:00 PM"
+            })
+        },
+        {
+            "document_type": "property_deed",
+            "title": "Property Deed",
+            "description": "Property deeds are legal documents that prove ownership of real estate. They are essential for property transactions and inheritance matters.",
+            "requirements": json.dumps([
+                "Survey plan of the property",
+                "Title search report",
+                "Transfer documents",
+                "Stamp duty payment",
+                "Legal representation (required)"
+            ]),
+            "process_steps": json.dumps([
+                "Conduct title search",
+                "Obtain survey plan",
+                "Prepare transfer documents",
+                "Pay stamp duty",
+                "Register with Land Registry",
+                "Obtain certified copy of deed"
+            ]),
+            "fees": "Based on property value",
+            "estimated_time": "2-4 weeks",
+            "contact_info": json.dumps({
+                "office": "Land Registry Office",
+                "address": "Ministerial Complex, Botanical Gardens, St. George's",
+                "phone": "+1 (473) 440-2251",
+                "email": "landregistry@gov.gd",
+                "hours": "Monday-Friday, 8:00 AM - 4:00 PM"
+            })
+        },
+        {
+            "document_type": "national_id",
+            "title": "National ID Card",
+            "description": "National ID cards are official identification documents for Grenadian citizens. They are required for various government services and transactions.",
+            "requirements": json.dumps([
+                "Completed ID application form",
+                "Birth certificate",
+                "Proof of address",
+                "Passport photo",
+                "Application fee"
+            ]),
+            "process_steps": json.dumps([
+                "Complete application form",
+                "Gather required documents",
+                "Visit ID Office",
+                "Submit application and payment",
+                "Wait for processing",
+                "Collect ID card"
+            ]),
+            "fees": "EC$50.00",
+            "estimated_time": "7-10 business days",
+            "contact_info": json.dumps({
+                "office": "National ID Office",
+                "address": "Ministerial Complex, Botanical Gardens, St. George's",
+                "phone": "+1 (473) 440-2251",
+                "email": "nationalid@gov.gd",
+                "hours": "Monday-Friday, 8:00 AM - 4:00 PM"
+            })
+        },
+        {
+            "document_type": "voter_registration",
+            "title": "Voter Registration",
+            "description": "Voter registration allows citizens to participate in elections. Registration is required to vote in national and local elections.",
+            "requirements": json.dumps([
+                "Completed voter registration form",
+                "Proof of citizenship",
+                "Proof of address",
+                "Identification document",
+                "Age 18 or older"
+            ]),
+            "process_steps": json.dumps([
+                "Complete registration form",
+                "Gather required documents",
+                "Visit Electoral Office",
+                "Submit application",
+                "Wait for verification",
+                "Receive voter ID card"
+            ]),
+            "fees": "Free",
+            "estimated_time": "5-7 business days",
+            "contact_info": json.dumps({
+                "office": "Electoral Office",
+                "address": "Ministerial Complex, Botanical Gardens, St. George's",
+                "phone": "+1 (473) 440-2251",
+                "email": "electoral@gov.gd",
+                "hours": "Monday-Friday, 8:00 AM - 4:00 PM"
+            })
+        },
+        {
+            "document_type": "tax_documents",
+            "title": "Tax Documents",
+            "description": "Tax documents include various forms and certificates required for tax compliance and business operations in Grenada.",
+            "requirements": json.dumps([
+                "Business registration certificate",
+                "Financial records",
+                "Completed tax forms",
+                "Supporting documentation",
+                "Payment of taxes due"
+            ]),
+            "process_steps": json.dumps([
+                "Register for tax identification",
+                "Maintain proper records",
+                "Complete tax returns",
+                "Submit to Inland Revenue",
+                "Pay taxes due",
+                "Obtain tax clearance certificate"
+            ]),
+            "fees": "Varies by tax type",
+            "estimated_time": "Varies by document type",
+            "contact_info": json.dumps({
+                "office": "Inland Revenue Department",
+                "address": "Ministerial Complex, Botanical Gardens, St. George's",
+                "phone": "+1 (473) 440-2251",
+                "email": "tax@gov.gd",
+                "hours": "Monday-Friday, 8:00 AM - 4:00 PM"
+            })
         }
     ]
     
+    existing = {row.document_type for row in session.query(LegalDocument.document_type)}
     for doc_data in documents:
+        if doc_data["document_type"] in existing:
+            continue
         doc = LegalDocument(**doc_data)
         session.add(doc)
 
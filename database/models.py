@@ -1,5 +1,5 @@
 # SQLAlchemy / Pydantic models
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Float, Boolean, ForeignKey
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Float, Boolean, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
@@ -17,11 +17,19 @@ class ChatSession(Base):
     language_preference = Column(String(10), default='en')
     is_active = Column(Boolean, default=True)
     
+    # Rolling summary of older turns; messages up to summary_through_id are covered by it
+    summary = Column(Text)
+    summary_through_id = Column(Integer, default=0)
+    
     # Relationships
     messages = relationship("ChatMessage", back_populates="session", cascade="all, delete-orphan")
 
 class ChatMessage(Base):
     __tablename__ = 'chat_messages'
+    __table_args__ = (
+        # Serves history windows and keyset pagination within a session in either direction
+        Index('ix_chat_messages_session_created', 'session_id', 'created_at', 'id'),
+    )
     
     id = Column(Integer, primary_key=True)
     session_id = Column(String(36), ForeignKey('chat_sessions.session_id'), nullable=False)
@@ -36,6 +44,9 @@ class ChatMessage(Base):
 
 class DocumentQuery(Base):
     __tablename__ = 'document_queries'
+    __table_args__ = (
+        Index('ix_document_queries_type_created', 'document_type', 'created_at'),
+    )
     
     id = Column(Integer, primary_key=True)
     session_id = Column(String(36), ForeignKey('chat_sessions.session_id'), nullable=False)
@@ -50,6 +61,9 @@ class DocumentQuery(Base):
 
 class UserFeedback(Base):
     __tablename__ = 'user_feedback'
+    __table_args__ = (
+        Index('ix_user_feedback_message_id', 'message_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     session_id = Column(String(36), ForeignKey('chat_sessions.session_id'), nullable=False)
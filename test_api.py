@@ -1,3 +1,5 @@
+# Smoke test of the main endpoints; for throughput and latency use backend/benchmarks/loadgen.py
+
 import requests
 import json
 